@@ -1,22 +1,15 @@
-
 #!/bin/sh
 set -e  # Detener si hay error
 
 echo "Aplicando migraciones..."
 python manage.py migrate --noinput
 
-echo "Ejecutando collectstatic..."
-python manage.py collectstatic --noinput
-
-echo "Ejecutando scripts de importación..."
-
-# Ejecuta tus comandos de Django
-python manage.py import_herramientas
-python manage.py import_colaboradores
-python manage.py poblar_ubicaciones
-python manage.py generar_tickets_falsos
+# Los estáticos ya se recopilan al construir la imagen (ver dockerfile)
 
-echo "Todos los scripts ejecutados correctamente."
+echo "Cargando datos iniciales..."
+# Solo ejecuta los pasos cuyo archivo o versión cambió desde el último arranque.
+# Con SEMBRAR_DATOS_PRUEBA=1 (y DEBUG activo) también genera los tickets falsos.
+python manage.py bootstrap ${SEMBRAR_DATOS_PRUEBA:+--datos-prueba}
 
 # Inicia Gunicorn
 exec "$@"
@@ -0,0 +1,45 @@
+# gunicorn.conf.py
+# gunicorn lo carga solo si se ejecuta desde la raíz del proyecto, o con -c gunicorn.conf.py
+
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('WEB_CONCURRENCY', 3))
+# ASGI: las vistas HTMX asíncronas no bloquean el worker mientras esperan a la BBDD
+worker_class = 'uvicorn_worker.UvicornWorker'
+
+# Django, las vistas y las plantillas se cargan una vez en el maestro y los workers
+# las heredan al hacer fork (también los que se reciclan por max_requests)
+preload_app = os.environ.get('GUNICORN_PRECARGA', '1') == '1'
+PRECALENTAR = os.environ.get('GUNICORN_PRECALENTAR', '1') == '1'
+
+# Reciclar workers acota la memoria que acumulan; el jitter evita reiniciarlos todos a la vez
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 100))
+timeout = 60
+graceful_timeout = 30
+keepalive = 5
+
+
+def when_ready(server):
+    if preload_app and PRECALENTAR:
+        from sgtr.precalentamiento import precalentar_codigo
+        precalentar_codigo()
+        server.log.info("Código precargado en el maestro")
+
+
+def post_fork(server, worker):
+    if preload_app:
+        # Nunca compartir con el maestro una conexión abierta antes del fork
+        from django.db import connections
+        connections.close_all()
+
+
+def post_worker_init(worker):
+    if not PRECALENTAR:
+        return
+    from sgtr.precalentamiento import precalentar_codigo, precalentar_datos
+    # Con preload_app ya viene hecho del maestro y esto no cuesta nada
+    precalentar_codigo()
+    precalentar_datos()
+    worker.log.info("Worker precalentado")
@@ -3,6 +3,19 @@
 from django.contrib import admin
 from .models import Ubicacion, Herramienta
 
-# Registramos los modelos de la app inventario.
-admin.site.register(Ubicacion)
-admin.site.register(Herramienta)
\ No newline at end of file
+# Los search_fields también sirven al autocompletado del admin de tickets
+@admin.register(Ubicacion)
+class UbicacionAdmin(admin.ModelAdmin):
+    list_display = ('nave', 'banda', 'tacto', 'operacion')
+    list_filter = ('nave',)
+    search_fields = ('nave', 'banda', 'tacto', 'operacion')
+    ordering = ('nave', 'banda', 'tacto', 'operacion')
+
+
+@admin.register(Herramienta)
+class HerramientaAdmin(admin.ModelAdmin):
+    list_display = ('numero_serie', 'modelo', 'fabricante', 'tipo', 'estado', 'ubicacion')
+    list_select_related = ('ubicacion',)
+    search_fields = ('numero_serie', 'modelo')
+    ordering = ('numero_serie',)
+    autocomplete_fields = ('ubicacion',)
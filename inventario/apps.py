@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class InventarioConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'inventario'
+    def ready(self):
+        # Importa las señales que invalidan el árbol de ubicaciones
+        import inventario.signals
@@ -0,0 +1,107 @@
+# inventario/jerarquia.py
+
+import time
+
+from django.core.cache import cache
+
+from .models import Ubicacion
+
+# ==============================================================================
+# JERARQUÍA DE LA PLANTA: NAVE -> BANDA -> TACTO / OPERACIÓN
+# ==============================================================================
+# El árbol se construye una vez por worker con una sola consulta y se guarda en
+# memoria. La versión vive en la caché compartida: al cambiar una Ubicacion se
+# incrementa y cada worker reconstruye su copia en la siguiente consulta.
+
+UBICACIONES_VERSION_KEY = 'ubicaciones:version'
+
+# (versión, árbol) del proceso actual
+_arbol_local = (None, None)
+
+
+def version_ubicaciones():
+    return cache.get_or_set(UBICACIONES_VERSION_KEY, time.time_ns(), None)
+
+
+def invalidar_ubicaciones():
+    cache.set(UBICACIONES_VERSION_KEY, time.time_ns(), None)
+
+
+def orden_natural(valor):
+    # "2" antes que "10"; los nombres no numéricos (TMF, CMF...) al final
+    return (0, int(valor), '') if valor.isdigit() else (1, 0, valor)
+
+
+def _etiqueta_punto(tacto, operacion):
+    partes = []
+    if tacto:
+        partes.append(f"Tacto {tacto}")
+    if operacion:
+        partes.append(f"Operación {operacion}")
+    return " / ".join(partes) or "General"
+
+
+def construir_arbol():
+    """
+    Devuelve {'arbol': {nave: {banda: [(pk, etiqueta), ...]}}, 'rutas': {pk: (nave, banda)}}.
+    """
+    arbol = {}
+    rutas = {}
+    filas = Ubicacion.objects.values_list('pk', 'nave', 'banda', 'tacto', 'operacion').order_by()
+    for pk, nave, banda, tacto, operacion in filas.iterator():
+        nave, banda = nave or '', banda or ''
+        orden = orden_natural(tacto or operacion or '')
+        arbol.setdefault(nave, {}).setdefault(banda, []).append((orden, pk, _etiqueta_punto(tacto, operacion)))
+        rutas[pk] = (nave, banda)
+
+    for bandas in arbol.values():
+        for banda, puntos in bandas.items():
+            bandas[banda] = [(pk, etiqueta) for _, pk, etiqueta in sorted(puntos)]
+    return {'arbol': arbol, 'rutas': rutas}
+
+
+def _datos():
+    global _arbol_local
+    version = version_ubicaciones()
+    version_local, datos = _arbol_local
+    if datos is None or version_local != version:
+        datos = construir_arbol()
+        _arbol_local = (version, datos)
+    return datos
+
+
+def naves():
+    return sorted(_datos()['arbol'], key=orden_natural)
+
+
+def bandas(nave):
+    return sorted(_datos()['arbol'].get(nave or '', {}), key=orden_natural)
+
+
+def puntos(nave, banda):
+    """
+    Tactos/operaciones de una banda como [(pk de Ubicacion, etiqueta)].
+    """
+    return _datos()['arbol'].get(nave or '', {}).get(banda or '', [])
+
+
+def ruta(ubicacion_pk):
+    """
+    (nave, banda) de una ubicación, para preseleccionar el selector al editar.
+    """
+    return _datos()['rutas'].get(ubicacion_pk, (None, None))
+
+
+def arbol():
+    """
+    Árbol completo ya ordenado {nave: {banda: [(pk, etiqueta)]}}, para el catálogo sin conexión.
+    """
+    datos = _datos()['arbol']
+    return {
+        nave: {banda: datos[nave][banda] for banda in bandas(nave)}
+        for nave in naves()
+    }
+
+
+def existe(ubicacion_pk):
+    return ubicacion_pk in _datos()['rutas']
@@ -10,7 +10,7 @@ class Command(BaseCommand):
 
     def handle(self, *args, **kwargs):
         # Ruta al archivo CSV que movimos a la raíz del proyecto
-        ruta_archivo = settings.BASE_DIR / 'herramientas.csv'
+        ruta_archivo = settings.BASE_DIR / 'Herramientas.csv'
         self.stdout.write(self.style.SUCCESS(f'Iniciando la carga desde {ruta_archivo}'))
 
         try:
@@ -48,6 +48,6 @@ class Command(BaseCommand):
                 self.stdout.write(self.style.WARNING(f'{contador_actualizados} herramientas ya existían.'))
 
         except FileNotFoundError:
-            self.stdout.write(self.style.ERROR('Error: El archivo herramientas.csv no se encontró en la raíz del proyecto.'))
+            self.stdout.write(self.style.ERROR('Error: El archivo Herramientas.csv no se encontró en la raíz del proyecto.'))
         except Exception as e:
             self.stdout.write(self.style.ERROR(f'Ocurrió un error inesperado: {e}'))
\ No newline at end of file
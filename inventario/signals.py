@@ -0,0 +1,17 @@
+# inventario/signals.py
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Ubicacion
+from .jerarquia import invalidar_ubicaciones
+
+
+@receiver(post_save, sender=Ubicacion)
+@receiver(post_delete, sender=Ubicacion)
+def invalidar_jerarquia_ubicaciones(sender, **kwargs):
+    """
+    Cualquier alta, cambio o baja de una ubicación obliga a reconstruir el árbol.
+    Se invalida al confirmar: antes, otra petición reconstruiría el árbol viejo.
+    """
+    transaction.on_commit(invalidar_ubicaciones)
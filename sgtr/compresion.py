@@ -0,0 +1,106 @@
+# sgtr/compresion.py
+
+import gzip
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:  # Sin brotli se negocia solo gzip
+    brotli = None
+
+# Tipos de contenido que vale la pena comprimir al vuelo (HTML, fragmentos HTMX, JSON...)
+TIPOS_COMPRIMIBLES = ('text/', 'application/json', 'application/javascript', 'application/xml', 'image/svg+xml')
+# Calidad moderada: en respuestas dinámicas importa más la latencia que el último byte
+BROTLI_CALIDAD = 5
+GZIP_NIVEL = 6
+
+
+def codificaciones_aceptadas(accept_encoding):
+    """
+    Devuelve las codificaciones de Accept-Encoding con q > 0 (en minúsculas).
+    """
+    aceptadas = set()
+    for parte in accept_encoding.lower().split(','):
+        nombre, _, parametros = parte.strip().partition(';')
+        q = 1.0
+        if parametros.strip().startswith('q='):
+            try:
+                q = float(parametros.strip()[2:])
+            except ValueError:
+                q = 0.0
+        if nombre and q > 0:
+            aceptadas.add(nombre)
+    return aceptadas
+
+
+def elegir_codificacion(accept_encoding):
+    aceptadas = codificaciones_aceptadas(accept_encoding)
+    if brotli is not None and 'br' in aceptadas:
+        return 'br'
+    if 'gzip' in aceptadas:
+        return 'gzip'
+    return None
+
+
+def comprimir(contenido, codificacion):
+    if codificacion == 'br':
+        return brotli.compress(contenido, quality=BROTLI_CALIDAD)
+    return gzip.compress(contenido, compresslevel=GZIP_NIVEL, mtime=0)
+
+
+async def comprimir_flujo(partes, codificacion):
+    """
+    Comprime un flujo asíncrono de bytes trozo a trozo. Tras cada trozo se vacía el
+    compresor para que el cliente reciba los datos sin esperar al final de la respuesta.
+    """
+    if codificacion == 'br':
+        compresor = brotli.Compressor(quality=BROTLI_CALIDAD)
+        async for parte in partes:
+            yield compresor.process(parte) + compresor.flush()
+        yield compresor.finish()
+        return
+
+    compresor = zlib.compressobj(GZIP_NIVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # Cabecera gzip
+    async for parte in partes:
+        yield compresor.compress(parte) + compresor.flush(zlib.Z_SYNC_FLUSH)
+    yield compresor.flush()
+
+
+class CompresionMiddleware(MiddlewareMixin):
+    """
+    Comprime con Brotli o gzip las páginas completas y los fragmentos HTMX.
+    Omite respuestas en streaming (las comprimen sus vistas con comprimir_flujo),
+    ya codificadas o más pequeñas que COMPRESION_TAMANO_MINIMO. El token CSRF de Django va enmascarado por
+    petición, lo que neutraliza ataques tipo BREACH sobre él.
+    """
+
+    def process_response(self, request, response):
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        if not response.get('Content-Type', '').startswith(TIPOS_COMPRIMIBLES):
+            return response
+        if len(response.content) < getattr(settings, 'COMPRESION_TAMANO_MINIMO', 500):
+            return response
+
+        # La respuesta varía según Accept-Encoding aunque esta vez no se comprima
+        patch_vary_headers(response, ('Accept-Encoding',))
+        codificacion = elegir_codificacion(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if codificacion is None:
+            return response
+
+        comprimido = comprimir(response.content, codificacion)
+        if len(comprimido) >= len(response.content):
+            return response
+
+        response.content = comprimido
+        response['Content-Length'] = str(len(comprimido))
+        response['Content-Encoding'] = codificacion
+        # El cuerpo cambió: un ETag fuerte ya no sería válido
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
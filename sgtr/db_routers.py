@@ -0,0 +1,57 @@
+# sgtr/db_routers.py
+
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+
+# Alias de la réplica de solo lectura (ver DATABASES en settings.py)
+REPLICA_ALIAS = 'replica'
+
+# Se activa solo durante las vistas analíticas marcadas con @usar_replica
+_leer_de_replica = ContextVar('leer_de_replica', default=False)
+
+
+def replica_disponible():
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+def alias_analitico():
+    """
+    Alias para lecturas analíticas que no pasan por @usar_replica, como las respuestas
+    en streaming, cuyas consultas se ejecutan después de que la vista ya retornó.
+    """
+    return REPLICA_ALIAS if replica_disponible() else 'default'
+
+
+def usar_replica(view_func):
+    """
+    Decorador para vistas de solo lectura pesadas (dashboard, modales, exportaciones).
+    Sus lecturas van a la réplica; el resto de vistas lee del primario y ve sus propias escrituras.
+    """
+    @wraps(view_func)
+    def _wrapped_view(request, *args, **kwargs):
+        token = _leer_de_replica.set(True)
+        try:
+            return view_func(request, *args, **kwargs)
+        finally:
+            _leer_de_replica.reset(token)
+    return _wrapped_view
+
+
+class ReplicaRouter:
+    """
+    Envía las lecturas de las vistas analíticas a la réplica y todo lo demás al primario.
+    """
+
+    def db_for_read(self, model, **hints):
+        if _leer_de_replica.get() and replica_disponible():
+            return REPLICA_ALIAS
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Ambas bases de datos tienen los mismos datos
+        return True
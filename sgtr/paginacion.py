@@ -0,0 +1,44 @@
+# sgtr/paginacion.py
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+# Por debajo de esto un COUNT(*) exacto es barato y se prefiere
+UMBRAL_CONTEO_EXACTO = 100_000
+# Con filtros no hay estimación: se cuenta como mucho hasta aquí
+LIMITE_CONTEO_FILTRADO = 10_000
+
+
+def filas_estimadas(queryset):
+    """
+    Filas de la tabla según las estadísticas de PostgreSQL (pg_class.reltuples).
+    Devuelve None en otros motores o si la tabla aún no se ha analizado.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [queryset.model._meta.db_table])
+        fila = cursor.fetchone()
+    return fila[0] if fila and fila[0] > 0 else None
+
+
+class PaginadorConteoEstimado(Paginator):
+    """
+    Paginator para listados de tablas con millones de filas (auditoría, notificaciones).
+    Sin filtros usa la estimación del planificador en lugar de COUNT(*); con filtros
+    cuenta solo hasta LIMITE_CONTEO_FILTRADO filas.
+    """
+
+    @cached_property
+    def count(self):
+        if not isinstance(self.object_list, QuerySet):
+            return super().count
+        if not self.object_list.query.where:
+            estimadas = filas_estimadas(self.object_list)
+            if estimadas is not None and estimadas > UMBRAL_CONTEO_EXACTO:
+                return estimadas
+            return super().count
+        return self.object_list[:LIMITE_CONTEO_FILTRADO].count()
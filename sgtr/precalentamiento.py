@@ -0,0 +1,58 @@
+# sgtr/precalentamiento.py
+
+import logging
+
+from django.db import connections
+from django.template.loader import get_template
+from django.urls import get_resolver
+
+logger = logging.getLogger(__name__)
+
+# Plantillas de las páginas más visitadas (el loader en caché las compila una vez por proceso)
+PLANTILLAS = [
+    'base.html',
+    'registration/login.html',
+    'tickets/crear_ticket.html',
+    'tickets/lista_tickets.html',
+    'tickets/detalles_ticket.html',
+    'tickets/dashboard.html',
+    'partials/tabla_tickets.html',
+    'partials/contador_notificaciones.html',
+    'partials/lista_notificaciones.html',
+    'partials/advertencia_duplicado.html',
+    'bootstrap5/field.html',
+    'bootstrap5/layout/baseinput.html',
+]
+
+
+def precalentar_codigo():
+    """
+    Importa vistas y dependencias, resuelve el URLconf y compila las plantillas.
+    No toca la base de datos, así que se puede hacer en el proceso maestro antes
+    del fork y los workers lo heredan ya listo.
+    """
+    resolver = get_resolver()
+    resolver.reverse_dict  # Construye los índices de reverse()/resolve() e importa las vistas
+    for nombre in PLANTILLAS:
+        try:
+            get_template(nombre)
+        except Exception:
+            logger.warning("No se pudo precargar la plantilla %s", nombre, exc_info=True)
+
+
+def precalentar_datos():
+    """
+    Llena la caché compartida con los catálogos que consulta cada página. Se hace
+    en cada worker, tras el fork, y deja cerradas sus conexiones a la base de datos.
+    """
+    from tickets.catalogos import version_catalogo
+    from usuarios.permisos import miembros_de_grupo
+
+    try:
+        version_catalogo()
+        miembros_de_grupo('Service Line')
+    except Exception:
+        # Un worker sin caché caliente sigue siendo válido; no impedimos el arranque
+        logger.warning("No se pudieron precargar los catálogos", exc_info=True)
+    finally:
+        connections.close_all()
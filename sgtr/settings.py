@@ -29,7 +29,8 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = 'django-insecure-d17c_jl)q2x=))x95ps%8_2pw)@2jv(5(b99s^*45s42f5+@7t'
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+# En producción: DJANGO_DEBUG=0 (además desactiva los datos de prueba de `bootstrap`)
+DEBUG = os.environ.get('DJANGO_DEBUG', '1').lower() in ('1', 'true', 'yes')
 
 
 ALLOWED_HOSTS = ['*', 'localhost','127.0.0.1', '.ngrok-free.app']
@@ -51,6 +52,7 @@ INSTALLED_APPS = [
     'usuarios',
     'inventario',
     'tickets',
+    'tareas',
         # Apps de terceros
     'crispy_forms',
     'crispy_bootstrap5',
@@ -60,6 +62,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'sgtr.compresion.CompresionMiddleware',
+    'sgtr.staticfiles.EstaticosComprimidosMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django_htmx.middleware.HtmxMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -69,14 +73,40 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Respuestas más pequeñas que esto (en bytes) no se comprimen al vuelo
+COMPRESION_TAMANO_MINIMO = 500
+
+# Presupuesto de arranque de un worker (manage.py verificar_arranque). Las
+# dependencias pesadas solo se importan dentro de las exportaciones y reportes.
+ARRANQUE_PRESUPUESTO = {
+    'importacion_ms': int(os.environ.get('ARRANQUE_PRESUPUESTO_MS', 1000)),
+    'rss_mb': int(os.environ.get('ARRANQUE_PRESUPUESTO_RSS_MB', 80)),
+    'modulos_prohibidos': ['openpyxl', 'weasyprint'],
+}
+
+# Cola de tareas (manage.py run_worker): una tarea que pasa de este tiempo
+# ejecutándose se considera huérfana (worker caído) y se reintenta
+TAREAS_TIEMPO_MAXIMO = int(os.environ.get('TAREAS_TIEMPO_MAXIMO', 1800))  # segundos
+
+# Sistema de mantenimiento corporativo (manage.py sincronizar_tickets_externos).
+# Con una fuente configurada (archivo o URL de un volcado NDJSON/CSV) se sincroniza cada hora.
+SINCRONIZACION_EXTERNA_FUENTE = os.environ.get('SINCRONIZACION_EXTERNA_FUENTE', '')
+SINCRONIZACION_EXTERNA_USUARIO = os.environ.get('SINCRONIZACION_EXTERNA_USUARIO', 'integracion')
+
 ROOT_URLCONF = 'sgtr.urls'
 
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'], # <-- MODIFICA ESTA LÍNEA
-        'APP_DIRS': True,
         'OPTIONS': {
+            # Plantillas compiladas una sola vez por worker
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -95,11 +125,47 @@ WSGI_APPLICATION = 'sgtr.wsgi.application'
 
 # sgtr/settings.py
 
+# Conexiones persistentes con verificación de salud antes de reutilizarlas
+CONN_MAX_AGE = int(os.environ.get("CONN_MAX_AGE", 600))
+
 DATABASES = {
     "default": dj_database_url.config(
-        default=os.environ.get("DATABASE_URL")
+        default=os.environ.get("DATABASE_URL"),
+        conn_max_age=CONN_MAX_AGE,
+        conn_health_checks=True,
+    )
+}
+
+# Réplica de solo lectura para dashboards y exportaciones (opcional).
+# En local puede ser una segunda base SQLite o Postgres, por ejemplo:
+#   DATABASE_REPLICA_URL=sqlite:///replica.sqlite3 python manage.py migrate --database=replica
+if os.environ.get("DATABASE_REPLICA_URL"):
+    DATABASES["replica"] = dj_database_url.config(
+        env="DATABASE_REPLICA_URL",
+        conn_max_age=CONN_MAX_AGE,
+        conn_health_checks=True,
     )
+    # En las pruebas la réplica apunta al primario
+    DATABASES["replica"]["TEST"] = {"MIRROR": "default"}
+
+DATABASE_ROUTERS = ['sgtr.db_routers.ReplicaRouter']
+
+# Caché compartida entre los workers y el worker de tareas (permisos, catálogos, filas de la lista...).
+# En producción es Redis (ver docker-compose.yml); en local basta la caché en archivos.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', '/tmp/sgtr_cache'),
+    }
 }
+if CACHES['default']['BACKEND'].endswith('FileBasedCache'):
+    # Con el límite por defecto (300) cada set borraría al azar un tercio de los archivos,
+    # incluidas las claves de versión (catálogo, permisos, ubicaciones)
+    CACHES['default']['OPTIONS'] = {'MAX_ENTRIES': int(os.environ.get('CACHE_MAX_ENTRIES', 50_000))}
+
+# Permisos y grupos de cada usuario en caché (se invalidan con señales en usuarios/signals.py)
+AUTHENTICATION_BACKENDS = ['usuarios.permisos.PermisosEnCacheBackend']
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -134,7 +200,28 @@ USE_TZ = True
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
-STATIC_URL = 'static/'
+STATIC_URL = '/static/'
+
+# Aquí le decimos a Django que busque una carpeta llamada 'static' en la raíz del proyecto
+STATICFILES_DIRS = [
+    BASE_DIR / 'static',
+]
+
+# Destino de collectstatic; EstaticosComprimidosMiddleware lo sirve desde la aplicación
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# Archivos generados por la aplicación (reportes PDF). No se publican: se descargan con permiso
+MEDIA_ROOT = Path(os.environ.get('MEDIA_ROOT', BASE_DIR / 'media'))
+
+# Nombres con hash de contenido y variantes .br/.gz generadas en collectstatic
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'sgtr.staticfiles.ComprimidoManifestStaticFilesStorage',
+    },
+}
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -153,19 +240,3 @@ LOGIN_REDIRECT_URL =  '/tickets/lista/'
 
 # Imprime los correos en la consola en lugar de enviarlos
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
-
-STATICFILES_DIRS = [
-    BASE_DIR / 'static',
-]
-
-
-
-
-import os
-
-STATIC_URL = '/static/'
-
-# Aquí le decimos a Django que busque una carpeta llamada 'static' en la raíz del proyecto
-STATICFILES_DIRS = [
-    os.path.join(BASE_DIR, "static"),
-]
\ No newline at end of file
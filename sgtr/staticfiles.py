@@ -0,0 +1,152 @@
+# sgtr/staticfiles.py
+
+import gzip
+import mimetypes
+import os
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, staticfiles_storage
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+from .compresion import codificaciones_aceptadas
+
+try:
+    import brotli
+except ImportError:  # Sin brotli solo se generan variantes .gz
+    brotli = None
+
+try:
+    import zopfli.gzip
+except ImportError:  # Sin zopfli se usa gzip de la biblioteca estándar
+    zopfli = None
+
+# Solo vale la pena comprimir texto; imágenes y fuentes ya vienen comprimidas
+EXTENSIONES_COMPRIMIBLES = ('.js', '.css', '.map', '.svg', '.html', '.txt', '.json', '.xml')
+TAMANO_MINIMO_COMPRESION = 512  # bytes
+# Un nombre con hash de contenido nunca cambia: el navegador puede guardarlo un año
+CACHE_INMUTABLE = 'public, max-age=31536000, immutable'
+CACHE_SIN_HASH = 'public, max-age=60'
+
+
+def _comprimir_gzip(contenido):
+    if zopfli is not None:
+        return zopfli.gzip.compress(contenido)
+    return gzip.compress(contenido, compresslevel=9, mtime=0)
+
+
+class ComprimidoManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Manifest con nombres con hash de contenido y, además, variantes precomprimidas
+    .br (Brotli) y .gz (zopfli) de cada archivo de texto, generadas en collectstatic.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        procesados = set()
+        for name, hashed_name, processed in super().post_process(paths, dry_run, **options):
+            if hashed_name and not isinstance(processed, Exception):
+                procesados.add(hashed_name)
+            yield name, hashed_name, processed
+
+        if dry_run:
+            return
+        for name in sorted(procesados):
+            if name.endswith(EXTENSIONES_COMPRIMIBLES):
+                self._generar_variantes(name)
+
+    def _generar_variantes(self, name):
+        ruta = self.path(name)
+        with open(ruta, 'rb') as archivo:
+            contenido = archivo.read()
+        if len(contenido) < TAMANO_MINIMO_COMPRESION:
+            return
+
+        variantes = {'.gz': _comprimir_gzip(contenido)}
+        if brotli is not None:
+            variantes['.br'] = brotli.compress(contenido, quality=11)
+        for extension, comprimido in variantes.items():
+            # Si la variante no ahorra bytes no la escribimos
+            if len(comprimido) < len(contenido):
+                with open(ruta + extension, 'wb') as archivo:
+                    archivo.write(comprimido)
+
+
+class EstaticosComprimidosMiddleware:
+    """
+    Sirve STATIC_ROOT desde la propia aplicación, antes de sesiones y autenticación.
+    Negocia la variante .br/.gz según Accept-Encoding y marca como inmutables los
+    archivos con hash de contenido.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.prefijo = settings.STATIC_URL if settings.STATIC_URL.startswith('/') else '/' + settings.STATIC_URL
+        self.raiz = str(settings.STATIC_ROOT)
+        self._nombres_con_hash = None
+        # Bajo ASGI evitamos forzar el cambio a hilo síncrono en cada petición
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if self._es_estatico(request):
+            return self._servir(request, request.path[len(self.prefijo):]) or self.get_response(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        if self._es_estatico(request):
+            # os.stat y la lectura del archivo bloquean: se hacen en un hilo, fuera del event loop
+            response = await sync_to_async(self._servir, thread_sensitive=False)(
+                request, request.path[len(self.prefijo):]
+            )
+            if response is not None:
+                return response
+        return await self.get_response(request)
+
+    def _es_estatico(self, request):
+        return request.method in ('GET', 'HEAD') and request.path.startswith(self.prefijo)
+
+    def nombres_con_hash(self):
+        # El manifest se lee una sola vez por worker
+        if self._nombres_con_hash is None:
+            self._nombres_con_hash = set(getattr(staticfiles_storage, 'hashed_files', {}).values())
+        return self._nombres_con_hash
+
+    def _servir(self, request, nombre):
+        try:
+            ruta = safe_join(self.raiz, nombre)
+        except SuspiciousFileOperation:
+            return None
+        if not os.path.isfile(ruta):
+            return None
+
+        stat = os.stat(ruta)
+        if not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'), stat.st_mtime):
+            return HttpResponseNotModified()
+
+        content_type, _ = mimetypes.guess_type(ruta)
+        # Respeta q=0 y compara tokens completos, igual que la compresión dinámica
+        aceptadas = codificaciones_aceptadas(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        ruta_servida, codificacion = ruta, None
+        for extension, nombre_codificacion in (('.br', 'br'), ('.gz', 'gzip')):
+            if nombre_codificacion in aceptadas and os.path.isfile(ruta + extension):
+                ruta_servida, codificacion = ruta + extension, nombre_codificacion
+                break
+
+        # Los estáticos son pequeños: se leen completos en vez de usar una respuesta en streaming
+        with open(ruta_servida, 'rb') as archivo:
+            response = HttpResponse(archivo.read(), content_type=content_type or 'application/octet-stream')
+        if codificacion:
+            response['Content-Encoding'] = codificacion
+        response['Vary'] = 'Accept-Encoding'
+        response['Last-Modified'] = http_date(stat.st_mtime)
+        response['Cache-Control'] = CACHE_INMUTABLE if nombre in self.nombres_con_hash() else CACHE_SIN_HASH
+        return response
@@ -0,0 +1,250 @@
+// static/js/cola_tickets.js
+
+// Cola de tickets para terminales sin conexión estable.
+// Sin red, el formulario de crear ticket se guarda en localStorage con una clave
+// UUID y se envía por lotes a /tickets/api/lote/ al recuperar la conexión. El
+// servidor ignora las claves ya recibidas, así que reenviar un lote es seguro.
+
+(function () {
+    const COLA_KEY = 'sgtr:cola_tickets';
+    const RECHAZADOS_KEY = 'sgtr:cola_tickets_rechazados';
+    const CATALOGO_KEY = 'sgtr:catalogo_captura';
+    const MAXIMO_POR_LOTE = 200;  // Igual que MAXIMO_TICKETS_LOTE en tickets/lotes.py
+    const INTERVALO_ENVIO_MS = 30000;
+    const MAXIMO_RESULTADOS_BUSQUEDA = 20;
+
+    let enviando = false;
+
+    function leer(key, porDefecto) {
+        try {
+            return JSON.parse(localStorage.getItem(key)) ?? porDefecto;
+        } catch (e) {
+            return porDefecto;
+        }
+    }
+
+    function guardar(key, valor) {
+        localStorage.setItem(key, JSON.stringify(valor));
+    }
+
+    function avisar(tipo, texto) {
+        // Mismo evento que usan las respuestas HTMX (ver base.html)
+        document.body.dispatchEvent(new CustomEvent('showToast', { detail: { type: tipo, text: texto } }));
+    }
+
+    function nuevaClave() {
+        if (window.crypto && crypto.randomUUID) {
+            return crypto.randomUUID();
+        }
+        // randomUUID solo existe en contextos seguros (HTTPS); UUID v4 con getRandomValues
+        const bytes = crypto.getRandomValues(new Uint8Array(16));
+        bytes[6] = (bytes[6] & 0x0f) | 0x40;
+        bytes[8] = (bytes[8] & 0x3f) | 0x80;
+        const hex = Array.from(bytes, b => b.toString(16).padStart(2, '0')).join('');
+        return `${hex.slice(0, 8)}-${hex.slice(8, 12)}-${hex.slice(12, 16)}-${hex.slice(16, 20)}-${hex.slice(20)}`;
+    }
+
+    function actualizarContador() {
+        const badge = document.getElementById('cola-offline-pendientes');
+        if (!badge) return;
+        const pendientes = leer(COLA_KEY, []).length;
+        badge.textContent = `${pendientes} pendiente${pendientes === 1 ? '' : 's'} de enviar`;
+        badge.classList.toggle('d-none', pendientes === 0);
+    }
+
+    // --- Envío de la cola ---
+
+    async function enviarCola(config) {
+        if (enviando || !navigator.onLine) return;
+        const cola = leer(COLA_KEY, []);
+        if (!cola.length) return;
+        enviando = true;
+        try {
+            const lote = cola.slice(0, MAXIMO_POR_LOTE);
+            const respuesta = await fetch(config.urlLote, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json', 'X-CSRFToken': config.csrf },
+                body: JSON.stringify({ tickets: lote }),
+                credentials: 'same-origin',
+            });
+            // 409 o errores del servidor: la cola se conserva y se reintenta después
+            if (!respuesta.ok) return;
+            const { resultados } = await respuesta.json();
+
+            const procesadas = new Set();
+            const rechazados = leer(RECHAZADOS_KEY, []);
+            let creados = 0;
+            resultados.forEach((resultado, i) => {
+                procesadas.add(lote[i].clave);
+                if (resultado.estado === 'creado') creados += 1;
+                if (resultado.estado === 'rechazado') {
+                    rechazados.push({ ...lote[i], error: resultado.error });
+                }
+            });
+            guardar(RECHAZADOS_KEY, rechazados);
+            // La cola pudo crecer mientras se enviaba: se relee antes de quitar lo procesado
+            guardar(COLA_KEY, leer(COLA_KEY, []).filter(item => !procesadas.has(item.clave)));
+
+            if (creados) avisar('success', `${creados} ticket(s) de la cola enviados.`);
+            const nuevosRechazos = resultados.filter(r => r.estado === 'rechazado');
+            if (nuevosRechazos.length) {
+                avisar('error', `${nuevosRechazos.length} ticket(s) rechazados: ${nuevosRechazos[0].error}`);
+            }
+        } catch (e) {
+            // Sin red a pesar de navigator.onLine: se reintenta en el siguiente intervalo
+        } finally {
+            enviando = false;
+            actualizarContador();
+        }
+        if (leer(COLA_KEY, []).length > 0 && navigator.onLine) {
+            setTimeout(() => enviarCola(config), 0);
+        }
+    }
+
+    // --- Catálogo en caché ---
+
+    async function actualizarCatalogo(config) {
+        if (!navigator.onLine) return;
+        const guardado = leer(CATALOGO_KEY, null);
+        const headers = guardado && guardado.etag ? { 'If-None-Match': guardado.etag } : {};
+        try {
+            const respuesta = await fetch(config.urlCatalogos, { headers, credentials: 'same-origin' });
+            if (respuesta.status === 304 || !respuesta.ok) return;
+            guardar(CATALOGO_KEY, { etag: respuesta.headers.get('ETag'), datos: await respuesta.json() });
+        } catch (e) {
+            // Se sigue con la copia guardada
+        }
+    }
+
+    function catalogo() {
+        const guardado = leer(CATALOGO_KEY, null);
+        return guardado ? guardado.datos : null;
+    }
+
+    function opcion(valor, texto) {
+        const elemento = document.createElement('option');
+        elemento.value = valor;
+        elemento.textContent = texto;
+        return elemento;
+    }
+
+    function llenarSelect(select, vacio, opciones) {
+        select.replaceChildren(opcion('', vacio), ...opciones.map(([valor, texto]) => opcion(valor, texto)));
+    }
+
+    function bandasDe(nave) {
+        const datos = catalogo();
+        const encontrada = datos && datos.ubicaciones.find(([nombre]) => nombre === nave);
+        return encontrada ? encontrada[1] : [];
+    }
+
+    // Sin conexión el selector en cascada se llena con el árbol guardado en lugar de HTMX
+    function prepararUbicacionOffline() {
+        const nave = document.getElementById('id_nave');
+        const banda = document.getElementById('id_banda');
+        const ubicacion = document.getElementById('id_ubicacion');
+        if (!nave || !banda || !ubicacion) return;
+
+        nave.addEventListener('change', () => {
+            if (navigator.onLine || !catalogo()) return;
+            llenarSelect(banda, 'Seleccionar Banda', bandasDe(nave.value).map(([b]) => [b, b]));
+            llenarSelect(ubicacion, 'Seleccionar Tacto / Operación', []);
+        });
+        banda.addEventListener('change', () => {
+            if (navigator.onLine || !catalogo()) return;
+            const encontrada = bandasDe(nave.value).find(([b]) => b === banda.value);
+            llenarSelect(ubicacion, 'Seleccionar Tacto / Operación', encontrada ? encontrada[1] : []);
+        });
+    }
+
+    // Sin conexión la búsqueda filtra las herramientas guardadas y pinta el mismo
+    // marcado que partials/search_results.html para reutilizar selectTool()
+    function prepararBusquedaOffline() {
+        const busqueda = document.getElementById('id_text_search');
+        const resultados = document.getElementById('search-results');
+        if (!busqueda || !resultados) return;
+
+        busqueda.addEventListener('keyup', () => {
+            const datos = catalogo();
+            if (navigator.onLine || !datos) return;
+            const texto = busqueda.value.trim().toLowerCase();
+            if (!texto) {
+                resultados.replaceChildren();
+                return;
+            }
+            const encontradas = datos.herramientas.filter(h =>
+                (h.numero_serie || '').toLowerCase().includes(texto) || (h.modelo || '').toLowerCase().includes(texto)
+            ).slice(0, MAXIMO_RESULTADOS_BUSQUEDA);
+
+            resultados.replaceChildren(...encontradas.map(h => {
+                const enlace = document.createElement('a');
+                enlace.href = '#';
+                enlace.className = 'list-group-item list-group-item-action';
+                enlace.textContent = `${h.modelo || 'N/A'} - S/N: ${h.numero_serie}`;
+                enlace.dataset.toolPk = h.pk;
+                enlace.dataset.toolName = enlace.textContent;
+                enlace.dataset.toolModelo = h.modelo || '';
+                enlace.dataset.toolFabricante = h.fabricante || '';
+                enlace.dataset.toolSerie = h.numero_serie || '';
+                enlace.dataset.toolReparacion = h.numero_reparacion || '';
+                enlace.addEventListener('click', (evento) => {
+                    evento.preventDefault();
+                    selectTool(enlace);
+                });
+                return enlace;
+            }));
+        });
+    }
+
+    // --- Captura ---
+
+    function encolarFormulario(form) {
+        const datos = new FormData(form);
+        if (!datos.get('herramienta')) {
+            avisar('error', 'Selecciona una herramienta antes de guardar.');
+            return false;
+        }
+        const cola = leer(COLA_KEY, []);
+        cola.push({
+            clave: nuevaClave(),
+            herramienta: datos.get('herramienta'),
+            ubicacion: datos.get('ubicacion') || null,
+            falla: datos.get('falla') || null,
+            comentarios: datos.get('comentarios') || '',
+            capturado_en: new Date().toISOString(),
+        });
+        guardar(COLA_KEY, cola);
+        return true;
+    }
+
+    document.addEventListener('DOMContentLoaded', function () {
+        const contenedor = document.getElementById('cola-offline');
+        if (!contenedor) return;
+        const form = contenedor.querySelector('form');
+        const config = {
+            urlLote: contenedor.dataset.urlLote,
+            urlCatalogos: contenedor.dataset.urlCatalogos,
+            csrf: form.querySelector('[name=csrfmiddlewaretoken]').value,
+        };
+
+        form.addEventListener('submit', (evento) => {
+            if (navigator.onLine) return;
+            evento.preventDefault();
+            if (encolarFormulario(form)) {
+                form.reset();
+                document.getElementById('id_herramienta').value = '';
+                actualizarContador();
+                avisar('info', 'Sin conexión: el ticket se guardó y se enviará al recuperar la red.');
+            }
+        });
+
+        prepararUbicacionOffline();
+        prepararBusquedaOffline();
+        actualizarContador();
+        actualizarCatalogo(config);
+        enviarCola(config);
+
+        window.addEventListener('online', () => enviarCola(config));
+        setInterval(() => enviarCola(config), INTERVALO_ENVIO_MS);
+    });
+})();
@@ -0,0 +1,7 @@
+# tareas/admin.py
+
+from django.contrib import admin
+from .models import SemillaAplicada, Tarea
+
+admin.site.register(Tarea)
+admin.site.register(SemillaAplicada)
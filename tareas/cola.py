@@ -0,0 +1,123 @@
+# tareas/cola.py
+
+import datetime
+import logging
+import random
+import traceback
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Tarea
+from .registro import TAREAS, programar_siguiente
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# EJECUCIÓN DE TAREAS
+# ==============================================================================
+# Reintentos con espera exponencial: 30 s, 60 s, 120 s... hasta una hora, con
+# variación aleatoria para que los fallos simultáneos no se reintenten en bloque.
+ESPERA_BASE_SEGUNDOS = 30
+ESPERA_MAXIMA_SEGUNDOS = 3600
+
+
+def espera_reintento(intentos):
+    segundos = min(ESPERA_BASE_SEGUNDOS * 2 ** (intentos - 1), ESPERA_MAXIMA_SEGUNDOS)
+    return datetime.timedelta(seconds=segundos * random.uniform(0.75, 1.25))
+
+
+def reclamar(limite, trabajador):
+    """
+    Toma hasta `limite` tareas vencidas y las marca como ejecutando.
+    En PostgreSQL usa FOR UPDATE SKIP LOCKED: varios workers nunca toman la misma
+    tarea ni se bloquean entre sí. En SQLite, que no lo soporta, cada tarea se
+    toma con un UPDATE condicional (las escrituras ya van serializadas).
+    """
+    ahora = timezone.now()
+    vencidas = (
+        Tarea.objects.filter(estado=Tarea.ESTADO_PENDIENTE, ejecutar_en__lte=ahora)
+        .order_by('ejecutar_en', 'pk')
+        .values_list('pk', flat=True)
+    )
+    marcar = {
+        'estado': Tarea.ESTADO_EJECUTANDO,
+        'trabajador': trabajador,
+        'fecha_inicio': ahora,
+        'intentos': F('intentos') + 1,
+    }
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            pks = list(vencidas.select_for_update(skip_locked=True)[:limite])
+            Tarea.objects.filter(pk__in=pks).update(**marcar)
+    else:
+        pks = [
+            pk for pk in vencidas[:limite]
+            if Tarea.objects.filter(pk=pk, estado=Tarea.ESTADO_PENDIENTE).update(**marcar)
+        ]
+    return list(Tarea.objects.filter(pk__in=pks).order_by('ejecutar_en', 'pk'))
+
+
+def ejecutar(tarea):
+    """
+    Ejecuta una tarea ya reclamada y registra el resultado (o programa el reintento).
+    """
+    definicion = TAREAS.get(tarea.nombre)
+    error = None
+    try:
+        if definicion is None:
+            raise LookupError(f"Tarea no registrada: {tarea.nombre}")
+        definicion.funcion(**tarea.argumentos)
+    except Exception:
+        logger.exception("La tarea %s (%s) falló en el intento %s", tarea.pk, tarea.nombre, tarea.intentos)
+        error = traceback.format_exc()
+
+    # Liberar la clave y encolar la siguiente ejecución van en la misma transacción:
+    # si no, programar_periodicas podría encolar en medio otra ejecución inmediata
+    with transaction.atomic():
+        if error is None:
+            Tarea.objects.filter(pk=tarea.pk).update(
+                estado=Tarea.ESTADO_COMPLETADA, clave=None, error='', fecha_fin=timezone.now()
+            )
+            terminada = True
+        else:
+            terminada = _registrar_fallo(tarea, error)
+
+        if terminada and definicion is not None and definicion.cada:
+            programar_siguiente(definicion, tarea.fecha_inicio)
+
+
+def _registrar_fallo(tarea, error):
+    """
+    Devuelve True si la tarea agotó sus intentos y queda como fallida.
+    """
+    error = error[-4000:]
+    if tarea.intentos < tarea.max_intentos:
+        Tarea.objects.filter(pk=tarea.pk).update(
+            estado=Tarea.ESTADO_PENDIENTE,
+            ejecutar_en=timezone.now() + espera_reintento(tarea.intentos),
+            error=error,
+        )
+        return False
+    Tarea.objects.filter(pk=tarea.pk).update(
+        estado=Tarea.ESTADO_FALLIDA, clave=None, error=error, fecha_fin=timezone.now()
+    )
+    return True
+
+
+def recuperar_huerfanas():
+    """
+    Devuelve a la cola las tareas de un worker que murió a mitad de la ejecución.
+    """
+    limite = timezone.now() - datetime.timedelta(seconds=getattr(settings, 'TAREAS_TIEMPO_MAXIMO', 1800))
+    huerfanas = Tarea.objects.filter(estado=Tarea.ESTADO_EJECUTANDO, fecha_inicio__lt=limite)
+    recuperadas = huerfanas.filter(intentos__lt=F('max_intentos')).update(
+        estado=Tarea.ESTADO_PENDIENTE, error='Tiempo máximo de ejecución excedido'
+    )
+    huerfanas.update(
+        estado=Tarea.ESTADO_FALLIDA, clave=None, error='Tiempo máximo de ejecución excedido', fecha_fin=timezone.now()
+    )
+    return recuperadas
@@ -0,0 +1,63 @@
+# tareas/management/commands/bootstrap.py
+
+import hashlib
+import time
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from tareas.models import SemillaAplicada
+
+# Pasos de carga inicial, en orden: (comando, versión, archivos de entrada, solo datos de prueba).
+# Sube la versión de un paso cuando cambie lo que carga su comando para que se vuelva a ejecutar.
+PASOS = [
+    ('import_herramientas', 1, ['Herramientas.csv'], False),
+    ('import_colaboradores', 1, ['Colaborador.csv'], False),
+    ('poblar_ubicaciones', 1, [], False),
+    ('generar_tickets_falsos', 1, [], True),
+]
+
+
+def huella_paso(comando, version, archivos):
+    huella = hashlib.sha256(f"{comando}|v{version}".encode())
+    for nombre in archivos:
+        with open(settings.BASE_DIR / nombre, 'rb') as archivo:
+            huella.update(hashlib.file_digest(archivo, 'sha256').digest())
+    return huella.hexdigest()
+
+
+class Command(BaseCommand):
+    help = 'Carga los datos iniciales una sola vez: omite los pasos cuya huella (archivo y versión) no cambió.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--datos-prueba', action='store_true', help='Incluye los tickets falsos (solo con DEBUG activo).')
+        parser.add_argument('--forzar', action='store_true', help='Ejecuta todos los pasos aunque su huella no haya cambiado.')
+
+    def handle(self, *args, **options):
+        start_time = time.time()
+        aplicadas = dict(SemillaAplicada.objects.values_list('paso', 'huella'))
+        ejecutados = 0
+
+        for comando, version, archivos, solo_prueba in PASOS:
+            if solo_prueba and not (options['datos_prueba'] and settings.DEBUG):
+                if options['datos_prueba']:
+                    self.stdout.write(self.style.WARNING(f"{comando}: omitido, los datos de prueba no se cargan con DEBUG desactivado."))
+                continue
+
+            faltantes = [nombre for nombre in archivos if not (settings.BASE_DIR / nombre).is_file()]
+            if faltantes:
+                # No se registra: se intentará de nuevo cuando el archivo exista
+                self.stdout.write(self.style.ERROR(f"{comando}: omitido, falta {', '.join(faltantes)}."))
+                continue
+
+            huella = huella_paso(comando, version, archivos)
+            if aplicadas.get(comando) == huella and not options['forzar']:
+                self.stdout.write(f"{comando}: sin cambios.")
+                continue
+
+            self.stdout.write(f"{comando}: ejecutando...")
+            call_command(comando, stdout=self.stdout, stderr=self.stderr)
+            SemillaAplicada.objects.update_or_create(paso=comando, defaults={'huella': huella})
+            ejecutados += 1
+
+        duracion = round(time.time() - start_time, 2)
+        self.stdout.write(self.style.SUCCESS(f"Carga inicial lista: {ejecutados} pasos ejecutados en {duracion} segundos."))
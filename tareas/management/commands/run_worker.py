@@ -0,0 +1,80 @@
+# tareas/management/commands/run_worker.py
+
+import os
+import signal
+import socket
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from tareas.cola import ejecutar, reclamar, recuperar_huerfanas
+from tareas.registro import TAREAS, programar_periodicas
+
+# Cada cuánto se revisan tareas huérfanas y periódicas sin programar
+INTERVALO_MANTENIMIENTO = 60  # segundos
+
+
+def _ejecutar_en_hilo(tarea):
+    # Cada hilo usa su propia conexión; se cierra al terminar para no acumularlas
+    try:
+        ejecutar(tarea)
+    finally:
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = 'Ejecuta las tareas encoladas en la base de datos (reportes, métricas, etc.).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrencia', type=int, default=2, help='Tareas ejecutadas a la vez (hilos).')
+        parser.add_argument('--intervalo', type=float, default=2.0, help='Segundos de espera cuando la cola está vacía.')
+        parser.add_argument('--una-vez', action='store_true', help='Procesa lo pendiente y termina (útil en cron).')
+
+    def handle(self, *args, **options):
+        concurrencia = max(options['concurrencia'], 1)
+        intervalo = options['intervalo']
+        trabajador = f"{socket.gethostname()}:{os.getpid()}"
+        self.detener = False
+        signal.signal(signal.SIGTERM, self._detener)
+        signal.signal(signal.SIGINT, self._detener)
+
+        self.stdout.write(f"Worker {trabajador} con {concurrencia} hilos. Tareas registradas: {', '.join(sorted(TAREAS))}")
+        ultimo_mantenimiento = 0
+        procesadas = 0
+        en_curso = set()
+
+        with ThreadPoolExecutor(max_workers=concurrencia) as ejecutor:
+            while not self.detener:
+                if time.monotonic() - ultimo_mantenimiento > INTERVALO_MANTENIMIENTO:
+                    recuperadas = recuperar_huerfanas()
+                    if recuperadas:
+                        self.stdout.write(self.style.WARNING(f"{recuperadas} tareas huérfanas devueltas a la cola."))
+                    if not options['una_vez']:
+                        programar_periodicas()
+                    ultimo_mantenimiento = time.monotonic()
+
+                close_old_connections()
+                libres = concurrencia - len(en_curso)
+                nuevas = reclamar(libres, trabajador) if libres else []
+                for tarea in nuevas:
+                    en_curso.add(ejecutor.submit(_ejecutar_en_hilo, tarea))
+                procesadas += len(nuevas)
+
+                if not en_curso:
+                    if options['una_vez']:
+                        break
+                    time.sleep(intervalo)
+                    continue
+                # Esperamos a que se libere un hilo o a que toque volver a sondear
+                _, en_curso = wait(en_curso, timeout=intervalo, return_when=FIRST_COMPLETED)
+
+            # Al detenerse se terminan las tareas ya reclamadas
+            wait(en_curso)
+
+        self.stdout.write(self.style.SUCCESS(f"Worker detenido. Tareas procesadas: {procesadas}."))
+
+    def _detener(self, signum, frame):
+        self.stdout.write("Deteniendo el worker al terminar las tareas en curso...")
+        self.detener = True
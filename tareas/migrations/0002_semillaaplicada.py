@@ -0,0 +1,26 @@
+# Generated by Django 5.2.6 on 2026-10-19 13:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tareas', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SemillaAplicada',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('paso', models.CharField(max_length=100, unique=True)),
+                ('huella', models.CharField(max_length=64)),
+                ('fecha_aplicacion', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Semilla Aplicada',
+                'verbose_name_plural': 'Semillas Aplicadas',
+            },
+        ),
+    ]
@@ -0,0 +1,61 @@
+# tareas/models.py
+
+from django.db import models
+from django.utils import timezone
+
+class Tarea(models.Model):
+    """
+    Trabajo encolado en la base de datos y ejecutado por `manage.py run_worker`.
+    """
+    ESTADO_PENDIENTE = 'pendiente'
+    ESTADO_EJECUTANDO = 'ejecutando'
+    ESTADO_COMPLETADA = 'completada'
+    ESTADO_FALLIDA = 'fallida'
+    ESTADO_CHOICES = [
+        (ESTADO_PENDIENTE, 'Pendiente'),
+        (ESTADO_EJECUTANDO, 'Ejecutando'),
+        (ESTADO_COMPLETADA, 'Completada'),
+        (ESTADO_FALLIDA, 'Fallida'),
+    ]
+
+    nombre = models.CharField(max_length=100)
+    argumentos = models.JSONField(default=dict, blank=True)
+    # Evita encolar dos veces el mismo trabajo; se libera cuando la tarea termina
+    clave = models.CharField(max_length=200, unique=True, blank=True, null=True)
+    estado = models.CharField(max_length=20, choices=ESTADO_CHOICES, default=ESTADO_PENDIENTE)
+    intentos = models.PositiveIntegerField(default=0)
+    max_intentos = models.PositiveIntegerField(default=3)
+    ejecutar_en = models.DateTimeField(default=timezone.now)
+    trabajador = models.CharField(max_length=100, blank=True)
+    error = models.TextField(blank=True)
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_inicio = models.DateTimeField(blank=True, null=True)
+    fecha_fin = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"{self.nombre} ({self.get_estado_display()})"
+
+    class Meta:
+        indexes = [
+            # Lo que consulta el worker en cada sondeo
+            models.Index(fields=['estado', 'ejecutar_en']),
+        ]
+        ordering = ['-fecha_creacion']
+        verbose_name = 'Tarea'
+        verbose_name_plural = 'Tareas'
+
+class SemillaAplicada(models.Model):
+    """
+    Huella de cada paso de carga inicial ejecutado por `manage.py bootstrap`.
+    Si la huella no cambia (mismo archivo, misma versión del paso) no se repite.
+    """
+    paso = models.CharField(max_length=100, unique=True)
+    huella = models.CharField(max_length=64)
+    fecha_aplicacion = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.paso
+
+    class Meta:
+        verbose_name = 'Semilla Aplicada'
+        verbose_name_plural = 'Semillas Aplicadas'
@@ -0,0 +1,71 @@
+# tareas/registro.py
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import Tarea
+
+# Tareas conocidas por el worker: nombre -> DefinicionTarea
+TAREAS = {}
+
+
+class DefinicionTarea:
+    def __init__(self, nombre, funcion, reintentos, cada):
+        self.nombre = nombre
+        self.funcion = funcion
+        self.reintentos = reintentos
+        self.cada = cada
+
+    @property
+    def clave_periodica(self):
+        return f"periodica:{self.nombre}"
+
+
+def tarea(nombre=None, reintentos=3, cada=None):
+    """
+    Registra una función como tarea. Los argumentos se guardan como JSON, así que
+    deben ser valores simples (ids, fechas en texto...), nunca instancias de modelos.
+
+    `cada` (timedelta) la vuelve periódica: el worker la reprograma al terminar.
+    """
+    def decorador(funcion):
+        nombre_tarea = nombre or funcion.__name__
+        TAREAS[nombre_tarea] = DefinicionTarea(nombre_tarea, funcion, reintentos, cada)
+        return funcion
+    return decorador
+
+
+def encolar(nombre, argumentos=None, ejecutar_en=None, clave=None):
+    """
+    Crea una tarea pendiente. Si ya hay una viva con la misma `clave` devuelve esa.
+    Dentro de una transacción, la tarea solo es visible para el worker tras el commit.
+    """
+    definicion = TAREAS.get(nombre)
+    if definicion is None:
+        raise ValueError(f"Tarea no registrada: {nombre}")
+    try:
+        with transaction.atomic():
+            return Tarea.objects.create(
+                nombre=nombre,
+                argumentos=argumentos or {},
+                clave=clave,
+                max_intentos=definicion.reintentos + 1,
+                ejecutar_en=ejecutar_en or timezone.now(),
+            )
+    except IntegrityError:
+        if clave is None:
+            raise
+        return Tarea.objects.filter(clave=clave).first()
+
+
+def programar_periodicas():
+    """
+    Asegura que cada tarea periódica tenga su siguiente ejecución encolada.
+    """
+    for definicion in TAREAS.values():
+        if definicion.cada:
+            encolar(definicion.nombre, clave=definicion.clave_periodica)
+
+
+def programar_siguiente(definicion, desde):
+    encolar(definicion.nombre, clave=definicion.clave_periodica, ejecutar_en=desde + definicion.cada)
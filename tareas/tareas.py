@@ -0,0 +1,19 @@
+# tareas/tareas.py
+
+import datetime
+
+from django.utils import timezone
+
+from .models import Tarea
+from .registro import tarea
+
+# Historial que se conserva de tareas terminadas
+DIAS_HISTORIAL = 14
+
+
+@tarea(cada=datetime.timedelta(days=1))
+def purgar_tareas_terminadas():
+    limite = timezone.now() - datetime.timedelta(days=DIAS_HISTORIAL)
+    Tarea.objects.filter(
+        estado__in=[Tarea.ESTADO_COMPLETADA, Tarea.ESTADO_FALLIDA], fecha_fin__lt=limite
+    ).delete()
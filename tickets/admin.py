@@ -1,11 +1,111 @@
 # tickets/admin.py
 
-from django.contrib import admin
-from .models import Falla, TicketEstado, Ticket, AuditoriaTicket, Notificacion
-
-# Registramos todos los modelos de la app tickets.
-admin.site.register(Falla)
-admin.site.register(TicketEstado)
-admin.site.register(Ticket)
-admin.site.register(AuditoriaTicket)
-admin.site.register(Notificacion)
\ No newline at end of file
+from django.contrib import admin, messages
+from django.db.models import F, Q
+from sgtr.paginacion import PaginadorConteoEstimado
+from .estados import ESTADO_ABIERTO, ESTADO_CERRADO, ESTADO_EN_REPARACION, transicionar_tickets
+from .models import Falla, TicketEstado, Ticket, AuditoriaTicket, Notificacion, MetricaConfiabilidad, ReportePDF
+
+
+class BusquedaIndexadaMixin:
+    """
+    Búsqueda por igualdad exacta en columnas con índice (folio, número de serie...),
+    en lugar del icontains por defecto que recorre la tabla completa.
+    """
+    search_help_text = 'Búsqueda exacta por folio, número de serie o usuario.'
+
+    def get_search_results(self, request, queryset, search_term):
+        termino = search_term.strip()
+        if not termino:
+            return queryset, False
+        filtro = Q()
+        for campo in self.search_fields:
+            filtro |= Q(**{campo: termino})
+        return queryset.filter(filtro), False
+
+
+class TablaGrandeAdmin(admin.ModelAdmin):
+    # Sin COUNT(*) exactos: ni el de la paginación ni el total sin filtrar
+    paginator = PaginadorConteoEstimado
+    show_full_result_count = False
+    # El pk está indexado; ordenar por fecha obligaría a ordenar la tabla completa
+    ordering = ('-pk',)
+
+
+@admin.register(Falla)
+class FallaAdmin(admin.ModelAdmin):
+    list_display = ('codigo', 'descripcion')
+    search_fields = ('codigo', 'descripcion')
+
+
+@admin.register(TicketEstado)
+class TicketEstadoAdmin(admin.ModelAdmin):
+    search_fields = ('nombre',)
+
+
+@admin.register(Ticket)
+class TicketAdmin(BusquedaIndexadaMixin, TablaGrandeAdmin):
+    list_display = ('folio', 'estado', 'herramienta', 'ubicacion', 'creado_por', 'fecha_creacion', 'fecha_cierre')
+    list_select_related = ('estado', 'herramienta', 'ubicacion', 'creado_por')
+    list_filter = ('estado',)
+    search_fields = ('folio', 'numero_ticket_externo', 'herramienta__numero_serie')
+    autocomplete_fields = ('herramienta', 'ubicacion', 'falla', 'creado_por')
+    # Estado y fechas solo cambian con la máquina de estados (acciones de abajo): editarlos
+    # por separado dejaría, por ejemplo, un ticket Cerrado sin fecha_cierre que bloquea su herramienta
+    readonly_fields = ('estado', 'fecha_inicio_reparacion', 'fecha_cierre', 'version')
+    actions = ['pasar_a_en_reparacion', 'pasar_a_cerrado', 'pasar_a_abierto']
+
+    def save_model(self, request, obj, form, change):
+        if not change:
+            obj.estado = TicketEstado.objects.get(nombre=ESTADO_ABIERTO)
+        else:
+            # Igual que actualizar_con_version: los formularios abiertos con la versión anterior dan conflicto
+            obj.version = F('version') + 1
+        super().save_model(request, obj, form, change)
+        if change:
+            obj.refresh_from_db(fields=['version'])
+
+    def _transicionar(self, request, queryset, nombre_estado):
+        estado = TicketEstado.objects.get(nombre=nombre_estado)
+        ids = list(queryset.values_list('pk', flat=True))
+        cambiados = transicionar_tickets(ids, estado, request.user, accion='Cambio de estado (admin)')
+        self.message_user(request, f"{len(cambiados)} ticket(s) pasaron a '{nombre_estado}'.", messages.SUCCESS)
+        if len(cambiados) < len(ids):
+            self.message_user(
+                request,
+                f"{len(ids) - len(cambiados)} ticket(s) no admiten esa transición o su herramienta ya tiene otro ticket abierto.",
+                messages.WARNING,
+            )
+
+    @admin.action(description="Pasar a 'En Reparación'")
+    def pasar_a_en_reparacion(self, request, queryset):
+        self._transicionar(request, queryset, ESTADO_EN_REPARACION)
+
+    @admin.action(description="Pasar a 'Cerrado'")
+    def pasar_a_cerrado(self, request, queryset):
+        self._transicionar(request, queryset, ESTADO_CERRADO)
+
+    @admin.action(description="Reabrir (pasar a 'Abierto')")
+    def pasar_a_abierto(self, request, queryset):
+        self._transicionar(request, queryset, ESTADO_ABIERTO)
+
+
+@admin.register(AuditoriaTicket)
+class AuditoriaTicketAdmin(BusquedaIndexadaMixin, TablaGrandeAdmin):
+    list_display = ('ticket', 'accion', 'campo_modificado', 'valor_anterior', 'valor_nuevo', 'usuario', 'fecha')
+    list_select_related = ('ticket__estado', 'usuario')
+    search_fields = ('ticket__folio', 'usuario__username')
+    autocomplete_fields = ('ticket', 'usuario')
+
+
+@admin.register(Notificacion)
+class NotificacionAdmin(BusquedaIndexadaMixin, TablaGrandeAdmin):
+    list_display = ('mensaje', 'usuario_destino', 'ticket', 'leido', 'fecha_creacion')
+    list_select_related = ('usuario_destino', 'ticket__estado')
+    list_filter = ('leido',)
+    search_fields = ('ticket__folio', 'usuario_destino__username')
+    autocomplete_fields = ('usuario_destino', 'ticket')
+
+
+admin.site.register(MetricaConfiabilidad)
+admin.site.register(ReportePDF)
@@ -0,0 +1,202 @@
+# tickets/api.py
+
+import base64
+import json
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.contrib.auth import aauthenticate, authenticate
+from django.db import IntegrityError
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.http import etag, require_GET, require_POST
+
+from sgtr.compresion import comprimir_flujo, elegir_codificacion
+from sgtr.db_routers import alias_analitico
+from inventario import jerarquia
+from .catalogos import catalogo_captura, version_catalogo
+from .exportaciones import campos_ndjson, lineas_ndjson
+from .lotes import MAXIMO_TICKETS_LOTE, crear_lote
+from .models import ReportePDF, TicketEstado
+from .filtros import filtros_de_peticion, tickets_filtrados
+from .sincronizacion import MarcaCaducada, cambios_desde
+
+# ==============================================================================
+# API PARA CLIENTES EXTERNOS (BI, integraciones)
+# ==============================================================================
+# Los scripts no tienen sesión de navegador: además de la sesión se acepta HTTP
+# Basic con un usuario de Django. Sin credenciales se responde 401 en JSON en
+# lugar de redirigir a la página de login.
+
+
+def _credenciales_basic(request):
+    tipo, _, valor = request.headers.get('Authorization', '').partition(' ')
+    if tipo.lower() != 'basic' or not valor:
+        return None
+    try:
+        usuario, separador, clave = base64.b64decode(valor).decode().partition(':')
+    except (ValueError, UnicodeDecodeError):
+        return None
+    return (usuario, clave) if separador else None
+
+
+def _no_autenticado():
+    response = JsonResponse({'error': 'Autenticación requerida'}, status=401)
+    response['WWW-Authenticate'] = 'Basic realm="sgtr"'
+    return response
+
+
+def _asignar_usuario(request, user):
+    request.user = user
+
+    async def auser():
+        return user
+    request.auser = auser
+
+
+def api_autenticada(view_func):
+    """
+    Como @login_required, pero para la API: sesión o HTTP Basic y 401 si no hay usuario.
+    Funciona con vistas síncronas y asíncronas.
+    """
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def _wrapped_view(request, *args, **kwargs):
+            user = await request.auser()
+            if not user.is_authenticated:
+                credenciales = _credenciales_basic(request)
+                user = credenciales and await aauthenticate(request, username=credenciales[0], password=credenciales[1])
+                if not user:
+                    return _no_autenticado()
+                _asignar_usuario(request, user)
+            return await view_func(request, *args, **kwargs)
+        return _wrapped_view
+
+    @wraps(view_func)
+    def _wrapped_view(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            credenciales = _credenciales_basic(request)
+            user = credenciales and authenticate(request, username=credenciales[0], password=credenciales[1])
+            if not user:
+                return _no_autenticado()
+            _asignar_usuario(request, user)
+        return view_func(request, *args, **kwargs)
+    return _wrapped_view
+
+
+@api_autenticada
+async def exportar_tickets_ndjson(request):
+    """
+    GET /tickets/api/export.ndjson: un ticket por línea, en streaming.
+
+    Acepta los filtros del dashboard (start_date, end_date, estado, turno, fabricante),
+    campos=<lista separada por comas>, despues=<id> para continuar desde un cursor y
+    limite=<n>. Se comprime con gzip o Brotli según Accept-Encoding.
+    """
+    user = await request.auser()
+    if not user.is_staff:
+        return JsonResponse({'error': 'Acceso denegado'}, status=403)
+
+    try:
+        campos = campos_ndjson(request.GET.get('campos'))
+        despues = int(request.GET.get('despues') or 0)
+        limite = int(request.GET['limite']) if request.GET.get('limite') else None
+        if limite is not None and limite < 1:
+            raise ValueError("'limite' debe ser mayor que cero.")
+    except ValueError as error:
+        return JsonResponse({'error': str(error)}, status=400)
+
+    filtros = filtros_de_peticion(ReportePDF.TIPO_DASHBOARD, request.GET)
+    # Las consultas corren mientras se envía la respuesta, fuera del alcance de @usar_replica
+    tickets = tickets_filtrados(ReportePDF.TIPO_DASHBOARD, filtros).using(alias_analitico())
+    contenido = lineas_ndjson(tickets, campos, despues, limite)
+
+    codificacion = elegir_codificacion(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    if codificacion:
+        contenido = comprimir_flujo(contenido, codificacion)
+    response = StreamingHttpResponse(contenido, content_type='application/x-ndjson; charset=utf-8')
+    if codificacion:
+        response['Content-Encoding'] = codificacion
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+
+@api_autenticada
+def cambios_tickets(request):
+    """
+    GET /tickets/api/cambios/?marca=<marca>: feed de cambios para los kioscos.
+
+    Devuelve los tickets modificados y los eliminados desde la marca, y la marca
+    nueva. Sin marca entrega la carga inicial por páginas. Responde 410 si la marca
+    es anterior a la retención de lápidas y el kiosco debe descargar todo de nuevo.
+    Lee del primario: la réplica podría ir por detrás de la marca.
+    """
+    try:
+        cambios = cambios_desde(request.GET.get('marca'), request.user)
+    except ValueError as error:
+        return JsonResponse({'error': str(error)}, status=400)
+    except MarcaCaducada:
+        return JsonResponse({'error': 'La marca es demasiado antigua; sincroniza desde cero.'}, status=410)
+    return JsonResponse(cambios)
+
+
+def _etag_catalogos(request):
+    return f"{version_catalogo()}-{jerarquia.version_ubicaciones()}"
+
+
+@require_GET
+@api_autenticada
+@etag(_etag_catalogos)
+def catalogos_captura(request):
+    """
+    GET /tickets/api/catalogos/: herramientas, ubicaciones y fallas para capturar sin conexión.
+
+    La terminal lo guarda con su ETag y lo revalida con If-None-Match; mientras no
+    cambie ningún catálogo la respuesta es un 304 sin cuerpo.
+    """
+    catalogo = catalogo_captura()
+    return JsonResponse({
+        'herramientas': [
+            {
+                'pk': pk, 'numero_serie': serie, 'modelo': modelo, 'fabricante': fabricante,
+                'numero_reparacion': reparacion, 'ubicacion': ubicacion_id,
+            }
+            for pk, (serie, modelo, fabricante, reparacion, ubicacion_id) in catalogo['herramientas'].items()
+        ],
+        # Lista de pares para conservar el orden natural de naves, bandas y puntos
+        'ubicaciones': [
+            [nave, [[banda, puntos] for banda, puntos in bandas.items()]]
+            for nave, bandas in jerarquia.arbol().items()
+        ],
+        'fallas': [[pk, etiqueta] for pk, etiqueta in catalogo['fallas'].items()],
+    })
+
+
+@require_POST
+@api_autenticada
+def crear_tickets_lote(request):
+    """
+    POST /tickets/api/lote/: crea los tickets capturados sin conexión.
+
+    Cuerpo: {"tickets": [{"clave": <uuid>, "herramienta": <id>, "ubicacion": <id>,
+    "falla": <id>, "comentarios": "...", "capturado_en": <ISO 8601>}, ...]}.
+    Responde un resultado por ticket (creado, duplicado o rechazado). Una clave ya
+    recibida devuelve el folio original, así que reenviar un lote es seguro.
+    """
+    try:
+        tickets = json.loads(request.body).get('tickets')
+    except (ValueError, AttributeError):
+        return JsonResponse({'error': 'El cuerpo debe ser JSON con la lista "tickets".'}, status=400)
+    if not isinstance(tickets, list):
+        return JsonResponse({'error': 'El cuerpo debe ser JSON con la lista "tickets".'}, status=400)
+    if len(tickets) > MAXIMO_TICKETS_LOTE:
+        return JsonResponse({'error': f'Máximo {MAXIMO_TICKETS_LOTE} tickets por lote.'}, status=413)
+
+    try:
+        resultados = crear_lote(tickets, request.user)
+    except TicketEstado.DoesNotExist:
+        return JsonResponse({'error': "El estado 'Abierto' no existe."}, status=500)
+    except IntegrityError:
+        # Otra petición abrió un ticket para la misma herramienta al mismo tiempo; nada se guardó
+        return JsonResponse({'error': 'Conflicto al guardar el lote; reintenta el envío.'}, status=409)
+    return JsonResponse({'resultados': resultados})
@@ -0,0 +1,48 @@
+# tickets/catalogos.py
+
+import time
+
+from django.core.cache import cache
+
+CATALOGO_VERSION_KEY = 'catalogo:version'
+
+
+def version_catalogo():
+    """
+    Versión de los catálogos (estados, fallas, herramientas) que se muestran en las filas.
+    Forma parte de la clave de los fragmentos en caché de la lista de tickets.
+    """
+    return cache.get_or_set(CATALOGO_VERSION_KEY, time.time_ns(), None)
+
+
+def invalidar_catalogo():
+    cache.set(CATALOGO_VERSION_KEY, time.time_ns(), None)
+
+
+# (versión, catálogo) del proceso actual, como el árbol de inventario/jerarquia.py
+_captura_local = (None, None)
+
+
+def catalogo_captura():
+    """
+    Herramientas y fallas para capturar tickets sin conexión y validar los lotes:
+    {'herramientas': {pk: (numero_serie, modelo, fabricante, numero_reparacion, ubicacion_id)},
+     'fallas': {pk: etiqueta}}. Se reconstruye cuando cambia la versión del catálogo.
+    """
+    global _captura_local
+    from inventario.models import Herramienta
+    from .models import Falla
+
+    version = version_catalogo()
+    version_local, datos = _captura_local
+    if datos is None or version_local != version:
+        datos = {
+            'herramientas': {
+                pk: resto for pk, *resto in Herramienta.objects.values_list(
+                    'pk', 'numero_serie', 'modelo', 'fabricante', 'numero_reparacion', 'ubicacion_id'
+                ).order_by('numero_serie')
+            },
+            'fallas': {falla.pk: str(falla) for falla in Falla.objects.order_by('codigo')},
+        }
+        _captura_local = (version, datos)
+    return datos
@@ -0,0 +1,117 @@
+# tickets/estados.py
+
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+# ==============================================================================
+# MÁQUINA DE ESTADOS DEL CICLO DE VIDA DE UN TICKET
+# ==============================================================================
+# Los nombres coinciden con los registros de TicketEstado que crean los comandos
+# de carga. Un estado que no aparezca aquí no puede ser origen ni destino.
+ESTADO_ABIERTO = 'Abierto'
+ESTADO_EN_REPARACION = 'En Reparación'
+ESTADO_CERRADO = 'Cerrado'
+
+TRANSICIONES_PERMITIDAS = {
+    ESTADO_ABIERTO: {ESTADO_EN_REPARACION, ESTADO_CERRADO},
+    ESTADO_EN_REPARACION: {ESTADO_ABIERTO, ESTADO_CERRADO},
+    ESTADO_CERRADO: {ESTADO_ABIERTO},  # Reabrir un ticket
+}
+
+
+def transicion_permitida(origen, destino):
+    """
+    Indica si un ticket puede pasar del estado `origen` al estado `destino` (por nombre).
+    """
+    return destino in TRANSICIONES_PERMITIDAS.get(origen, set())
+
+
+def origenes_permitidos(destino):
+    """
+    Devuelve los nombres de estado desde los que se puede llegar a `destino`.
+    """
+    return [origen for origen, destinos in TRANSICIONES_PERMITIDAS.items() if destino in destinos]
+
+
+def campos_transicion(destino, ahora):
+    """
+    Columnas desnormalizadas que se escriben en el mismo UPDATE que el cambio de estado.
+    """
+    if destino == ESTADO_EN_REPARACION:
+        # Si el ticket ya estuvo en reparación conservamos la primera fecha
+        return {'fecha_inicio_reparacion': Coalesce(F('fecha_inicio_reparacion'), Value(ahora))}
+    if destino == ESTADO_CERRADO:
+        return {'fecha_cierre': ahora}
+    if destino == ESTADO_ABIERTO:
+        return {'fecha_cierre': None}
+    return {}
+
+
+def transicionar_tickets(ids, nuevo_estado, usuario=None, accion='Cambio de estado', version=None):
+    """
+    Mueve los tickets `ids` a `nuevo_estado` respetando la máquina de estados.
+
+    Bloquea las filas, hace un solo UPDATE con el estado y las fechas de la transición
+    y registra la auditoría con bulk_create. Devuelve una lista de diccionarios
+    (pk, folio, creado_por_id, estado__nombre, herramienta_id, version) con los tickets
+    que sí cambiaron y su nueva versión; los que no admiten la transición o, al reabrir,
+    chocarían con otro ticket abierto de la misma herramienta se omiten.
+
+    Con `version` solo cambian los tickets que sigan en esa versión (edición de un
+    ticket con concurrencia optimista).
+    """
+    from .models import Ticket, AuditoriaTicket
+    from .metricas import claves_de_tickets, refrescar_metricas
+
+    ahora = timezone.now()
+    with transaction.atomic():
+        tickets = (
+            Ticket.objects.select_for_update(of=('self',))
+            .filter(pk__in=ids, estado__nombre__in=origenes_permitidos(nuevo_estado.nombre))
+        )
+        if version is not None:
+            tickets = tickets.filter(version=version)
+        if nuevo_estado.nombre == ESTADO_ABIERTO:
+            # Reabrir: se omiten los tickets cuya herramienta ya tiene otro ticket abierto
+            otro_abierto = Ticket.objects.filter(
+                herramienta_id=OuterRef('herramienta_id'), fecha_cierre__isnull=True
+            ).exclude(pk=OuterRef('pk'))
+            tickets = tickets.exclude(Exists(otro_abierto))
+        tickets_a_cambiar = []
+        herramientas_abiertas = set()
+        for t in tickets.values('pk', 'folio', 'creado_por_id', 'estado__nombre', 'herramienta_id', 'version'):
+            # Tampoco se pueden reabrir a la vez dos tickets de la misma herramienta
+            if nuevo_estado.nombre == ESTADO_ABIERTO and t['herramienta_id'] in herramientas_abiertas:
+                continue
+            herramientas_abiertas.add(t['herramienta_id'])
+            tickets_a_cambiar.append(t)
+        if not tickets_a_cambiar:
+            return []
+
+        Ticket.objects.filter(pk__in=[t['pk'] for t in tickets_a_cambiar]).update(
+            estado=nuevo_estado,
+            fecha_actualizacion=ahora,
+            version=F('version') + 1,
+            **campos_transicion(nuevo_estado.nombre, ahora),
+        )
+        for t in tickets_a_cambiar:
+            t['version'] += 1
+        AuditoriaTicket.objects.bulk_create([
+            AuditoriaTicket(
+                ticket_id=t['pk'],
+                usuario=usuario,
+                campo_modificado='estado',
+                valor_anterior=t['estado__nombre'],
+                valor_nuevo=nuevo_estado.nombre,
+                accion=accion,
+            )
+            for t in tickets_a_cambiar
+        ])
+
+        # Cerrar o reabrir cambia el MTTR: refrescamos solo las métricas afectadas
+        if nuevo_estado.nombre == ESTADO_CERRADO or any(t['estado__nombre'] == ESTADO_CERRADO for t in tickets_a_cambiar):
+            pks = [t['pk'] for t in tickets_a_cambiar]
+            transaction.on_commit(lambda: refrescar_metricas(claves_de_tickets(pks)))
+    return tickets_a_cambiar
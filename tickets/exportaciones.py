@@ -0,0 +1,129 @@
+# tickets/exportaciones.py
+
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+# openpyxl tarda en importarse y ocupa memoria en cada worker; las exportaciones
+# son poco frecuentes, así que se importa dentro de la función que lo usa.
+
+
+def libro_excel_tickets(tickets_query):
+    """
+    Construye el libro de Excel con los tickets indicados (uno por fila).
+    """
+    from openpyxl import Workbook
+    from openpyxl.styles import Font, Alignment
+
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.title = "Reporte de Tickets"
+
+    # Definimos los encabezados de las columnas
+    headers = [
+        "Folio", "Estado", "Herramienta (Modelo)", "No. Serie", "Falla",
+        "Comentarios", "Creado Por", "Fecha Creación", "Turno", "Ubicación"
+    ]
+    sheet.append(headers)
+
+    # Damos formato a los encabezados (negrita y centrado)
+    for cell in sheet[1]:
+        cell.font = Font(bold=True)
+        cell.alignment = Alignment(horizontal="center", vertical="center")
+
+    # Llenamos el archivo con los datos de los tickets ---
+    for ticket in tickets_query.order_by('fecha_creacion'):
+        ubicacion_str = str(ticket.ubicacion) if ticket.ubicacion else "N/A"
+
+        # Creamos una fila con los datos de cada ticket
+        row = [
+            ticket.folio,
+            ticket.estado.nombre,
+            ticket.herramienta.modelo,
+            ticket.herramienta.numero_serie,
+            ticket.falla.descripcion if ticket.falla else "N/A",
+            ticket.comentarios,
+            ticket.creado_por.username,
+            timezone.localtime(ticket.fecha_creacion).strftime("%d/%m/%Y %H:%M"),
+            ticket.turno,
+            ubicacion_str
+        ]
+        sheet.append(row)
+
+    # Ajustamos el ancho de las columnas automáticamente
+    for column_cells in sheet.columns:
+        length = max(len(str(cell.value or "")) for cell in column_cells)
+        sheet.column_dimensions[column_cells[0].column_letter].width = length + 2
+
+    return workbook
+
+
+# ==============================================================================
+# EXPORTACIÓN NDJSON (API para BI)
+# ==============================================================================
+# Nombre público del campo -> ruta en el ORM. Los JOIN se resuelven en la misma
+# consulta con values_list, sin instanciar modelos.
+CAMPOS_NDJSON = {
+    'id': 'pk',
+    'folio': 'folio',
+    'numero_ticket_externo': 'numero_ticket_externo',
+    'estado': 'estado__nombre',
+    'turno': 'turno',
+    'comentarios': 'comentarios',
+    'fecha_creacion': 'fecha_creacion',
+    'fecha_actualizacion': 'fecha_actualizacion',
+    'fecha_inicio_reparacion': 'fecha_inicio_reparacion',
+    'fecha_cierre': 'fecha_cierre',
+    'version': 'version',
+    'creado_por': 'creado_por__username',
+    'herramienta_id': 'herramienta_id',
+    'herramienta_modelo': 'herramienta__modelo',
+    'herramienta_numero_serie': 'herramienta__numero_serie',
+    'herramienta_fabricante': 'herramienta__fabricante',
+    'falla': 'falla__descripcion',
+    'ubicacion_id': 'ubicacion_id',
+    'ubicacion_nave': 'ubicacion__nave',
+    'ubicacion_banda': 'ubicacion__banda',
+    'ubicacion_tacto': 'ubicacion__tacto',
+    'ubicacion_operacion': 'ubicacion__operacion',
+}
+TAMANO_LOTE_NDJSON = 2000
+
+
+def campos_ndjson(parametro):
+    """
+    Valida la proyección pedida (?campos=folio,estado). 'id' siempre va primero porque
+    es el cursor para continuar la exportación. Lanza ValueError si hay campos desconocidos.
+    """
+    if not parametro:
+        return list(CAMPOS_NDJSON)
+    pedidos = [campo.strip() for campo in parametro.split(',') if campo.strip()]
+    desconocidos = [campo for campo in pedidos if campo not in CAMPOS_NDJSON]
+    if desconocidos:
+        raise ValueError(f"Campos desconocidos: {', '.join(desconocidos)}. Disponibles: {', '.join(CAMPOS_NDJSON)}.")
+    return ['id'] + [campo for campo in dict.fromkeys(pedidos) if campo != 'id']
+
+
+async def lineas_ndjson(tickets, campos, despues=0, limite=None, lote=TAMANO_LOTE_NDJSON):
+    """
+    Recorre `tickets` por pk en lotes (paginación por cursor) y produce una línea JSON
+    por ticket. Cada lote es una consulta independiente y se descarta tras enviarse,
+    así que la memoria no crece con el número de tickets exportados.
+    """
+    rutas = [CAMPOS_NDJSON[campo] for campo in campos]
+    enviados = 0
+    while limite is None or enviados < limite:
+        tamano = lote if limite is None else min(lote, limite - enviados)
+        consulta = tickets.filter(pk__gt=despues).order_by('pk').values_list(*rutas)[:tamano]
+        filas = [fila async for fila in consulta]
+        if not filas:
+            break
+        yield ''.join(
+            json.dumps(dict(zip(campos, fila)), cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+            for fila in filas
+        ).encode()
+        despues = filas[-1][0]
+        enviados += len(filas)
+        if len(filas) < tamano:
+            break
@@ -0,0 +1,69 @@
+# tickets/filtros.py
+
+import datetime
+
+from django.utils import timezone
+
+from .models import ReportePDF, Ticket
+
+# ==============================================================================
+# FILTROS DEL DASHBOARD
+# ==============================================================================
+# Los comparten el dashboard, los reportes PDF, la exportación NDJSON y el mapa de
+# calor. Se normalizan para que la misma consulta genere siempre la misma clave
+# (reportes PDF, caché) y para que un parámetro mal formado no llegue al ORM.
+
+
+def _fecha(valor, por_defecto):
+    try:
+        return datetime.datetime.strptime(valor, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        return por_defecto
+
+
+def _id(valor):
+    # Un id no numérico se ignora, como un filtro vacío
+    try:
+        return str(int(valor))
+    except (TypeError, ValueError):
+        return ''
+
+
+def filtros_de_peticion(tipo, datos):
+    """
+    Normaliza los filtros recibidos (GET/POST) para que la misma consulta genere la misma clave.
+    """
+    hoy = timezone.localdate()
+    if tipo == ReportePDF.TIPO_DIARIO:
+        return {'fecha': _fecha(datos.get('fecha'), hoy).isoformat()}
+    return {
+        'start_date': _fecha(datos.get('start_date'), hoy - datetime.timedelta(days=7)).isoformat(),
+        'end_date': _fecha(datos.get('end_date'), hoy).isoformat(),
+        'estado': _id(datos.get('estado')),
+        'turno': datos.get('turno') or '',
+        'fabricante': datos.get('fabricante') or '',
+    }
+
+
+def rango_de_filtros(filtros):
+    """
+    (inicio, fin) aware a partir de start_date/end_date normalizados; fin incluye el último día.
+    """
+    inicio = timezone.make_aware(datetime.datetime.fromisoformat(filtros['start_date']))
+    fin = timezone.make_aware(datetime.datetime.fromisoformat(filtros['end_date'])) + datetime.timedelta(days=1)
+    return inicio, fin
+
+
+def tickets_filtrados(tipo, filtros):
+    if tipo == ReportePDF.TIPO_DIARIO:
+        inicio = timezone.make_aware(datetime.datetime.fromisoformat(filtros['fecha']))
+        return Ticket.objects.filter(fecha_creacion__range=(inicio, inicio + datetime.timedelta(days=1)))
+
+    tickets = Ticket.objects.filter(fecha_creacion__range=rango_de_filtros(filtros))
+    if filtros['estado']:
+        tickets = tickets.filter(estado__id=filtros['estado'])
+    if filtros['turno']:
+        tickets = tickets.filter(turno=filtros['turno'])
+    if filtros['fabricante']:
+        tickets = tickets.filter(herramienta__fabricante=filtros['fabricante'])
+    return tickets
@@ -1,14 +1,45 @@
 # tickets/forms.py
 
 from django import forms
+from django.urls import reverse_lazy
 from .models import Ticket, Comentario # He añadido Comentario aquí por el otro formulario
+from .estados import ESTADO_ABIERTO
+from inventario import jerarquia
 from usuarios.models import GrupoNotificacion
 from crispy_forms.helper import FormHelper
 from crispy_forms.layout import Layout, Row, Column, Field, HTML, Submit
 
-# --- Opciones para campos Choice ---
-TACTO_CHOICES = [('', 'Seleccionar Tacto')] + [(str(i), str(i)) for i in range(1, 31)]
-OPERACION_CHOICES = [('', 'Seleccionar Operación')] + [(f'OP {i*10}', f'OP {i*10}') for i in range(1, 16)]
+
+def validar_transicion(ticket, nuevo_estado):
+    """
+    Rechaza cambios de estado que la máquina de estados no permite.
+    Los tickets nuevos no se validan porque la vista les asigna 'Abierto'.
+    """
+    if ticket.pk and nuevo_estado and nuevo_estado.pk != ticket.estado_id:
+        if not ticket.puede_cambiar_a(nuevo_estado):
+            raise forms.ValidationError(
+                f"No se puede pasar de '{ticket.estado.nombre}' a '{nuevo_estado.nombre}'."
+            )
+    return nuevo_estado
+
+
+def validar_version(ticket, version):
+    """
+    Control de concurrencia optimista: rechaza el envío si el ticket cambió desde que
+    se cargó el formulario. Es solo un aviso temprano; la garantía la da el UPDATE
+    condicionado a la versión (ver tickets/versiones.py).
+    """
+    if ticket.pk and version is None:
+        # Sin versión no se puede detectar una edición concurrente
+        raise forms.ValidationError(
+            "Falta la versión del ticket; recarga el formulario.", code='conflicto'
+        )
+    if ticket.pk and version != ticket.version:
+        raise forms.ValidationError(
+            f"El ticket {ticket.folio} fue modificado por otro usuario mientras lo editabas.",
+            code='conflicto',
+        )
+    return version
 
 # ==============================================================================
 # FORMULARIO PRINCIPAL PARA CREAR Y EDITAR TICKETS
@@ -29,24 +60,36 @@ class TicketForm(forms.ModelForm):
     nombre_reporta = forms.CharField(label="Quien Reporta", required=False, disabled=True)
     puesto_reporta = forms.CharField(label="Puesto", required=False, disabled=True)
     email_reporta = forms.EmailField(label="Correo Electrónico", required=False, disabled=True)
-    nave_display = forms.CharField(label="Nave", required=False, disabled=True)
     fecha_actual = forms.CharField(label="Fecha", required=False, disabled=True)
     turno_actual = forms.CharField(label="Turno", required=False, disabled=True)
 
-    # --- Tus campos del modelo con widgets personalizados (SIN CAMBIOS) ---
-    tacto = forms.ChoiceField(choices=TACTO_CHOICES, required=False)
-    operacion = forms.ChoiceField(choices=OPERACION_CHOICES, required=False)
+    # --- Selector de ubicación en cascada: nave -> banda -> tacto/operación ---
+    # Cada nivel se carga por HTMX, así que el formulario solo lleva las opciones de la banda elegida
+    nave = forms.ChoiceField(label="Nave", required=False, widget=forms.Select(attrs={
+        'hx-get': reverse_lazy('opciones_bandas'), 'hx-trigger': 'change', 'hx-target': '#id_banda',
+        # Al cambiar de nave, la lista de tactos/operaciones se vacía en cascada
+        'hx-on::after-swap': "htmx.trigger('#id_banda', 'change')",
+    }))
+    banda = forms.ChoiceField(label="Banda", required=False, widget=forms.Select(attrs={
+        'hx-get': reverse_lazy('opciones_puntos'), 'hx-trigger': 'change', 'hx-target': '#id_ubicacion',
+        'hx-include': '#id_nave',
+    }))
     grupos_notificacion = forms.ModelMultipleChoiceField(
         queryset=GrupoNotificacion.objects.all(),
         widget=forms.CheckboxSelectMultiple,
         label="Notificar a los siguientes grupos",
         required=False
     )
+    # Versión del ticket al cargar el formulario (concurrencia optimista)
+    version = forms.IntegerField(widget=forms.HiddenInput(), required=False)
     
     class Meta:
         model = Ticket
         # ⭐ 1. AÑADIMOS 'estado' A LA LISTA DE CAMPOS MANEJADOS POR EL FORMULARIO ⭐
-        fields = ['herramienta', 'falla', 'ubicacion', 'comentarios', 'tacto', 'operacion', 'estado']
+        fields = ['herramienta', 'falla', 'ubicacion', 'comentarios', 'estado']
+        labels = {
+            'ubicacion': 'Tacto / Operación',
+        }
         widgets = {
             'herramienta': forms.HiddenInput(),
             'comentarios': forms.Textarea(attrs={'rows': 3}),
@@ -54,6 +97,9 @@ class TicketForm(forms.ModelForm):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        self._preparar_selector_ubicacion()
+        if self.instance.pk:
+            self.initial.setdefault('version', self.instance.version)
         self.helper = FormHelper()
         self.helper.form_method = 'post'
         self.helper.layout = Layout(
@@ -64,7 +110,7 @@ class TicketForm(forms.ModelForm):
             Row(Column('nombre_reporta'), Column('puesto_reporta'), Column('email_reporta')),
             HTML('<hr>'),
             HTML('<h5 class="mb-3">2. Ubicación de la Falla</h5>'),
-            Row(Column('ubicacion'), Column('nave_display'), Column('tacto'), Column('operacion')),
+            Row(Column('nave'), Column('banda'), Column('ubicacion')),
             HTML('<hr>'),
             HTML('<h5 class="mb-3">3. Datos de la Herramienta</h5>'),
             'text_search',
@@ -73,6 +119,7 @@ class TicketForm(forms.ModelForm):
             Row(Column('numero_serie_display'), Column('numero_reparacion_display')),
             HTML('<div id="search-results" class="list-group mb-3"></div>'),
             'herramienta',
+            'version',
             HTML('<div id="ticket-duplicado-warning"></div>'),
             HTML('<hr>'),
             HTML('<h5 class="mb-3">4. Descripción de la Falla y Notificación</h5>'),
@@ -89,16 +136,64 @@ class TicketForm(forms.ModelForm):
             Submit('submit', 'Guardar Ticket', css_class='btn btn-primary mt-4 w-100')
         )
 
+    def _preparar_selector_ubicacion(self):
+        """
+        Llena solo los niveles ya elegidos con el árbol en memoria (inventario/jerarquia.py).
+        La validación de 'ubicacion' sigue usando su queryset, no estas opciones.
+        """
+        if self.is_bound:
+            nave, banda = self.data.get('nave', ''), self.data.get('banda', '')
+        else:
+            nave, banda = jerarquia.ruta(self.instance.ubicacion_id)
+            self.initial.setdefault('nave', nave)
+            self.initial.setdefault('banda', banda)
+
+        self.fields['nave'].choices = [('', 'Seleccionar Nave')] + [(n, n) for n in jerarquia.naves()]
+        self.fields['banda'].choices = [('', 'Seleccionar Banda')] + [(b, b) for b in jerarquia.bandas(nave)]
+        self.fields['ubicacion'].choices = [('', 'Seleccionar Tacto / Operación')] + jerarquia.puntos(nave, banda)
+
+    def clean_estado(self):
+        return validar_transicion(self.instance, self.cleaned_data.get('estado'))
+
+    def clean_version(self):
+        return validar_version(self.instance, self.cleaned_data.get('version'))
+
+    def clean(self):
+        cleaned_data = super().clean()
+        herramienta = cleaned_data.get('herramienta')
+        estado = cleaned_data.get('estado')
+        # El ticket queda abierto si ya lo estaba o si se está reabriendo
+        queda_abierto = self.instance.fecha_cierre is None or (estado is not None and estado.nombre == ESTADO_ABIERTO)
+        # Solo un ticket abierto por herramienta (la base de datos también lo garantiza)
+        if herramienta and queda_abierto:
+            abierto = Ticket.objects.filter(herramienta=herramienta, fecha_cierre__isnull=True).exclude(pk=self.instance.pk).first()
+            if abierto:
+                self.add_error(None, f"La herramienta ya tiene el ticket abierto {abierto.folio}. Actualiza ese ticket en lugar de crear uno nuevo.")
+        return cleaned_data
+
 # ==============================================================================
 # TU FORMULARIO PARA ACTUALIZAR ESTADO (SIN CAMBIOS)
 # ==============================================================================
 class ActualizarEstadoForm(forms.ModelForm):
+    version = forms.IntegerField(widget=forms.HiddenInput(), required=False)
+
     class Meta:
         model = Ticket
         fields = ['estado']
         labels = {
             'estado': '',
         }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk:
+            self.initial.setdefault('version', self.instance.version)
+
+    def clean_estado(self):
+        return validar_transicion(self.instance, self.cleaned_data.get('estado'))
+
+    def clean_version(self):
+        return validar_version(self.instance, self.cleaned_data.get('version'))
         
 # ==============================================================================
 # TU FORMULARIO DE COMENTARIOS (SIN CAMBIOS)
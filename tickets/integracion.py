@@ -0,0 +1,366 @@
+# tickets/integracion.py
+
+import csv
+import hashlib
+import io
+import json
+import logging
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from inventario.models import Herramienta, Ubicacion
+from .estados import ESTADO_CERRADO, ESTADO_EN_REPARACION
+from .metricas import claves_de_tickets, recalcular_todas, refrescar_metricas
+from .models import Falla, SincronizacionExterna, Ticket, TicketEstado
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# SINCRONIZACIÓN CON EL SISTEMA DE MANTENIMIENTO CORPORATIVO
+# ==============================================================================
+# Cada registro externo se identifica por `numero_ticket` y se guarda en
+# Ticket.numero_ticket_externo. Los catálogos se cargan una vez en memoria y cada
+# lote se aplica con pocas consultas. Solo se escriben los tickets que cambiaron,
+# así que repetir una sincronización no modifica nada.
+#
+# Formato de cada registro (NDJSON o CSV con estos encabezados):
+#   numero_ticket, numero_serie, estado, codigo_falla, nave, banda, tacto,
+#   operacion, turno, comentarios, fecha_creacion, fecha_cierre (ISO 8601)
+
+TAMANO_LOTE = 1000
+# bulk_update arma un CASE por columna: con sentencias más cortas el costo no crece cuadrático
+TAMANO_LOTE_UPDATE = 100
+PREFIJO_FOLIO = 'EXT-'
+# Veces que se reintenta una fila editada localmente entre la lectura y la escritura
+REINTENTOS_CONFLICTO = 2
+# Por encima de esto se recalculan todas las métricas en lugar de refrescarlas por clave
+MAXIMO_TICKETS_REFRESCO = 1000
+
+# Campos que se copian del registro externo; se comparan para detectar cambios
+CAMPOS_SINCRONIZADOS = [
+    'herramienta_id', 'ubicacion_id', 'falla_id', 'estado_id', 'turno', 'comentarios',
+    'fecha_creacion', 'fecha_inicio_reparacion', 'fecha_cierre',
+]
+
+
+class RegistroRechazado(Exception):
+    pass
+
+
+# --- Fuentes ---
+
+def _es_url(origen):
+    return origen.startswith(('http://', 'https://'))
+
+
+def huella_fuente(origen):
+    """
+    Identifica el contenido de la fuente para saber si un punto de control sigue
+    siendo válido. Para URLs se usa ETag/Last-Modified; sin ellos no se puede reanudar.
+    """
+    if _es_url(origen):
+        try:
+            with urllib.request.urlopen(urllib.request.Request(origen, method='HEAD'), timeout=30) as respuesta:
+                return respuesta.headers.get('ETag') or respuesta.headers.get('Last-Modified') or ''
+        except urllib.error.HTTPError:
+            return ''
+    with open(origen, 'rb') as archivo:
+        return hashlib.file_digest(archivo, 'sha256').hexdigest()
+
+
+def leer_fuente(origen):
+    """
+    Itera los registros de un volcado NDJSON o CSV (archivo o URL) sin cargarlo completo.
+    """
+    if _es_url(origen):
+        respuesta = urllib.request.urlopen(origen, timeout=60)
+        texto = io.TextIOWrapper(respuesta, encoding='utf-8-sig')
+    else:
+        texto = open(origen, encoding='utf-8-sig', newline='')
+    with texto:
+        if origen.lower().split('?')[0].endswith('.csv'):
+            yield from csv.DictReader(texto)
+            return
+        for linea in texto:
+            if linea.strip():
+                yield json.loads(linea)
+
+
+# --- Catálogos en memoria ---
+
+class Catalogos:
+    """
+    Mapas número de serie / ubicación / código de falla / estado -> id, cargados una vez.
+    """
+
+    def __init__(self):
+        self.herramientas = {
+            serie: (pk, ubicacion_id)
+            for pk, serie, ubicacion_id in Herramienta.objects.values_list('pk', 'numero_serie', 'ubicacion_id')
+        }
+        self.ubicaciones = {
+            tuple(parte or '' for parte in partes): pk
+            for pk, *partes in Ubicacion.objects.values_list('pk', 'nave', 'banda', 'tacto', 'operacion')
+        }
+        self.fallas = dict(Falla.objects.values_list('codigo', 'pk'))
+        self.estados = dict(TicketEstado.objects.values_list('nombre', 'pk'))
+        self.nombres_estado = {pk: nombre for nombre, pk in self.estados.items()}
+
+
+def _fecha(valor, campo):
+    if not valor:
+        return None
+    fecha = parse_datetime(valor)
+    if fecha is None:
+        raise RegistroRechazado(f"{campo} inválida")
+    return timezone.make_aware(fecha) if timezone.is_naive(fecha) else fecha
+
+
+def normalizar(registro, catalogos):
+    """
+    Convierte un registro externo en (numero_ticket_externo, valores de CAMPOS_SINCRONIZADOS).
+    """
+    numero = (registro.get('numero_ticket') or '').strip()
+    if not numero:
+        raise RegistroRechazado("sin numero_ticket")
+    if len(PREFIJO_FOLIO + numero) > 50:
+        raise RegistroRechazado("numero_ticket demasiado largo")
+
+    herramienta = catalogos.herramientas.get((registro.get('numero_serie') or '').strip())
+    if herramienta is None:
+        raise RegistroRechazado("herramienta desconocida")
+    estado_id = catalogos.estados.get(registro.get('estado'))
+    if estado_id is None:
+        raise RegistroRechazado("estado desconocido")
+
+    partes = tuple((registro.get(campo) or '').strip() for campo in ('nave', 'banda', 'tacto', 'operacion'))
+    # Sin ubicación en el registro se usa la de la herramienta
+    ubicacion_id = catalogos.ubicaciones.get(partes) if any(partes) else herramienta[1]
+    if ubicacion_id is None:
+        raise RegistroRechazado("ubicación desconocida")
+
+    # Las fechas que falten se completan en completar_fechas(), ya sabiendo si el ticket existe
+    return numero, {
+        'herramienta_id': herramienta[0],
+        'ubicacion_id': ubicacion_id,
+        'falla_id': catalogos.fallas.get(registro.get('codigo_falla')),
+        'estado_id': estado_id,
+        'turno': registro.get('turno') or None,
+        'comentarios': registro.get('comentarios') or None,
+        'fecha_creacion': _fecha(registro.get('fecha_creacion'), 'fecha_creacion'),
+        'fecha_inicio_reparacion': None,
+        'fecha_cierre': _fecha(registro.get('fecha_cierre'), 'fecha_cierre'),
+    }
+
+
+def completar_fechas(valores, nombre_estado, actuales, ahora):
+    """
+    Completa las fechas que el registro no trae. En un ticket existente (`actuales`,
+    sus valores guardados) se conservan las fechas guardadas en lugar de usar `ahora`,
+    así que repetir la misma fuente no cambia nada.
+    """
+    actuales = actuales or {}
+    if valores['fecha_creacion'] is None:
+        valores['fecha_creacion'] = actuales.get('fecha_creacion') or ahora
+    if nombre_estado in (ESTADO_EN_REPARACION, ESTADO_CERRADO):
+        # El sistema externo no informa el inicio de reparación: se aproxima con la creación
+        valores['fecha_inicio_reparacion'] = actuales.get('fecha_inicio_reparacion') or valores['fecha_creacion']
+    if nombre_estado == ESTADO_CERRADO:
+        valores['fecha_cierre'] = valores['fecha_cierre'] or actuales.get('fecha_cierre') or valores['fecha_creacion']
+    else:
+        valores['fecha_cierre'] = None
+    return valores
+
+
+# --- Aplicación de lotes ---
+
+def aplicar_lote(registros, catalogos, usuario_id):
+    """
+    Inserta o actualiza un lote de registros externos. Devuelve (Counter, pks tocados).
+    """
+    resultado = Counter()
+    validos = {}
+    for registro in registros:
+        try:
+            numero, valores = normalizar(registro, catalogos)
+        except RegistroRechazado as error:
+            resultado['rechazados'] += 1
+            resultado[f'rechazo: {error}'] += 1
+            continue
+        validos[numero] = valores  # Si se repite en el lote, gana el último
+
+    # Bloqueadas hasta el fin del lote: una edición local concurrente espera a la sincronización
+    existentes = {
+        numero: (pk, version, valores)
+        for numero, pk, version, *valores in Ticket.objects.select_for_update()
+        .filter(numero_ticket_externo__in=validos)
+        .values_list('numero_ticket_externo', 'pk', 'version', *CAMPOS_SINCRONIZADOS)
+    }
+    ahora = timezone.now()
+    for numero, valores in validos.items():
+        actuales = dict(zip(CAMPOS_SINCRONIZADOS, existentes[numero][2])) if numero in existentes else None
+        completar_fechas(valores, catalogos.nombres_estado[valores['estado_id']], actuales, ahora)
+
+    # Una herramienta solo puede tener un ticket abierto (restricción de la base de datos)
+    abiertos = dict(
+        Ticket.objects.filter(
+            herramienta_id__in={valores['herramienta_id'] for valores in validos.values()},
+            fecha_cierre__isnull=True,
+        ).values_list('herramienta_id', 'numero_ticket_externo')
+    )
+    for numero, valores in validos.items():
+        if valores['fecha_cierre'] is not None and abiertos.get(valores['herramienta_id']) == numero:
+            del abiertos[valores['herramienta_id']]
+
+    nuevos, cambiados = [], []
+    for numero, valores in validos.items():
+        herramienta_id = valores['herramienta_id']
+        if valores['fecha_cierre'] is None:
+            if herramienta_id in abiertos and abiertos[herramienta_id] != numero:
+                resultado['rechazados'] += 1
+                resultado['rechazo: la herramienta ya tiene otro ticket abierto'] += 1
+                continue
+            abiertos[herramienta_id] = numero
+
+        if numero not in existentes:
+            nuevos.append(Ticket(
+                folio=PREFIJO_FOLIO + numero, numero_ticket_externo=numero, creado_por_id=usuario_id, **valores
+            ))
+            continue
+        pk, version, actuales = existentes[numero]
+        if [valores[campo] for campo in CAMPOS_SINCRONIZADOS] == actuales:
+            resultado['sin_cambios'] += 1
+            continue
+        cambiados.append((pk, version, valores))
+
+    # Primero las actualizaciones: pueden cerrar el ticket que libera una herramienta
+    actualizados = []
+    for intento in range(REINTENTOS_CONFLICTO + 1):
+        escritos, perdidos = _escribir_con_version(cambiados, ahora)
+        actualizados.extend(escritos)
+        if not perdidos or intento == REINTENTOS_CONFLICTO:
+            break
+        cambiados = _releer_perdidos(perdidos, resultado)
+    if perdidos:
+        resultado['rechazados'] += len(perdidos)
+        resultado['rechazo: conflicto con una edición local'] += len(perdidos)
+    creados = Ticket.objects.bulk_create(nuevos)
+
+    resultado['creados'] += len(creados)
+    resultado['actualizados'] += len(actualizados)
+    return resultado, [ticket.pk for ticket in creados] + actualizados
+
+
+def _escribir_con_version(cambiados, ahora):
+    """
+    Escribe [(pk, versión leída, valores)] solo en las filas que sigan en la versión leída,
+    como actualizar_con_version pero por lotes. Devuelve (pks escritos, {pk: valores} perdidos).
+    """
+    escritos, perdidos = [], {}
+    for inicio in range(0, len(cambiados), TAMANO_LOTE_UPDATE):
+        tramo = cambiados[inicio:inicio + TAMANO_LOTE_UPDATE]
+        condicion = Q()
+        for pk, version, _ in tramo:
+            condicion |= Q(pk=pk, version=version)
+        Ticket.objects.filter(condicion).bulk_update(
+            [Ticket(pk=pk, version=version + 1, fecha_actualizacion=ahora, **valores) for pk, version, valores in tramo],
+            CAMPOS_SINCRONIZADOS + ['version', 'fecha_actualizacion'],
+        )
+        # Escrita por este lote: versión siguiente a la leída y la misma marca de tiempo
+        versiones = dict(
+            Ticket.objects.filter(pk__in=[pk for pk, _, _ in tramo], fecha_actualizacion=ahora)
+            .values_list('pk', 'version')
+        )
+        for pk, version, valores in tramo:
+            if versiones.get(pk) == version + 1:
+                escritos.append(pk)
+            else:
+                perdidos[pk] = valores
+    return escritos, perdidos
+
+
+def _releer_perdidos(perdidos, resultado):
+    """
+    Relee las filas que cambiaron entre la lectura y la escritura para reintentarlas.
+    """
+    cambiados = []
+    filas = Ticket.objects.select_for_update().filter(pk__in=perdidos).values_list(
+        'pk', 'version', *CAMPOS_SINCRONIZADOS
+    )
+    for pk, version, *actuales in filas:
+        valores = perdidos[pk]
+        if [valores[campo] for campo in CAMPOS_SINCRONIZADOS] == actuales:
+            resultado['sin_cambios'] += 1
+        else:
+            cambiados.append((pk, version, valores))
+    return cambiados
+
+
+def _usuario_integracion():
+    nombre = getattr(settings, 'SINCRONIZACION_EXTERNA_USUARIO', 'integracion')
+    usuario, creado = User.objects.get_or_create(username=nombre, defaults={'is_active': False})
+    if creado:
+        usuario.set_unusable_password()
+        usuario.save(update_fields=['password'])
+    return usuario.pk
+
+
+def sincronizar(origen, tamano_lote=TAMANO_LOTE, forzar=False, al_avanzar=None):
+    """
+    Sincroniza todos los registros de `origen` por lotes, reanudando desde el punto
+    de control si la fuente no cambió. `al_avanzar(punto, registros_por_segundo)` se
+    llama tras cada lote. Devuelve el SincronizacionExterna final y un Counter con los
+    motivos de rechazo.
+    """
+    huella = huella_fuente(origen)
+    punto, _ = SincronizacionExterna.objects.get_or_create(fuente=origen)
+    reanudar = bool(huella) and punto.huella == huella and not forzar
+    if reanudar and punto.completada:
+        return punto, Counter()
+    if not reanudar:
+        punto.huella = huella
+        punto.registros_procesados = punto.creados = punto.actualizados = punto.sin_cambios = punto.rechazados = 0
+        punto.completada = False
+        punto.fecha_inicio = timezone.now()
+        punto.save()
+
+    catalogos = Catalogos()
+    usuario_id = _usuario_integracion()
+    rechazos = Counter()
+    tocados = []
+    inicio, procesados_inicio = time.monotonic(), punto.registros_procesados
+    registros = islice(leer_fuente(origen), punto.registros_procesados, None)
+
+    while lote := list(islice(registros, tamano_lote)):
+        with transaction.atomic():
+            resultado, pks = aplicar_lote(lote, catalogos, usuario_id)
+            punto.registros_procesados += len(lote)
+            for campo in ('creados', 'actualizados', 'sin_cambios', 'rechazados'):
+                setattr(punto, campo, getattr(punto, campo) + resultado[campo])
+            punto.save()
+        tocados.extend(pks)
+        rechazos.update({motivo: n for motivo, n in resultado.items() if motivo.startswith('rechazo: ')})
+        if al_avanzar:
+            transcurrido = time.monotonic() - inicio
+            al_avanzar(punto, (punto.registros_procesados - procesados_inicio) / transcurrido if transcurrido else 0)
+
+    punto.completada = True
+    punto.save(update_fields=['completada', 'fecha_actualizacion'])
+
+    # Las escrituras masivas no disparan señales: se actualizan las métricas al final
+    if len(tocados) > MAXIMO_TICKETS_REFRESCO:
+        recalcular_todas()
+    elif tocados:
+        refrescar_metricas(claves_de_tickets(tocados))
+    logger.info("Sincronización de %s: %s", origen, dict(rechazos))
+    return punto, rechazos
@@ -0,0 +1,184 @@
+# tickets/lotes.py
+
+import datetime
+import uuid
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from inventario import jerarquia
+from .catalogos import catalogo_captura
+from .metricas import claves_de_tickets, refrescar_metricas
+from .models import Ticket, TicketEstado
+from .signals import notificar_service_line
+
+# ==============================================================================
+# CAPTURA SIN CONEXIÓN: ENVÍO DE TICKETS POR LOTES
+# ==============================================================================
+# Las terminales sin Wi-Fi guardan los tickets en una cola local y los envían
+# juntos al recuperar la red. Cada ticket lleva una `clave` (UUID) generada en la
+# terminal y guardada en Ticket.clave_cliente: reenviar el mismo lote no duplica
+# nada, solo devuelve el folio ya asignado.
+
+MAXIMO_TICKETS_LOTE = 200
+# Una captura más vieja que esto (o en el futuro) se fecha al momento de recibirla
+ANTIGUEDAD_MAXIMA_CAPTURA = datetime.timedelta(days=7)
+LONGITUD_MAXIMA_COMENTARIOS = 2000
+
+CREADO, DUPLICADO, RECHAZADO = 'creado', 'duplicado', 'rechazado'
+
+
+class TicketRechazado(Exception):
+    pass
+
+
+def calcular_turno(momento):
+    """
+    Turno al que pertenece un momento, en hora local de la planta.
+    """
+    hora = timezone.localtime(momento).time()
+    if datetime.time(6, 0) <= hora < datetime.time(14, 0):
+        return "1er Turno"
+    if datetime.time(14, 0) <= hora < datetime.time(21, 30):
+        return "2do Turno"
+    return "3er Turno"
+
+
+def _entero(valor, campo, requerido=True):
+    if valor in (None, ''):
+        if requerido:
+            raise TicketRechazado(f"falta {campo}")
+        return None
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        raise TicketRechazado(f"{campo} inválido")
+
+
+def _fecha_captura(valor, ahora):
+    fecha = parse_datetime(valor) if isinstance(valor, str) else None
+    if fecha is None:
+        return ahora
+    if timezone.is_naive(fecha):
+        fecha = timezone.make_aware(fecha)
+    # No se confía en relojes de terminal adelantados ni en colas olvidadas
+    if fecha > ahora or fecha < ahora - ANTIGUEDAD_MAXIMA_CAPTURA:
+        return ahora
+    return fecha
+
+
+def normalizar(item, catalogo, ahora):
+    """
+    Valida un ticket capturado contra el catálogo en memoria, sin consultas.
+    Devuelve (clave, valores del Ticket).
+    """
+    herramienta_id = _entero(item.get('herramienta'), 'herramienta')
+    herramienta = catalogo['herramientas'].get(herramienta_id)
+    if herramienta is None:
+        raise TicketRechazado("herramienta desconocida")
+
+    # Sin ubicación se usa la de la herramienta, igual que en la integración corporativa
+    ubicacion_id = _entero(item.get('ubicacion'), 'ubicacion', requerido=False) or herramienta[4]
+    if ubicacion_id is None or not jerarquia.existe(ubicacion_id):
+        raise TicketRechazado("ubicación desconocida")
+
+    falla_id = _entero(item.get('falla'), 'falla', requerido=False)
+    if falla_id is not None and falla_id not in catalogo['fallas']:
+        raise TicketRechazado("falla desconocida")
+
+    comentarios = item.get('comentarios') or None
+    if comentarios is not None and (not isinstance(comentarios, str) or len(comentarios) > LONGITUD_MAXIMA_COMENTARIOS):
+        raise TicketRechazado("comentarios inválidos")
+
+    fecha_creacion = _fecha_captura(item.get('capturado_en'), ahora)
+    return {
+        'herramienta_id': herramienta_id,
+        'ubicacion_id': ubicacion_id,
+        'falla_id': falla_id,
+        'comentarios': comentarios,
+        'fecha_creacion': fecha_creacion,
+        'turno': calcular_turno(fecha_creacion),
+    }
+
+
+def _clave(item):
+    try:
+        return uuid.UUID(str(item.get('clave')))
+    except ValueError:
+        return None
+
+
+def crear_lote(items, usuario):
+    """
+    Crea en una sola transacción los tickets válidos de un lote capturado sin conexión.
+    Devuelve una lista con {clave, estado, folio, error} en el orden recibido; los
+    rechazos no impiden crear el resto. Lanza IntegrityError si otra petición abrió
+    un ticket para la misma herramienta a la vez (el cliente puede reintentar el lote).
+    """
+    ahora = timezone.now()
+    catalogo = catalogo_captura()
+    claves = [_clave(item) if isinstance(item, dict) else None for item in items]
+
+    existentes = dict(
+        Ticket.objects.filter(clave_cliente__in=[clave for clave in claves if clave])
+        .values_list('clave_cliente', 'folio')
+    )
+    resultados, validos = [], {}
+    for item, clave in zip(items, claves):
+        resultado = {'clave': str(clave) if clave else None, 'estado': RECHAZADO, 'folio': None, 'error': None}
+        resultados.append(resultado)
+        if clave is None:
+            resultado['error'] = "clave inválida"
+        elif clave in existentes:
+            resultado.update(estado=DUPLICADO, folio=existentes[clave])
+        elif clave in validos:
+            resultado['error'] = "clave repetida en el lote"
+        else:
+            try:
+                validos[clave] = (resultado, normalizar(item, catalogo, ahora))
+            except TicketRechazado as error:
+                resultado['error'] = str(error)
+
+    # Solo un ticket abierto por herramienta, contra la base de datos y dentro del lote
+    abiertos = dict(
+        Ticket.objects.filter(
+            herramienta_id__in={valores['herramienta_id'] for _, valores in validos.values()},
+            fecha_cierre__isnull=True,
+        ).values_list('herramienta_id', 'folio')
+    )
+    nuevos = []
+    for clave, (resultado, valores) in validos.items():
+        herramienta_id = valores['herramienta_id']
+        if herramienta_id in abiertos:
+            folio = abiertos[herramienta_id]
+            resultado['error'] = f"la herramienta ya tiene el ticket abierto {folio}" if folio else \
+                "la herramienta ya tiene otro ticket abierto en el lote"
+            continue
+        abiertos[herramienta_id] = None
+        nuevos.append((resultado, Ticket(
+            folio=f"TMP-{clave}", clave_cliente=clave, creado_por=usuario, **valores
+        )))
+    if not nuevos:
+        return resultados
+
+    estado_abierto = TicketEstado.objects.get(nombre='Abierto')
+    tickets = [ticket for _, ticket in nuevos]
+    for ticket in tickets:
+        ticket.estado = estado_abierto
+    with transaction.atomic():
+        Ticket.objects.bulk_create(tickets)
+        # El folio definitivo depende del id, igual que en crear_ticket
+        for ticket in tickets:
+            ticket.folio = f"TK{str(ticket.id).zfill(8)}"
+        Ticket.objects.bulk_update(tickets, ['folio'])
+
+        pks = [ticket.pk for ticket in tickets]
+        # bulk_create no dispara señales: se notifica y se refrescan métricas al confirmar
+        for ticket in tickets:
+            transaction.on_commit(lambda ticket=ticket: notificar_service_line(ticket))
+        transaction.on_commit(lambda: refrescar_metricas(claves_de_tickets(pks)))
+
+    for resultado, ticket in nuevos:
+        resultado.update(estado=CREADO, folio=ticket.folio)
+    return resultados
@@ -0,0 +1,78 @@
+# tickets/management/commands/benchmark_arranque.py
+
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Combinaciones de gunicorn.conf.py que se comparan
+MODOS = [
+    ('Sin precarga', {'GUNICORN_PRECARGA': '0', 'GUNICORN_PRECALENTAR': '0'}),
+    ('Precarga + precalentado', {'GUNICORN_PRECARGA': '1', 'GUNICORN_PRECALENTAR': '1'}),
+]
+
+class Command(BaseCommand):
+    help = (
+        'Arranca gunicorn con gunicorn.conf.py (un worker) con y sin precarga/precalentado '
+        'y mide el tiempo hasta el primer byte de las primeras peticiones.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ruta', default='/cuentas/login/', help='Ruta a consultar.')
+        parser.add_argument('--sessionid', help='Cookie sessionid para rutas que requieren sesión.')
+        parser.add_argument('--peticiones', type=int, default=3, help='Peticiones a medir tras cada arranque.')
+        parser.add_argument('--repeticiones', type=int, default=3, help='Arranques por modo (se reporta la mediana).')
+
+    def _puerto_libre(self):
+        with socket.socket() as s:
+            s.bind(('127.0.0.1', 0))
+            return s.getsockname()[1]
+
+    def _ttfb(self, url, sessionid):
+        headers = {'Cookie': f'sessionid={sessionid}'} if sessionid else {}
+        inicio = time.perf_counter()
+        with urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=60) as respuesta:
+            respuesta.read(1)
+            ttfb = time.perf_counter() - inicio
+            respuesta.read()
+        return ttfb
+
+    def _arrancar(self, entorno, puerto):
+        proceso = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', 'sgtr.asgi:application', '-c', 'gunicorn.conf.py',
+             '--workers', '1', '--bind', f'127.0.0.1:{puerto}'],
+            cwd=settings.BASE_DIR, env={**os.environ, **entorno},
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+        )
+        # El worker está listo cuando uvicorn termina su arranque
+        for linea in proceso.stderr:
+            if 'Application startup complete' in linea:
+                return proceso
+        raise RuntimeError('gunicorn terminó sin arrancar el worker')
+
+    def handle(self, *args, **options):
+        resultados = {}
+        for nombre, entorno in MODOS:
+            mediciones = []
+            for _ in range(options['repeticiones']):
+                puerto = self._puerto_libre()
+                proceso = self._arrancar(entorno, puerto)
+                try:
+                    url = f"http://127.0.0.1:{puerto}{options['ruta']}"
+                    mediciones.append([self._ttfb(url, options['sessionid']) for _ in range(options['peticiones'])])
+                finally:
+                    proceso.terminate()
+                    proceso.wait()
+            # Mediana por posición de petición (1a, 2a, ...)
+            resultados[nombre] = [sorted(col)[len(col) // 2] * 1000 for col in zip(*mediciones)]
+
+        encabezado = ''.join(f"{f'#{i + 1} ms':>10}" for i in range(options['peticiones']))
+        self.stdout.write(f"{'Modo':<26}{encabezado}")
+        for nombre, tiempos in resultados.items():
+            self.stdout.write(f"{nombre:<26}" + ''.join(f"{t:>10.1f}" for t in tiempos))
+        self.stdout.write(self.style.SUCCESS('Benchmark completado.'))
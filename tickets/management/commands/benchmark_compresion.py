@@ -0,0 +1,81 @@
+# tickets/management/commands/benchmark_compresion.py
+
+import time
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from sgtr.compresion import brotli, comprimir
+
+# Vistas que se renderizan en las terminales de piso (las HTMX se piden como fragmento)
+VISTAS_POR_DEFECTO = [
+    ('Lista de tickets', '/tickets/lista/', False),
+    ('Dashboard', '/tickets/dashboard/', False),
+    ('Crear ticket', '/tickets/crear/', False),
+    ('Notificaciones (HTMX)', '/tickets/notificaciones/', True),
+    ('Confiabilidad', '/tickets/dashboard/confiabilidad/', False),
+]
+
+
+def medir(contenido, codificacion, repeticiones):
+    """
+    Devuelve (bytes comprimidos, ms promedio por compresión) de un cuerpo.
+    """
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        comprimido = comprimir(contenido, codificacion)
+    return len(comprimido), (time.perf_counter() - inicio) * 1000 / repeticiones
+
+
+class Command(BaseCommand):
+    help = 'Renderiza las vistas principales y reporta bytes y tiempo de compresión con gzip y Brotli.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--usuario', required=True, help='Usuario (de preferencia staff) con el que se renderizan las vistas.')
+        parser.add_argument('--repeticiones', type=int, default=20, help='Compresiones por vista para promediar el tiempo.')
+
+    def handle(self, *args, **options):
+        try:
+            usuario = User.objects.get(username=options['usuario'])
+        except User.DoesNotExist:
+            raise CommandError(f"El usuario '{options['usuario']}' no existe.")
+        repeticiones = max(options['repeticiones'], 1)
+        codificaciones = ['gzip', 'br'] if brotli is not None else ['gzip']
+
+        client = Client()
+        client.force_login(usuario)
+
+        self.stdout.write(
+            f"{'Vista':<24} {'Original':>10} {'gzip':>10} {'ms gzip':>8} {'br':>10} {'ms br':>8} {'Ahorro':>8}"
+        )
+        total_original = total_comprimido = 0
+        total_ms = dict.fromkeys(codificaciones, 0.0)
+        for nombre, url, es_htmx in VISTAS_POR_DEFECTO:
+            # Sin Accept-Encoding el middleware devuelve el cuerpo original
+            headers = {'HX-Request': 'true'} if es_htmx else {}
+            response = client.get(url, headers=headers)
+            if response.status_code != 200:
+                self.stdout.write(self.style.WARNING(f"{nombre:<24} HTTP {response.status_code}, se omite."))
+                continue
+
+            original = response.content
+            medidas = {codificacion: medir(original, codificacion, repeticiones) for codificacion in codificaciones}
+            for codificacion, (_, ms) in medidas.items():
+                total_ms[codificacion] += ms
+
+            mejor = min(tamano for tamano, _ in medidas.values())
+            ahorro = 100 - (mejor * 100 / len(original)) if original else 0
+            total_original += len(original)
+            total_comprimido += mejor
+            columnas_br = f"{medidas['br'][0]:>10} {medidas['br'][1]:>8.2f}" if 'br' in medidas else f"{'-':>10} {'-':>8}"
+            self.stdout.write(
+                f"{nombre:<24} {len(original):>10} {medidas['gzip'][0]:>10} {medidas['gzip'][1]:>8.2f} "
+                f"{columnas_br} {ahorro:>7.1f}%"
+            )
+
+        if total_original:
+            tiempos = ', '.join(f"{codificacion} {ms:.2f} ms" for codificacion, ms in total_ms.items())
+            self.stdout.write(self.style.SUCCESS(
+                f"Total: {total_original} -> {total_comprimido} bytes "
+                f"({100 - total_comprimido * 100 / total_original:.1f}% menos). "
+                f"Compresión por ronda de vistas: {tiempos}."
+            ))
@@ -0,0 +1,61 @@
+# tickets/management/commands/benchmark_htmx.py
+
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand
+
+# Endpoints HTMX que se consultan en cada página (contador, lista y duplicados)
+RUTAS_POR_DEFECTO = [
+    '/tickets/notificaciones/contador/',
+    '/tickets/notificaciones/',
+    '/tickets/verificar-duplicado/1/',
+]
+
+class Command(BaseCommand):
+    help = (
+        'Mide cuántas peticiones HTMX concurrentes absorbe un servidor en marcha. '
+        'Ejecútalo contra un solo worker WSGI y luego contra uno ASGI para compararlos.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+        parser.add_argument('--sessionid', required=True, help='Cookie sessionid de un usuario con sesión iniciada.')
+        parser.add_argument('--concurrencia', type=int, nargs='+', default=[1, 10, 50, 100])
+        parser.add_argument('--peticiones', type=int, default=500, help='Peticiones por nivel de concurrencia.')
+        parser.add_argument('--ruta', action='append', dest='rutas', help='Ruta a consultar (se puede repetir).')
+
+    def _peticion(self, url, sessionid):
+        req = urllib.request.Request(url, headers={'Cookie': f'sessionid={sessionid}', 'HX-Request': 'true'})
+        inicio = time.perf_counter()
+        try:
+            with urllib.request.urlopen(req, timeout=30) as respuesta:
+                respuesta.read()
+                ok = respuesta.status == 200
+        except (urllib.error.URLError, TimeoutError):
+            ok = False
+        return time.perf_counter() - inicio, ok
+
+    def handle(self, *args, **options):
+        rutas = options['rutas'] or RUTAS_POR_DEFECTO
+        urls = [options['base_url'].rstrip('/') + ruta for ruta in rutas]
+        total = options['peticiones']
+
+        self.stdout.write(f"{'Concurrencia':>12} {'Req/s':>10} {'p50 ms':>10} {'p95 ms':>10} {'Errores':>8}")
+        for concurrencia in options['concurrencia']:
+            with ThreadPoolExecutor(max_workers=concurrencia) as pool:
+                inicio = time.perf_counter()
+                resultados = list(pool.map(
+                    lambda i: self._peticion(urls[i % len(urls)], options['sessionid']), range(total)
+                ))
+                duracion = time.perf_counter() - inicio
+
+            tiempos = sorted(t for t, _ in resultados)
+            errores = sum(1 for _, ok in resultados if not ok)
+            p50 = statistics.median(tiempos) * 1000
+            p95 = tiempos[int(len(tiempos) * 0.95) - 1] * 1000
+            self.stdout.write(f"{concurrencia:>12} {total / duracion:>10.1f} {p50:>10.1f} {p95:>10.1f} {errores:>8}")
+
+        self.stdout.write(self.style.SUCCESS('Benchmark completado.'))
@@ -0,0 +1,25 @@
+# tickets/management/commands/generar_reporte_pdf.py
+
+from django.core.management.base import BaseCommand
+from tickets.models import ReportePDF
+from tickets.reportes import generar_reporte
+
+class Command(BaseCommand):
+    help = 'Genera los reportes PDF pendientes (los indicados o, sin argumentos, todos).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('reportes', nargs='*', type=int, help='IDs de ReportePDF a generar.')
+
+    def handle(self, *args, **options):
+        pks = options['reportes'] or list(
+            ReportePDF.objects.filter(estado=ReportePDF.ESTADO_PENDIENTE).order_by('fecha_solicitud').values_list('pk', flat=True)
+        )
+        for pk in pks:
+            if not generar_reporte(pk):
+                self.stdout.write(f"Reporte {pk}: ya lo tomó otro proceso o no está pendiente.")
+                continue
+            reporte = ReportePDF.objects.get(pk=pk)
+            if reporte.estado == ReportePDF.ESTADO_LISTO:
+                self.stdout.write(self.style.SUCCESS(f"Reporte {pk} generado: {reporte.archivo.name}"))
+            else:
+                self.stdout.write(self.style.ERROR(f"Reporte {pk} falló: {reporte.error}"))
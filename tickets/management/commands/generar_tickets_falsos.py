@@ -2,6 +2,7 @@ import random
 import time
 from django.core.management.base import BaseCommand
 from django.contrib.auth.models import User
+from django.utils import timezone
 from tickets.models import Ticket, Falla, TicketEstado
 from inventario.models import Herramienta, Ubicacion
 
@@ -42,15 +43,25 @@ class Command(BaseCommand):
         # Primero, borramos los tickets falsos anteriores para no acumularlos
         Ticket.objects.filter(folio__startswith='TEST-').delete()
         
+        # Solo puede haber un ticket abierto por herramienta (restricción de la BBDD)
+        herramientas_con_ticket_abierto = set(
+            Ticket.objects.filter(fecha_cierre__isnull=True).values_list('herramienta_id', flat=True)
+        )
+
         tickets_creados = 0
         for i in range(200):
             herramienta_aleatoria = random.choice(herramientas)
             usuario_aleatorio = random.choice(usuarios)
             falla_aleatoria = random.choice(fallas)
             estado_aleatorio = random.choice(estados)
+            if estado_aleatorio.nombre != 'Cerrado':
+                if herramienta_aleatoria.pk in herramientas_con_ticket_abierto:
+                    continue
+                herramientas_con_ticket_abierto.add(herramienta_aleatoria.pk)
             ubicacion_aleatoria = herramienta_aleatoria.ubicacion or random.choice(ubicaciones)
             turno_aleatorio = random.choice(turnos_posibles) # Elegimos un turno al azar
             folio_unico = f"TEST-{int(time.time() * 1000)}-{i}"
+            ahora = timezone.now()
 
             Ticket.objects.create(
                 folio=folio_unico,
@@ -60,7 +71,10 @@ class Command(BaseCommand):
                 estado=estado_aleatorio,
                 falla=falla_aleatoria,
                 comentarios=f'Comentario de prueba para el ticket falso #{i+1}.',
-                turno=turno_aleatorio # <-- ¡Aquí asignamos el turno!
+                turno=turno_aleatorio, # <-- ¡Aquí asignamos el turno!
+                # Fechas de la máquina de estados coherentes con el estado elegido
+                fecha_inicio_reparacion=ahora if estado_aleatorio.nombre == 'En Reparación' else None,
+                fecha_cierre=ahora if estado_aleatorio.nombre == 'Cerrado' else None,
             )
             tickets_creados += 1
             self.stdout.write('.', ending='')
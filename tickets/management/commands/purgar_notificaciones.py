@@ -0,0 +1,20 @@
+# tickets/management/commands/purgar_notificaciones.py
+
+import time
+from django.core.management.base import BaseCommand
+from tickets.notificaciones import DIAS_RETENCION_LEIDAS, DIAS_RETENCION_MAXIMA, TAMANO_LOTE_PURGA, purgar_notificaciones
+
+class Command(BaseCommand):
+    help = 'Borra por lotes las notificaciones leídas antiguas y las que superan la retención máxima.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias-leidas', type=int, default=DIAS_RETENCION_LEIDAS)
+        parser.add_argument('--dias-maximo', type=int, default=DIAS_RETENCION_MAXIMA)
+        parser.add_argument('--lote', type=int, default=TAMANO_LOTE_PURGA, help='Filas por DELETE.')
+        parser.add_argument('--pausa', type=float, default=0.1, help='Segundos de espera entre lotes.')
+
+    def handle(self, *args, **options):
+        start_time = time.time()
+        borradas = purgar_notificaciones(options['dias_leidas'], options['dias_maximo'], options['lote'], options['pausa'])
+        duracion = round(time.time() - start_time, 2)
+        self.stdout.write(self.style.SUCCESS(f"{borradas} notificaciones borradas en {duracion} segundos."))
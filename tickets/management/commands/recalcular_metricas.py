@@ -0,0 +1,19 @@
+# tickets/management/commands/recalcular_metricas.py
+
+import time
+from django.core.management.base import BaseCommand
+from tickets.metricas import recalcular_todas
+
+class Command(BaseCommand):
+    help = 'Reconstruye por completo la tabla de métricas de confiabilidad (MTBF/MTTR).'
+
+    def handle(self, *args, **kwargs):
+        self.stdout.write("Recalculando métricas de confiabilidad...")
+        start_time = time.time()
+
+        resultado = recalcular_todas()
+
+        for ambito, total in resultado.items():
+            self.stdout.write(f"  {ambito}: {total} filas")
+        duracion = round(time.time() - start_time, 2)
+        self.stdout.write(self.style.SUCCESS(f"Métricas recalculadas en {duracion} segundos."))
@@ -0,0 +1,33 @@
+# tickets/management/commands/sincronizar_tickets_externos.py
+
+import time
+from django.core.management.base import BaseCommand, CommandError
+from tickets.integracion import TAMANO_LOTE, sincronizar
+
+class Command(BaseCommand):
+    help = 'Sincroniza los tickets del sistema de mantenimiento corporativo desde un volcado NDJSON/CSV (archivo o URL).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('fuente', help='Ruta o URL del volcado (.ndjson/.jsonl o .csv).')
+        parser.add_argument('--lote', type=int, default=TAMANO_LOTE, help='Registros por transacción.')
+        parser.add_argument('--forzar', action='store_true', help='Ignora el punto de control y procesa la fuente desde el principio.')
+
+    def handle(self, *args, **options):
+        start_time = time.time()
+
+        def al_avanzar(punto, por_segundo):
+            self.stdout.write(f"{punto.registros_procesados} registros ({por_segundo:.0f}/s)")
+
+        try:
+            punto, rechazos = sincronizar(options['fuente'], options['lote'], options['forzar'], al_avanzar)
+        except OSError as error:
+            raise CommandError(f"No se pudo leer la fuente: {error}")
+
+        duracion = round(time.time() - start_time, 2)
+        self.stdout.write(self.style.SUCCESS(
+            f"Fuente {punto.fuente}: {punto.registros_procesados} registros en {duracion} segundos. "
+            f"{punto.creados} creados, {punto.actualizados} actualizados, "
+            f"{punto.sin_cambios} sin cambios, {punto.rechazados} rechazados."
+        ))
+        for motivo, cantidad in rechazos.most_common():
+            self.stdout.write(self.style.WARNING(f"  {cantidad} {motivo}"))
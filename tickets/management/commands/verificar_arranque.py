@@ -0,0 +1,71 @@
+# tickets/management/commands/verificar_arranque.py
+
+import json
+import os
+import subprocess
+import sys
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Lo que carga un worker antes de atender su primera petición
+SCRIPT_ARRANQUE = """
+import json, resource, sys, time
+inicio = time.perf_counter()
+import sgtr.asgi
+from django.urls import get_resolver
+get_resolver().reverse_dict
+print(json.dumps({
+    'ms': (time.perf_counter() - inicio) * 1000,
+    'rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    'modulos': sorted(sys.modules),
+}))
+"""
+
+class Command(BaseCommand):
+    help = (
+        'Mide con `python -X importtime` lo que cuesta cargar la aplicación en un worker '
+        'y falla si supera ARRANQUE_PRESUPUESTO (tiempo, memoria o módulos pesados cargados).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=10, help='Paquetes más lentos a mostrar.')
+
+    def handle(self, *args, **options):
+        presupuesto = settings.ARRANQUE_PRESUPUESTO
+        resultado = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', SCRIPT_ARRANQUE],
+            cwd=settings.BASE_DIR, env={**os.environ, 'DJANGO_SETTINGS_MODULE': 'sgtr.settings'},
+            capture_output=True, text=True,
+        )
+        if resultado.returncode != 0:
+            raise CommandError(f"No se pudo cargar la aplicación:\n{resultado.stderr[-2000:]}")
+        medicion = json.loads(resultado.stdout.strip().splitlines()[-1])
+
+        # Formato de -X importtime: "import time: self [us] | cumulative | paquete".
+        # Se suma el tiempo propio de cada módulo por paquete raíz (django, crispy_forms...)
+        por_paquete = {}
+        for linea in resultado.stderr.splitlines():
+            if not linea.startswith('import time:') or 'cumulative' in linea:
+                continue
+            propio, _, nombre = linea[len('import time:'):].split('|')
+            paquete = nombre.strip().split('.')[0]
+            por_paquete[paquete] = por_paquete.get(paquete, 0) + int(propio) / 1000
+
+        self.stdout.write("Paquetes que más tardan en importarse (ms):")
+        for paquete, ms in sorted(por_paquete.items(), key=lambda item: item[1], reverse=True)[:options['top']]:
+            self.stdout.write(f"  {ms:>8.1f}  {paquete}")
+        self.stdout.write(f"Carga de la aplicación: {medicion['ms']:.0f} ms (presupuesto {presupuesto['importacion_ms']} ms)")
+        self.stdout.write(f"Memoria residente: {medicion['rss_mb']:.1f} MB (presupuesto {presupuesto['rss_mb']} MB)")
+
+        errores = []
+        if medicion['ms'] > presupuesto['importacion_ms']:
+            errores.append(f"la carga tardó {medicion['ms']:.0f} ms")
+        if medicion['rss_mb'] > presupuesto['rss_mb']:
+            errores.append(f"la memoria llegó a {medicion['rss_mb']:.1f} MB")
+        cargados = [m for m in presupuesto['modulos_prohibidos'] if m in medicion['modulos']]
+        if cargados:
+            errores.append(f"se importaron al arrancar: {', '.join(cargados)}")
+        if errores:
+            raise CommandError("Presupuesto de arranque excedido: " + "; ".join(errores))
+
+        self.stdout.write(self.style.SUCCESS('El arranque está dentro del presupuesto.'))
@@ -0,0 +1,104 @@
+# tickets/mapa_calor.py
+
+import hashlib
+
+from django.core.cache import cache
+from django.db.models import Avg, Count, DurationField, ExpressionWrapper, F, Max, Q
+
+from inventario import jerarquia
+from inventario.models import Ubicacion
+from .models import Ticket, TicketEliminado
+
+# ==============================================================================
+# MAPA DE CALOR DE FALLAS POR UBICACIÓN (NAVE × BANDA × TACTO)
+# ==============================================================================
+# Una sola consulta agrupada por nave/banda/tacto para el rango de fechas. El
+# resultado se guarda en la caché compartida con una clave que incluye la versión
+# de los datos: cualquier ticket creado, modificado o eliminado (o un cambio de
+# ubicaciones) produce una clave nueva y las entradas viejas caducan solas.
+
+MAPA_CALOR_KEY = 'mapa_calor:{inicio}:{fin}:{version}'
+MAPA_CALOR_TIMEOUT = 60 * 60 * 24
+
+
+def version_tickets():
+    """
+    Cambia con cada escritura de tickets. Son dos MAX sobre columnas con índice
+    (fecha_actualizacion y fecha_eliminacion), así que no depende del historial.
+    Todas las escrituras masivas (estados, integración, lotes) fijan fecha_actualizacion.
+    """
+    ultima = Ticket.objects.aggregate(ultima=Max('fecha_actualizacion'))['ultima']
+    eliminado = TicketEliminado.objects.aggregate(ultima=Max('fecha_eliminacion'))['ultima']
+    contenido = f"{ultima}|{eliminado}|{jerarquia.version_ubicaciones()}"
+    return hashlib.sha256(contenido.encode()).hexdigest()[:16]
+
+
+def _agregados(inicio, fin):
+    tiempo_reparacion = ExpressionWrapper(F('fecha_cierre') - F('fecha_creacion'), output_field=DurationField())
+    return (
+        Ticket.objects.filter(fecha_creacion__range=(inicio, fin))
+        .values('ubicacion__nave', 'ubicacion__banda', 'ubicacion__tacto')
+        .annotate(total=Count('id'), tiempo_reparacion=Avg(tiempo_reparacion))
+        .order_by()
+    )
+
+
+def construir_mapa(inicio, fin):
+    """
+    Devuelve {'naves': [{'nave', 'tactos', 'filas': [{'banda', 'celdas'}]}], 'maximo'}.
+    Cada celda es None (sin tickets) o {'tacto', 'total', 'mttr_horas', 'intensidad'},
+    con intensidad de 0 a 1 relativa a la celda con más fallas de todo el mapa.
+    """
+    celdas = {}
+    for fila in _agregados(inicio, fin):
+        clave = tuple(fila[campo] or '' for campo in ('ubicacion__nave', 'ubicacion__banda', 'ubicacion__tacto'))
+        mttr = fila['tiempo_reparacion']
+        celdas[clave] = {
+            'tacto': clave[2],
+            'total': fila['total'],
+            'mttr_horas': mttr.total_seconds() / 3600 if mttr is not None else None,
+        }
+
+    maximo = max((celda['total'] for celda in celdas.values()), default=0)
+    for celda in celdas.values():
+        celda['intensidad'] = round(celda['total'] / maximo, 2)
+
+    naves = []
+    for nave in sorted({clave[0] for clave in celdas}, key=jerarquia.orden_natural):
+        de_la_nave = [clave for clave in celdas if clave[0] == nave]
+        tactos = sorted({clave[2] for clave in de_la_nave}, key=jerarquia.orden_natural)
+        bandas = sorted({clave[1] for clave in de_la_nave}, key=jerarquia.orden_natural)
+        naves.append({
+            'nave': nave,
+            'tactos': tactos,
+            'filas': [
+                {'banda': banda, 'celdas': [celdas.get((nave, banda, tacto)) for tacto in tactos]}
+                for banda in bandas
+            ],
+        })
+    return {'naves': naves, 'maximo': maximo}
+
+
+def mapa_calor(inicio, fin):
+    """
+    construir_mapa() guardado en caché por ventana de fechas y versión de los datos.
+    """
+    clave = MAPA_CALOR_KEY.format(inicio=inicio.isoformat(), fin=fin.isoformat(), version=version_tickets())
+    mapa = cache.get(clave)
+    if mapa is None:
+        mapa = construir_mapa(inicio, fin)
+        cache.set(clave, mapa, MAPA_CALOR_TIMEOUT)
+    return mapa
+
+
+def ubicaciones_de_celda(nave, banda, tacto):
+    """
+    Ids de las ubicaciones de una celda. El detalle filtra por ubicacion_id para usar
+    el índice (ubicacion, fecha_creacion) sin unir con la tabla de ubicaciones.
+    """
+    filtro = Q()
+    for campo, valor in (('nave', nave), ('banda', banda), ('tacto', tacto)):
+        # El mapa agrupa vacíos y nulos en la misma celda
+        filtro &= Q(**{campo: valor}) if valor else Q(**{campo: ''}) | Q(**{f'{campo}__isnull': True})
+    return list(Ubicacion.objects.filter(filtro).values_list('pk', flat=True))
+
@@ -0,0 +1,136 @@
+# tickets/metricas.py
+
+from django.db import transaction
+from django.db.models import Avg, Count, DurationField, ExpressionWrapper, F, Max, Min
+
+from .models import MetricaConfiabilidad, Ticket
+
+# ==============================================================================
+# MÉTRICAS DE CONFIABILIDAD (MTBF / MTTR)
+# ==============================================================================
+# MTTR: promedio de (fecha_cierre - fecha_creacion) de los tickets cerrados.
+# MTBF: tiempo promedio entre reportes de falla consecutivos del mismo grupo,
+#       (última falla - primera falla) / (fallas - 1).
+
+# Por cada ámbito: campo de agrupación del ticket y campos extra para la etiqueta
+AMBITOS = {
+    MetricaConfiabilidad.AMBITO_HERRAMIENTA: ('herramienta_id', ['herramienta__modelo', 'herramienta__numero_serie']),
+    MetricaConfiabilidad.AMBITO_MODELO: ('herramienta__modelo', []),
+    MetricaConfiabilidad.AMBITO_UBICACION: (
+        'ubicacion_id',
+        ['ubicacion__nave', 'ubicacion__banda', 'ubicacion__tacto', 'ubicacion__operacion'],
+    ),
+}
+
+CAMPOS_METRICA = ['etiqueta', 'total_fallas', 'total_cerrados', 'primera_falla', 'ultima_falla', 'mtbf_horas', 'mttr_horas']
+
+
+def _etiqueta(ambito, fila):
+    if ambito == MetricaConfiabilidad.AMBITO_HERRAMIENTA:
+        return f"{fila['herramienta__modelo'] or 'N/A'} - S/N: {fila['herramienta__numero_serie']}"
+    if ambito == MetricaConfiabilidad.AMBITO_UBICACION:
+        partes = [fila['ubicacion__nave'], fila['ubicacion__banda'], fila['ubicacion__tacto'], fila['ubicacion__operacion']]
+        return " / ".join(parte for parte in partes if parte)
+    return fila['herramienta__modelo']
+
+
+def _agregados(tickets, ambito):
+    """
+    Una sola consulta agrupada con los datos necesarios para las métricas del ámbito.
+    """
+    campo, campos_etiqueta = AMBITOS[ambito]
+    tiempo_reparacion = ExpressionWrapper(F('fecha_cierre') - F('fecha_creacion'), output_field=DurationField())
+    return (
+        tickets.exclude(**{f'{campo}__isnull': True})
+        .values(campo, *campos_etiqueta)
+        .annotate(
+            total_fallas=Count('id'),
+            total_cerrados=Count('fecha_cierre'),
+            primera_falla=Min('fecha_creacion'),
+            ultima_falla=Max('fecha_creacion'),
+            tiempo_reparacion=Avg(tiempo_reparacion),
+        )
+        .order_by()
+    )
+
+
+def _construir_metrica(ambito, fila):
+    campo = AMBITOS[ambito][0]
+    total = fila['total_fallas']
+    mtbf = None
+    if total > 1:
+        mtbf = (fila['ultima_falla'] - fila['primera_falla']).total_seconds() / 3600 / (total - 1)
+    mttr = fila['tiempo_reparacion'].total_seconds() / 3600 if fila['tiempo_reparacion'] is not None else None
+    return MetricaConfiabilidad(
+        ambito=ambito,
+        clave=str(fila[campo]),
+        etiqueta=_etiqueta(ambito, fila)[:255],
+        total_fallas=total,
+        total_cerrados=fila['total_cerrados'],
+        primera_falla=fila['primera_falla'],
+        ultima_falla=fila['ultima_falla'],
+        mtbf_horas=mtbf,
+        mttr_horas=mttr,
+    )
+
+
+def recalcular_todas():
+    """
+    Reconstruye la tabla completa con una consulta agrupada por ámbito.
+    Devuelve un diccionario {ámbito: filas creadas}.
+    """
+    resultado = {}
+    with transaction.atomic():
+        MetricaConfiabilidad.objects.all().delete()
+        for ambito in AMBITOS:
+            metricas = [_construir_metrica(ambito, fila) for fila in _agregados(Ticket.objects.all(), ambito)]
+            MetricaConfiabilidad.objects.bulk_create(metricas, batch_size=1000)
+            resultado[ambito] = len(metricas)
+    return resultado
+
+
+def claves_de_tickets(pks):
+    """
+    Devuelve {ámbito: claves} afectadas por los tickets indicados.
+    """
+    claves = {ambito: set() for ambito in AMBITOS}
+    filas = Ticket.objects.filter(pk__in=pks).values_list('herramienta_id', 'herramienta__modelo', 'ubicacion_id')
+    for herramienta_id, modelo, ubicacion_id in filas:
+        claves[MetricaConfiabilidad.AMBITO_HERRAMIENTA].add(herramienta_id)
+        if modelo:
+            claves[MetricaConfiabilidad.AMBITO_MODELO].add(modelo)
+        claves[MetricaConfiabilidad.AMBITO_UBICACION].add(ubicacion_id)
+    return claves
+
+
+def unir_claves(*grupos):
+    """
+    Une varios {ámbito: claves}, p. ej. las de un ticket antes y después de moverlo.
+    """
+    return {ambito: set().union(*(claves[ambito] for claves in grupos)) for ambito in AMBITOS}
+
+
+def refrescar_metricas(claves):
+    """
+    Recalcula solo las filas de las claves indicadas ({ámbito: claves}).
+    El costo depende del historial de esas claves, no del total de tickets.
+    """
+    for ambito, valores in claves.items():
+        valores = {valor for valor in valores if valor not in (None, '')}
+        if not valores:
+            continue
+        campo = AMBITOS[ambito][0]
+        tickets = Ticket.objects.filter(**{f'{campo}__in': valores})
+        metricas = [_construir_metrica(ambito, fila) for fila in _agregados(tickets, ambito)]
+        with transaction.atomic():
+            MetricaConfiabilidad.objects.bulk_create(
+                metricas,
+                update_conflicts=True,
+                unique_fields=['ambito', 'clave'],
+                update_fields=CAMPOS_METRICA + ['fecha_actualizacion'],
+            )
+            # Claves que ya no tienen tickets (por ejemplo, tras eliminar uno)
+            vigentes = {metrica.clave for metrica in metricas}
+            MetricaConfiabilidad.objects.filter(
+                ambito=ambito, clave__in=[str(valor) for valor in valores]
+            ).exclude(clave__in=vigentes).delete()
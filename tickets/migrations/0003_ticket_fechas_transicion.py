@@ -0,0 +1,32 @@
+# Generated by Django 5.2.6 on 2026-10-19 13:30
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def rellenar_fechas_transicion(apps, schema_editor):
+    # La mejor aproximación para tickets existentes es su última actualización
+    Ticket = apps.get_model('tickets', 'Ticket')
+    Ticket.objects.filter(estado__nombre='En Reparación').update(fecha_inicio_reparacion=F('fecha_actualizacion'))
+    Ticket.objects.filter(estado__nombre='Cerrado').update(fecha_cierre=F('fecha_actualizacion'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0002_comentario'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ticket',
+            name='fecha_cierre',
+            field=models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='Fecha de Cierre'),
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='fecha_inicio_reparacion',
+            field=models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='Inicio de Reparación'),
+        ),
+        migrations.RunPython(rellenar_fechas_transicion, migrations.RunPython.noop),
+    ]
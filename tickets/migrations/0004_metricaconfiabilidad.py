@@ -0,0 +1,35 @@
+# Generated by Django 5.2.6 on 2026-10-19 13:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0003_ticket_fechas_transicion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MetricaConfiabilidad',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ambito', models.CharField(choices=[('herramienta', 'Herramienta'), ('modelo', 'Modelo'), ('ubicacion', 'Ubicación')], max_length=20)),
+                ('clave', models.CharField(max_length=100)),
+                ('etiqueta', models.CharField(max_length=255)),
+                ('total_fallas', models.PositiveIntegerField(default=0)),
+                ('total_cerrados', models.PositiveIntegerField(default=0)),
+                ('primera_falla', models.DateTimeField(blank=True, null=True)),
+                ('ultima_falla', models.DateTimeField(blank=True, null=True)),
+                ('mtbf_horas', models.FloatField(blank=True, null=True, verbose_name='MTBF (horas)')),
+                ('mttr_horas', models.FloatField(blank=True, null=True, verbose_name='MTTR (horas)')),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Métrica de Confiabilidad',
+                'verbose_name_plural': 'Métricas de Confiabilidad',
+                'indexes': [models.Index(fields=['ambito', 'mtbf_horas'], name='tickets_met_ambito_745eed_idx'), models.Index(fields=['ambito', 'mttr_horas'], name='tickets_met_ambito_b66ccc_idx'), models.Index(fields=['ambito', 'total_fallas'], name='tickets_met_ambito_6c7ae6_idx')],
+                'unique_together': {('ambito', 'clave')},
+            },
+        ),
+    ]
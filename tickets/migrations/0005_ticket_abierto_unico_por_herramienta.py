@@ -0,0 +1,58 @@
+# Generated by Django 5.2.6 on 2026-10-19 13:33
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def cerrar_tickets_abiertos_duplicados(apps, schema_editor):
+    # Antes de crear la restricción dejamos solo el ticket abierto más reciente por
+    # herramienta; los anteriores se cierran y queda constancia en la auditoría.
+    # Se cierran en su última actualización, no en la fecha de la migración, para
+    # no inflar el MTTR con el tiempo que el duplicado pasó olvidado.
+    Ticket = apps.get_model('tickets', 'Ticket')
+    TicketEstado = apps.get_model('tickets', 'TicketEstado')
+    AuditoriaTicket = apps.get_model('tickets', 'AuditoriaTicket')
+
+    herramientas_duplicadas = (
+        Ticket.objects.filter(fecha_cierre__isnull=True)
+        .values('herramienta_id').annotate(total=Count('id')).filter(total__gt=1)
+        .values_list('herramienta_id', flat=True)
+    )
+    if not herramientas_duplicadas:
+        return
+
+    estado_cerrado, _ = TicketEstado.objects.get_or_create(nombre='Cerrado')
+    for herramienta_id in herramientas_duplicadas:
+        abiertos = list(
+            Ticket.objects.filter(herramienta_id=herramienta_id, fecha_cierre__isnull=True)
+            .select_related('estado').order_by('-fecha_creacion', '-pk')
+        )
+        for ticket in abiertos[1:]:
+            AuditoriaTicket.objects.create(
+                ticket=ticket,
+                campo_modificado='estado',
+                valor_anterior=ticket.estado.nombre,
+                valor_nuevo=estado_cerrado.nombre,
+                accion=f'Cerrado por duplicado de {abiertos[0].folio}',
+            )
+            ticket.estado = estado_cerrado
+            ticket.fecha_cierre = ticket.fecha_actualizacion or ticket.fecha_creacion
+            ticket.save(update_fields=['estado', 'fecha_cierre'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0001_initial'),
+        ('tickets', '0004_metricaconfiabilidad'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(cerrar_tickets_abiertos_duplicados, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='ticket',
+            constraint=models.UniqueConstraint(condition=models.Q(('fecha_cierre__isnull', True)), fields=('herramienta',), name='ticket_abierto_unico_por_herramienta'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.6 on 2026-10-19 13:42
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0005_ticket_abierto_unico_por_herramienta'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportePDF',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('dashboard', 'Dashboard de Service Line'), ('diario', 'Reporte Diario')], max_length=20)),
+                ('filtros', models.JSONField(default=dict)),
+                ('clave_filtros', models.CharField(db_index=True, max_length=64)),
+                ('version_datos', models.CharField(max_length=64)),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('generando', 'Generando'), ('listo', 'Listo'), ('error', 'Error')], default='pendiente', max_length=20)),
+                ('archivo', models.FileField(blank=True, upload_to='reportes/')),
+                ('error', models.TextField(blank=True)),
+                ('fecha_solicitud', models.DateTimeField(auto_now_add=True)),
+                ('fecha_generacion', models.DateTimeField(blank=True, null=True)),
+                ('solicitado_por', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Reporte PDF',
+                'verbose_name_plural': 'Reportes PDF',
+                'ordering': ['-fecha_solicitud'],
+                'unique_together': {('clave_filtros', 'version_datos')},
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-19 13:51
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0006_reportepdf'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notificacion',
+            index=models.Index(condition=models.Q(('leido', False)), fields=['usuario_destino', '-fecha_creacion'], name='notificacion_no_leida_idx'),
+        ),
+    ]
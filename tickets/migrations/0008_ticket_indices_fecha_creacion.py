@@ -0,0 +1,24 @@
+# Generated by Django 5.2.6 on 2026-10-19 13:54
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0001_initial'),
+        ('tickets', '0007_notificacion_no_leida_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['-fecha_creacion', '-id'], name='ticket_fecha_creacion_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['estado', '-fecha_creacion'], name='ticket_estado_fecha_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.6 on 2026-10-19 13:59
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0001_initial'),
+        ('tickets', '0009_ticket_version'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TicketEliminado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ticket_id', models.PositiveIntegerField()),
+                ('folio', models.CharField(max_length=50)),
+                ('creado_por_id', models.IntegerField(null=True)),
+                ('fecha_eliminacion', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Ticket Eliminado',
+                'verbose_name_plural': 'Tickets Eliminados',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['fecha_actualizacion', 'id'], name='ticket_fecha_actualizacion_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticketeliminado',
+            index=models.Index(fields=['fecha_eliminacion', 'id'], name='ticket_eliminado_fecha_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.6 on 2026-10-19 14:04
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0010_ticketeliminado'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SincronizacionExterna',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fuente', models.CharField(max_length=500, unique=True)),
+                ('huella', models.CharField(blank=True, max_length=128)),
+                ('registros_procesados', models.PositiveIntegerField(default=0)),
+                ('completada', models.BooleanField(default=False)),
+                ('creados', models.PositiveIntegerField(default=0)),
+                ('actualizados', models.PositiveIntegerField(default=0)),
+                ('sin_cambios', models.PositiveIntegerField(default=0)),
+                ('rechazados', models.PositiveIntegerField(default=0)),
+                ('fecha_inicio', models.DateTimeField(blank=True, null=True)),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Sincronización Externa',
+                'verbose_name_plural': 'Sincronizaciones Externas',
+            },
+        ),
+        migrations.AlterField(
+            model_name='ticket',
+            name='fecha_creacion',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 14:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0011_sincronizacionexterna'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ticket',
+            name='clave_cliente',
+            field=models.UUIDField(blank=True, editable=False, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.6 on 2026-10-19 14:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0001_initial'),
+        ('tickets', '0012_ticket_clave_cliente'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['ubicacion', '-fecha_creacion', '-id'], name='ticket_ubicacion_fecha_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 14:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0013_ticket_ubicacion_fecha_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportepdf',
+            name='fecha_inicio',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -1,8 +1,10 @@
 # tickets/models.py
 
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import User
 from inventario.models import Herramienta, Ubicacion
+from .estados import transicion_permitida
 
 class Falla(models.Model):
     codigo = models.CharField(max_length=50, unique=True)
@@ -30,7 +32,8 @@ class Ticket(models.Model):
     folio = models.CharField(max_length=50, unique=True)
     numero_ticket_externo = models.CharField(max_length=50, blank=True, null=True, unique=True)
     comentarios = models.TextField(blank=True, null=True)
-    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    # default en lugar de auto_now_add: la sincronización externa conserva la fecha original
+    fecha_creacion = models.DateTimeField(default=timezone.now, editable=False)
     fecha_actualizacion = models.DateTimeField(auto_now=True)
     creado_por = models.ForeignKey(User, on_delete=models.PROTECT, related_name='tickets_creados')
     herramienta = models.ForeignKey(Herramienta, on_delete=models.PROTECT)
@@ -38,11 +41,41 @@ class Ticket(models.Model):
     ubicacion = models.ForeignKey(Ubicacion, on_delete=models.PROTECT)
     estado = models.ForeignKey(TicketEstado, on_delete=models.PROTECT)
     turno = models.CharField(max_length=50, blank=True, null=True, verbose_name="Turno")
+    # Fechas desnormalizadas que fija la máquina de estados (ver tickets/estados.py)
+    fecha_inicio_reparacion = models.DateTimeField(blank=True, null=True, db_index=True, verbose_name="Inicio de Reparación")
+    fecha_cierre = models.DateTimeField(blank=True, null=True, db_index=True, verbose_name="Fecha de Cierre")
+    # Se incrementa en cada escritura; los UPDATE se condicionan a ella (concurrencia optimista)
+    version = models.PositiveIntegerField(default=1, editable=False)
+    # Clave de idempotencia que genera la terminal al capturar sin conexión (envío por lotes)
+    clave_cliente = models.UUIDField(unique=True, blank=True, null=True, editable=False)
 
 
     def __str__(self):
         return f"Ticket {self.folio} ({self.estado.nombre})"
 
+    def puede_cambiar_a(self, nuevo_estado):
+        return transicion_permitida(self.estado.nombre, nuevo_estado.nombre)
+
+    class Meta:
+        constraints = [
+            # Un ticket sigue abierto mientras no tenga fecha de cierre; la base de datos
+            # garantiza que una herramienta tenga como máximo uno, incluso con creaciones concurrentes.
+            models.UniqueConstraint(
+                fields=['herramienta'],
+                condition=models.Q(fecha_cierre__isnull=True),
+                name='ticket_abierto_unico_por_herramienta',
+            ),
+        ]
+        indexes = [
+            # Rango de fechas del dashboard y cursor del modal de detalle (fecha_creacion, pk)
+            models.Index(fields=['-fecha_creacion', '-id'], name='ticket_fecha_creacion_idx'),
+            models.Index(fields=['estado', '-fecha_creacion'], name='ticket_estado_fecha_idx'),
+            # Feed de cambios para los kioscos (tickets/sincronizacion.py)
+            models.Index(fields=['fecha_actualizacion', 'id'], name='ticket_fecha_actualizacion_idx'),
+            # Detalle de una celda del mapa de calor: ubicaciones de la celda, por fecha
+            models.Index(fields=['ubicacion', '-fecha_creacion', '-id'], name='ticket_ubicacion_fecha_idx'),
+        ]
+
 class AuditoriaTicket(models.Model):
     ticket = models.ForeignKey(Ticket, on_delete=models.CASCADE)
     usuario = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
@@ -73,6 +106,15 @@ class Notificacion(models.Model):
 
     class Meta:
         ordering = ['-fecha_creacion']
+        indexes = [
+            # Solo las no leídas: contador de la campana y bandeja de entrada.
+            # Las leídas se purgan, así que el índice se mantiene pequeño.
+            models.Index(
+                fields=['usuario_destino', '-fecha_creacion'],
+                condition=models.Q(leido=False),
+                name='notificacion_no_leida_idx',
+            ),
+        ]
         verbose_name = 'Notificación'
         verbose_name_plural = 'Notificaciones'
         
@@ -89,4 +131,133 @@ class Comentario(models.Model):
         return f"Comentario de {self.autor.username} en ticket {self.ticket.folio}"
 
     class Meta:
-        ordering = ['fecha_creacion'] # Muestra los comentarios del más antiguo al más nuevo
\ No newline at end of file
+        ordering = ['fecha_creacion'] # Muestra los comentarios del más antiguo al más nuevo
+
+class MetricaConfiabilidad(models.Model):
+    """
+    Métricas de confiabilidad precalculadas (MTBF/MTTR) por herramienta, modelo o ubicación.
+    Se refrescan por clave cuando cambia un ticket y se reconstruyen con `recalcular_metricas`.
+    """
+    AMBITO_HERRAMIENTA = 'herramienta'
+    AMBITO_MODELO = 'modelo'
+    AMBITO_UBICACION = 'ubicacion'
+    AMBITO_CHOICES = [
+        (AMBITO_HERRAMIENTA, 'Herramienta'),
+        (AMBITO_MODELO, 'Modelo'),
+        (AMBITO_UBICACION, 'Ubicación'),
+    ]
+
+    ambito = models.CharField(max_length=20, choices=AMBITO_CHOICES)
+    clave = models.CharField(max_length=100)
+    etiqueta = models.CharField(max_length=255)
+    total_fallas = models.PositiveIntegerField(default=0)
+    total_cerrados = models.PositiveIntegerField(default=0)
+    primera_falla = models.DateTimeField(blank=True, null=True)
+    ultima_falla = models.DateTimeField(blank=True, null=True)
+    mtbf_horas = models.FloatField(blank=True, null=True, verbose_name="MTBF (horas)")
+    mttr_horas = models.FloatField(blank=True, null=True, verbose_name="MTTR (horas)")
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.get_ambito_display()}: {self.etiqueta}"
+
+    class Meta:
+        unique_together = ('ambito', 'clave')
+        indexes = [
+            models.Index(fields=['ambito', 'mtbf_horas']),
+            models.Index(fields=['ambito', 'mttr_horas']),
+            models.Index(fields=['ambito', 'total_fallas']),
+        ]
+        verbose_name = 'Métrica de Confiabilidad'
+        verbose_name_plural = 'Métricas de Confiabilidad'
+
+class ReportePDF(models.Model):
+    """
+    PDF generado en segundo plano (comando `generar_reporte_pdf`).
+    Se identifica por los filtros y la versión de los datos: si nada cambió,
+    una nueva solicitud reutiliza el archivo ya generado.
+    """
+    TIPO_DASHBOARD = 'dashboard'
+    TIPO_DIARIO = 'diario'
+    TIPO_CHOICES = [
+        (TIPO_DASHBOARD, 'Dashboard de Service Line'),
+        (TIPO_DIARIO, 'Reporte Diario'),
+    ]
+
+    ESTADO_PENDIENTE = 'pendiente'
+    ESTADO_GENERANDO = 'generando'
+    ESTADO_LISTO = 'listo'
+    ESTADO_ERROR = 'error'
+    ESTADO_CHOICES = [
+        (ESTADO_PENDIENTE, 'Pendiente'),
+        (ESTADO_GENERANDO, 'Generando'),
+        (ESTADO_LISTO, 'Listo'),
+        (ESTADO_ERROR, 'Error'),
+    ]
+
+    tipo = models.CharField(max_length=20, choices=TIPO_CHOICES)
+    filtros = models.JSONField(default=dict)
+    clave_filtros = models.CharField(max_length=64, db_index=True)
+    version_datos = models.CharField(max_length=64)
+    estado = models.CharField(max_length=20, choices=ESTADO_CHOICES, default=ESTADO_PENDIENTE)
+    archivo = models.FileField(upload_to='reportes/', blank=True)
+    error = models.TextField(blank=True)
+    solicitado_por = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    fecha_solicitud = models.DateTimeField(auto_now_add=True)
+    fecha_inicio = models.DateTimeField(blank=True, null=True)
+    fecha_generacion = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"{self.get_tipo_display()} ({self.get_estado_display()})"
+
+    class Meta:
+        unique_together = ('clave_filtros', 'version_datos')
+        ordering = ['-fecha_solicitud']
+        verbose_name = 'Reporte PDF'
+        verbose_name_plural = 'Reportes PDF'
+
+
+class TicketEliminado(models.Model):
+    """
+    Registro de tickets eliminados (lápidas) para el feed de cambios de los kioscos.
+    Lo llena la señal post_delete de Ticket y se purga tras DIAS_RETENCION_ELIMINADOS.
+    """
+    ticket_id = models.PositiveIntegerField()
+    folio = models.CharField(max_length=50)
+    creado_por_id = models.IntegerField(null=True)
+    fecha_eliminacion = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Ticket {self.folio} eliminado"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['fecha_eliminacion', 'id'], name='ticket_eliminado_fecha_idx'),
+        ]
+        verbose_name = 'Ticket Eliminado'
+        verbose_name_plural = 'Tickets Eliminados'
+
+
+class SincronizacionExterna(models.Model):
+    """
+    Punto de control de `sincronizar_tickets_externos` por fuente (archivo o URL).
+    Cada lote se confirma junto con su avance: si el proceso se interrumpe, la
+    siguiente ejecución sobre la misma fuente (misma huella) continúa donde quedó.
+    """
+    fuente = models.CharField(max_length=500, unique=True)
+    huella = models.CharField(max_length=128, blank=True)
+    registros_procesados = models.PositiveIntegerField(default=0)
+    completada = models.BooleanField(default=False)
+    creados = models.PositiveIntegerField(default=0)
+    actualizados = models.PositiveIntegerField(default=0)
+    sin_cambios = models.PositiveIntegerField(default=0)
+    rechazados = models.PositiveIntegerField(default=0)
+    fecha_inicio = models.DateTimeField(blank=True, null=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.fuente
+
+    class Meta:
+        verbose_name = 'Sincronización Externa'
+        verbose_name_plural = 'Sincronizaciones Externas'
@@ -0,0 +1,46 @@
+# tickets/notificaciones.py
+
+import datetime
+import time
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Notificacion
+
+# ==============================================================================
+# RETENCIÓN DE NOTIFICACIONES
+# ==============================================================================
+# Se crea una notificación por miembro de Service Line y ticket; sin purga la
+# tabla crece para siempre.
+DIAS_RETENCION_LEIDAS = 7
+DIAS_RETENCION_MAXIMA = 90
+TAMANO_LOTE_PURGA = 1000
+
+
+def purgar_notificaciones(dias_leidas=DIAS_RETENCION_LEIDAS, dias_maximo=DIAS_RETENCION_MAXIMA,
+                          lote=TAMANO_LOTE_PURGA, pausa=0.1):
+    """
+    Borra las notificaciones leídas con más de `dias_leidas` días y todas las que
+    tengan más de `dias_maximo`. Recorre la tabla por pk en lotes pequeños: cada
+    DELETE es una transacción corta que no bloquea a quien crea notificaciones.
+    Devuelve cuántas se borraron.
+    """
+    ahora = timezone.now()
+    caducadas = Notificacion.objects.filter(
+        Q(leido=True, fecha_creacion__lt=ahora - datetime.timedelta(days=dias_leidas))
+        | Q(fecha_creacion__lt=ahora - datetime.timedelta(days=dias_maximo))
+    )
+
+    borradas = 0
+    ultimo_pk = 0
+    while True:
+        pks = list(caducadas.filter(pk__gt=ultimo_pk).order_by('pk').values_list('pk', flat=True)[:lote])
+        if not pks:
+            break
+        Notificacion.objects.filter(pk__in=pks).delete()
+        borradas += len(pks)
+        ultimo_pk = pks[-1]
+        if pausa:
+            time.sleep(pausa)
+    return borradas
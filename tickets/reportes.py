@@ -0,0 +1,144 @@
+# tickets/reportes.py
+
+import datetime
+import hashlib
+import json
+import logging
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models import Count, Max, Q
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from tareas.registro import encolar
+
+from .catalogos import version_catalogo
+from .filtros import tickets_filtrados
+from .models import ReportePDF
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# REPORTES PDF EN SEGUNDO PLANO
+# ==============================================================================
+# La petición solo registra el ReportePDF y encola la tarea `generar_reporte_pdf`;
+# el render con WeasyPrint (segundos de CPU) lo hace `manage.py run_worker`.
+
+# Un PDF con miles de filas no lo lee nadie y tarda mucho en renderizarse
+MAXIMO_FILAS_PDF = 500
+
+PLANTILLAS = {
+    ReportePDF.TIPO_DASHBOARD: 'reportes/dashboard_pdf.html',
+    ReportePDF.TIPO_DIARIO: 'reportes/diario_pdf.html',
+}
+
+
+def clave_filtros(tipo, filtros):
+    contenido = json.dumps({'tipo': tipo, 'filtros': filtros}, sort_keys=True)
+    return hashlib.sha256(contenido.encode()).hexdigest()
+
+
+def version_datos(tipo, filtros):
+    """
+    Cambia cuando se crea, modifica o elimina un ticket del reporte, o cambia un catálogo.
+    Es una sola consulta agregada sobre el mismo filtro del reporte.
+    """
+    resumen = tickets_filtrados(tipo, filtros).aggregate(total=Count('id'), ultima=Max('fecha_actualizacion'))
+    ultima = resumen['ultima'].isoformat() if resumen['ultima'] else ''
+    contenido = f"{resumen['total']}|{ultima}|{version_catalogo()}"
+    return hashlib.sha256(contenido.encode()).hexdigest()
+
+
+def _abandonados():
+    """
+    Reportes en `generando` desde hace más de TAREAS_TIEMPO_MAXIMO: el worker que los
+    tomó murió sin marcarlos como listos o con error.
+    """
+    limite = timezone.now() - datetime.timedelta(seconds=getattr(settings, 'TAREAS_TIEMPO_MAXIMO', 1800))
+    return Q(estado=ReportePDF.ESTADO_GENERANDO) & (Q(fecha_inicio__lt=limite) | Q(fecha_inicio__isnull=True))
+
+
+def solicitar_reporte(tipo, filtros, usuario=None):
+    """
+    Devuelve el ReportePDF de esos filtros y datos; si no existe, falló o quedó
+    abandonado a medias, lo encola.
+    """
+    with transaction.atomic():
+        reporte, creado = ReportePDF.objects.get_or_create(
+            clave_filtros=clave_filtros(tipo, filtros),
+            version_datos=version_datos(tipo, filtros),
+            defaults={'tipo': tipo, 'filtros': filtros, 'solicitado_por': usuario},
+        )
+        if not creado and reporte.estado in (ReportePDF.ESTADO_ERROR, ReportePDF.ESTADO_GENERANDO):
+            # Reintento explícito del usuario, o un worker que murió a mitad del render
+            reintentar = ReportePDF.objects.filter(
+                Q(estado=ReportePDF.ESTADO_ERROR) | _abandonados(), pk=reporte.pk
+            ).update(estado=ReportePDF.ESTADO_PENDIENTE, error='', fecha_inicio=None)
+            if reintentar:
+                reporte.estado = ReportePDF.ESTADO_PENDIENTE
+                creado = True
+        if creado:
+            # Misma transacción que el reporte: el worker no ve la tarea si la solicitud se revierte
+            encolar('generar_reporte_pdf', {'reporte_pk': reporte.pk}, clave=f'reporte_pdf:{reporte.pk}')
+    return reporte
+
+
+def _contexto(reporte):
+    tickets = tickets_filtrados(reporte.tipo, reporte.filtros)
+    total = tickets.count()
+    return {
+        'reporte': reporte,
+        'filtros': reporte.filtros,
+        'fecha_reporte': timezone.now(),
+        'total_tickets': total,
+        'conteo_por_estado': tickets.values('estado__nombre').annotate(total=Count('id')).order_by('-total'),
+        'conteo_por_turno': tickets.exclude(turno__isnull=True).exclude(turno='').values('turno').annotate(total=Count('id')).order_by('turno'),
+        'top_herramientas_fallas': tickets.values('herramienta__modelo').annotate(total=Count('id')).order_by('-total')[:5],
+        'tickets': tickets.select_related('herramienta', 'falla', 'estado', 'creado_por').order_by('-fecha_creacion')[:MAXIMO_FILAS_PDF],
+        'filas_omitidas': max(total - MAXIMO_FILAS_PDF, 0),
+    }
+
+
+def renderizar_pdf(reporte):
+    # WeasyPrint es pesado de importar y necesita Pango: solo se carga en el proceso que genera
+    from weasyprint import HTML
+
+    html = render_to_string(PLANTILLAS[reporte.tipo], _contexto(reporte))
+    return HTML(string=html, base_url=str(settings.BASE_DIR)).write_pdf()
+
+
+def generar_reporte(reporte_pk):
+    """
+    Genera el PDF de un reporte pendiente. Devuelve False si otro proceso ya lo tomó.
+    Un reporte abandonado en `generando` (ver _abandonados) se vuelve a tomar: así la
+    tarea que recupera_huerfanas devuelve a la cola no lo encuentra bloqueado.
+    """
+    tomado = ReportePDF.objects.filter(
+        Q(estado=ReportePDF.ESTADO_PENDIENTE) | _abandonados(), pk=reporte_pk
+    ).update(estado=ReportePDF.ESTADO_GENERANDO, fecha_inicio=timezone.now())
+    if not tomado:
+        return False
+
+    reporte = ReportePDF.objects.get(pk=reporte_pk)
+    try:
+        contenido = renderizar_pdf(reporte)
+    except Exception as exc:
+        logger.exception("No se pudo generar el reporte PDF %s", reporte_pk)
+        reporte.estado = ReportePDF.ESTADO_ERROR
+        reporte.error = str(exc)[:1000]
+        reporte.save(update_fields=['estado', 'error'])
+        return True
+
+    nombre = f"{reporte.tipo}_{reporte.clave_filtros[:12]}_{reporte.version_datos[:12]}.pdf"
+    reporte.archivo.save(nombre, ContentFile(contenido), save=False)
+    reporte.estado = ReportePDF.ESTADO_LISTO
+    reporte.fecha_generacion = timezone.now()
+    reporte.save(update_fields=['archivo', 'estado', 'fecha_generacion'])
+
+    # Las versiones anteriores de los mismos filtros ya no se pueden pedir
+    for anterior in ReportePDF.objects.filter(clave_filtros=reporte.clave_filtros, estado=ReportePDF.ESTADO_LISTO).exclude(pk=reporte.pk):
+        anterior.archivo.delete(save=False)
+        anterior.delete()
+    return True
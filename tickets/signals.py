@@ -1,35 +1,83 @@
 # tickets/signals.py
 
-from django.db.models.signals import post_save
+import logging
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from django.contrib.auth.models import User, Group # <-- Añade Group a la importación
-from .models import Ticket, Notificacion
+from usuarios.permisos import miembros_de_grupo
+from .models import Ticket, TicketEliminado, Notificacion, MetricaConfiabilidad, TicketEstado, Falla
+from inventario.models import Herramienta
+from .catalogos import invalidar_catalogo
+from .metricas import claves_de_tickets, refrescar_metricas
+
+logger = logging.getLogger(__name__)
 
 @receiver(post_save, sender=Ticket)
 def crear_notificacion_nuevo_ticket(sender, instance, created, **kwargs):
     """
     Señal que se activa después de que se guarda un ticket para crear notificaciones.
-    Ahora notifica a los miembros del grupo 'Service Line'.
+    Notifica a los miembros del grupo 'Service Line', leídos de la caché de grupos.
+    """
+    if created:
+        # Esperamos al commit para que el folio definitivo ya esté asignado
+        transaction.on_commit(lambda: notificar_service_line(instance))
+
+
+def notificar_service_line(ticket):
+    miembros = miembros_de_grupo('Service Line')
+    if miembros is None:
+        logger.warning("El grupo 'Service Line' no existe. No se pueden crear notificaciones.")
+        return
+
+    mensaje = f"Nuevo ticket {ticket.folio} creado por {ticket.creado_por.username}."
+    notificaciones = Notificacion.objects.bulk_create([
+        Notificacion(usuario_destino_id=usuario_pk, ticket=ticket, mensaje=mensaje)
+        for usuario_pk in miembros
+        if usuario_pk != ticket.creado_por_id
+    ])
+    logger.debug("Ticket %s: %s notificaciones creadas.", ticket.folio, len(notificaciones))
+
+
+@receiver(post_save, sender=Ticket)
+def refrescar_metricas_nuevo_ticket(sender, instance, created, **kwargs):
+    """
+    Un ticket nuevo es una falla más: refresca el MTBF de su herramienta, modelo y ubicación.
     """
     if created:
-        try:
-            # 1. Buscamos el grupo específico por su nombre
-            service_line_group = Group.objects.get(name='Service Line')
-            # 2. Obtenemos todos los usuarios que pertenecen a ese grupo
-            usuarios_a_notificar = service_line_group.user_set.all()
-
-            print(f"Señal activada para ticket {instance.folio}. Grupo 'Service Line' encontrado con {usuarios_a_notificar.count()} usuarios.")
-
-            for usuario in usuarios_a_notificar:
-                if usuario != instance.creado_por:
-                    mensaje = f"Nuevo ticket {instance.folio} creado por {instance.creado_por.username}."
-                    Notificacion.objects.create(
-                        usuario_destino=usuario,
-                        ticket=instance,
-                        mensaje=mensaje
-                    )
-                    print(f"Notificación creada para {usuario.username}.")
-
-        except Group.DoesNotExist:
-            # Este mensaje aparecerá si el grupo 'Service Line' no existe
-            print("ADVERTENCIA: El grupo 'Service Line' no existe. No se pueden crear notificaciones.")
\ No newline at end of file
+        pk = instance.pk
+        transaction.on_commit(lambda: refrescar_metricas(claves_de_tickets([pk])))
+
+
+@receiver(post_delete, sender=Ticket)
+def refrescar_metricas_ticket_eliminado(sender, instance, **kwargs):
+    claves = {
+        MetricaConfiabilidad.AMBITO_HERRAMIENTA: {instance.herramienta_id},
+        MetricaConfiabilidad.AMBITO_MODELO: {instance.herramienta.modelo},
+        MetricaConfiabilidad.AMBITO_UBICACION: {instance.ubicacion_id},
+    }
+    transaction.on_commit(lambda: refrescar_metricas(claves))
+
+
+@receiver(post_delete, sender=Ticket)
+def registrar_ticket_eliminado(sender, instance, **kwargs):
+    """
+    Deja una lápida para que los kioscos quiten el ticket en su siguiente sincronización.
+    Se escribe en la misma transacción que el borrado.
+    """
+    TicketEliminado.objects.create(ticket_id=instance.pk, folio=instance.folio, creado_por_id=instance.creado_por_id)
+
+
+@receiver(post_save, sender=TicketEstado)
+@receiver(post_delete, sender=TicketEstado)
+@receiver(post_save, sender=Falla)
+@receiver(post_delete, sender=Falla)
+@receiver(post_save, sender=Herramienta)
+@receiver(post_delete, sender=Herramienta)
+def invalidar_filas_en_cache(sender, **kwargs):
+    """
+    Las filas de la lista muestran nombres de estados, fallas y herramientas: si cambian,
+    una nueva versión de catálogo deja obsoletos todos los fragmentos en caché.
+    Se invalida al confirmar para que nadie guarde filas viejas con la versión nueva.
+    """
+    transaction.on_commit(invalidar_catalogo)
@@ -0,0 +1,134 @@
+# tickets/sincronizacion.py
+
+import base64
+import datetime
+import json
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .exportaciones import CAMPOS_NDJSON
+from .models import Ticket, TicketEliminado
+
+# ==============================================================================
+# FEED DE CAMBIOS PARA KIOSCOS (SINCRONIZACIÓN INCREMENTAL)
+# ==============================================================================
+# El kiosco guarda la `marca` de la última respuesta y la envía en la siguiente.
+# La marca guarda una posición (fecha, id) por flujo: tickets por fecha_actualizacion
+# y lápidas por fecha_eliminacion, ambas con índice. El cliente aplica los
+# cambios por id, así que recibir una fila dos veces no tiene efecto.
+
+LIMITE_CAMBIOS = 500
+# Una transacción puede confirmarse después de que otra más reciente ya se leyó.
+# La marca no avanza más allá de ahora - MARGEN, así que esas filas llegan en la siguiente llamada.
+MARGEN_CONFIRMACION = datetime.timedelta(seconds=30)
+# Las lápidas se purgan tras este plazo; un kiosco con una marca más vieja debe resincronizar
+DIAS_RETENCION_ELIMINADOS = 30
+
+CAMPOS_KIOSCO = [
+    'id', 'folio', 'estado', 'turno', 'version', 'fecha_creacion', 'fecha_actualizacion',
+    'herramienta_modelo', 'herramienta_numero_serie', 'falla',
+    'ubicacion_nave', 'ubicacion_banda', 'ubicacion_tacto', 'ubicacion_operacion',
+]
+
+_INICIO = (datetime.datetime.min.replace(tzinfo=datetime.timezone.utc), 0)
+
+
+class MarcaCaducada(Exception):
+    """La marca del cliente es anterior a la retención de lápidas."""
+
+
+def leer_marca(texto):
+    """
+    Decodifica la marca opaca. Sin marca se empieza desde el principio (carga inicial).
+    Lanza ValueError si no es válida.
+    """
+    if not texto:
+        return {'tickets': _INICIO, 'eliminados': _INICIO}
+    try:
+        datos = json.loads(base64.urlsafe_b64decode(texto.encode()))
+        marca = {
+            flujo: (datetime.datetime.fromisoformat(datos[flujo][0]), int(datos[flujo][1]))
+            for flujo in ('tickets', 'eliminados')
+        }
+        # escribir_marca siempre guarda la zona; una fecha sin ella no salió de aquí
+        if any(timezone.is_naive(fecha) for fecha, _ in marca.values()):
+            raise ValueError("Fecha sin zona horaria.")
+        return marca
+    except (KeyError, IndexError, TypeError, ValueError):
+        raise ValueError("Marca de sincronización inválida.")
+
+
+def escribir_marca(marca):
+    datos = {flujo: [fecha.isoformat(), pk] for flujo, (fecha, pk) in marca.items()}
+    return base64.urlsafe_b64encode(json.dumps(datos, separators=(',', ':')).encode()).decode()
+
+
+def _despues_de(queryset, campo_fecha, posicion):
+    fecha, pk = posicion
+    return queryset.filter(Q(**{f'{campo_fecha}__gt': fecha}) | Q(**{campo_fecha: fecha, 'pk__gt': pk}))
+
+
+def _nueva_posicion(anterior, filas, limite, tope):
+    # Página llena: se continúa justo después de la última fila. Si no, ya se
+    # entregó todo lo confirmado y se avanza hasta el tope seguro.
+    if len(filas) >= limite:
+        return filas[-1]
+    return max(anterior, (tope, 0))
+
+
+def cambios_desde(texto_marca, usuario, limite=LIMITE_CAMBIOS):
+    """
+    Tickets modificados y lápidas de tickets eliminados después de la marca.
+    Devuelve un diccionario listo para JsonResponse; 'hay_mas' indica que el
+    cliente debe volver a llamar de inmediato con la nueva marca.
+    """
+    marca = leer_marca(texto_marca)
+    ahora = timezone.now()
+    if texto_marca and marca['eliminados'][0] < ahora - datetime.timedelta(days=DIAS_RETENCION_ELIMINADOS):
+        raise MarcaCaducada()
+    tope = ahora - MARGEN_CONFIRMACION
+    if not texto_marca:
+        # En la carga inicial no hay nada que borrar: solo importan las lápidas de aquí en adelante
+        marca['eliminados'] = (tope, 0)
+
+    tickets = Ticket.objects.all()
+    eliminados = TicketEliminado.objects.all()
+    if not usuario.has_perm('tickets.view_ticket'):
+        # Mismo criterio que la lista: cada quien ve solo sus tickets
+        tickets = tickets.filter(creado_por=usuario)
+        eliminados = eliminados.filter(creado_por_id=usuario.pk)
+
+    rutas = [CAMPOS_NDJSON[campo] for campo in CAMPOS_KIOSCO]
+    filas_tickets = list(
+        _despues_de(tickets, 'fecha_actualizacion', marca['tickets'])
+        .order_by('fecha_actualizacion', 'pk')
+        .values_list(*rutas)[:limite]
+    )
+    filas_eliminados = list(
+        _despues_de(eliminados, 'fecha_eliminacion', marca['eliminados'])
+        .order_by('fecha_eliminacion', 'pk')
+        .values_list('fecha_eliminacion', 'pk', 'ticket_id', 'folio')[:limite]
+    )
+
+    i_fecha = CAMPOS_KIOSCO.index('fecha_actualizacion')
+    nueva_marca = {
+        'tickets': _nueva_posicion(
+            marca['tickets'], [(fila[i_fecha], fila[0]) for fila in filas_tickets], limite, tope
+        ),
+        'eliminados': _nueva_posicion(
+            marca['eliminados'], [(fila[0], fila[1]) for fila in filas_eliminados], limite, tope
+        ),
+    }
+    return {
+        'tickets': [dict(zip(CAMPOS_KIOSCO, fila)) for fila in filas_tickets],
+        'eliminados': [{'id': fila[2], 'folio': fila[3]} for fila in filas_eliminados],
+        'marca': escribir_marca(nueva_marca),
+        'hay_mas': len(filas_tickets) >= limite or len(filas_eliminados) >= limite,
+    }
+
+
+def purgar_eliminados(dias=DIAS_RETENCION_ELIMINADOS):
+    limite = timezone.now() - datetime.timedelta(days=dias)
+    borrados, _ = TicketEliminado.objects.filter(fecha_eliminacion__lt=limite).delete()
+    return borrados
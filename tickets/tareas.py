@@ -0,0 +1,44 @@
+# tickets/tareas.py
+
+import datetime
+
+from django.conf import settings
+from django.core.management import call_command
+
+from tareas.registro import tarea
+
+
+@tarea(reintentos=0)
+def generar_reporte_pdf(reporte_pk):
+    # Los errores de render se registran en el propio ReportePDF; no tiene caso reintentar
+    from .reportes import generar_reporte
+    generar_reporte(reporte_pk)
+
+
+@tarea(cada=datetime.timedelta(days=1))
+def recalcular_metricas():
+    from .metricas import recalcular_todas
+    recalcular_todas()
+
+
+@tarea(cada=datetime.timedelta(days=1))
+def enviar_reporte_diario():
+    call_command('enviar_reporte_diario')
+
+
+@tarea(cada=datetime.timedelta(days=1))
+def purgar_notificaciones():
+    from .notificaciones import purgar_notificaciones as purgar
+    purgar()
+
+
+@tarea(cada=datetime.timedelta(days=1))
+def purgar_tickets_eliminados():
+    from .sincronizacion import purgar_eliminados
+    purgar_eliminados()
+
+
+@tarea(cada=datetime.timedelta(hours=1))
+def sincronizar_tickets_externos():
+    if settings.SINCRONIZACION_EXTERNA_FUENTE:
+        call_command('sincronizar_tickets_externos', settings.SINCRONIZACION_EXTERNA_FUENTE)
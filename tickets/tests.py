@@ -1,3 +1,334 @@
-from django.test import TestCase
+import datetime
+import uuid
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from inventario.models import Herramienta, Ubicacion
+from . import integracion
+from .estados import ESTADO_ABIERTO, ESTADO_CERRADO, ESTADO_EN_REPARACION, transicionar_tickets
+from .lotes import CREADO, DUPLICADO, RECHAZADO, crear_lote
+from .models import AuditoriaTicket, Falla, Ticket, TicketEstado
+from .sincronizacion import MARGEN_CONFIRMACION, MarcaCaducada, cambios_desde, escribir_marca
+from .versiones import actualizar_con_version
+
+
+# Caché en memoria: los catálogos y la jerarquía de ubicaciones se guardan por versión
+# y no deben mezclarse con la caché de archivos del entorno de desarrollo
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class TicketsTestCase(TestCase):
+    """
+    Estados, ubicación, herramientas, falla y usuario comunes a las pruebas de tickets.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.abierto = TicketEstado.objects.create(nombre=ESTADO_ABIERTO)
+        cls.en_reparacion = TicketEstado.objects.create(nombre=ESTADO_EN_REPARACION)
+        cls.cerrado = TicketEstado.objects.create(nombre=ESTADO_CERRADO)
+        cls.usuario = User.objects.create_superuser('supervisor', password='x')
+        cls.ubicacion = Ubicacion.objects.create(nave='A1', banda='B1', tacto='T1', operacion='10')
+        cls.herramientas = [
+            Herramienta.objects.create(numero_serie=f'SN-{i}', modelo='M1', ubicacion=cls.ubicacion)
+            for i in range(3)
+        ]
+        cls.falla = Falla.objects.create(codigo='F01', descripcion='No aprieta')
+
+    def setUp(self):
+        # Las invalidaciones por señal corren en on_commit, que TestCase no ejecuta
+        cache.clear()
+
+    def crear_ticket(self, folio, herramienta=None, estado=None, **valores):
+        estado = estado or self.abierto
+        if estado == self.cerrado:
+            valores.setdefault('fecha_cierre', timezone.now())
+        valores.setdefault('creado_por', self.usuario)
+        return Ticket.objects.create(
+            folio=folio,
+            herramienta=herramienta or self.herramientas[0],
+            ubicacion=self.ubicacion,
+            falla=self.falla,
+            estado=estado,
+            **valores,
+        )
+
+
+# ==============================================================================
+# MÁQUINA DE ESTADOS Y CONCURRENCIA OPTIMISTA
+# ==============================================================================
+
+class TransicionarTicketsTests(TicketsTestCase):
+
+    def test_cerrar_fija_fecha_de_cierre_y_audita(self):
+        ticket = self.crear_ticket('TK1')
+        cambiados = transicionar_tickets([ticket.pk], self.cerrado, self.usuario)
+
+        self.assertEqual([(t['pk'], t['version']) for t in cambiados], [(ticket.pk, 2)])
+        ticket.refresh_from_db()
+        self.assertEqual(ticket.estado, self.cerrado)
+        self.assertIsNotNone(ticket.fecha_cierre)
+        auditoria = AuditoriaTicket.objects.get(ticket=ticket)
+        self.assertEqual((auditoria.valor_anterior, auditoria.valor_nuevo), (ESTADO_ABIERTO, ESTADO_CERRADO))
+
+    def test_transicion_no_permitida_se_omite(self):
+        ticket = self.crear_ticket('TK1', estado=self.cerrado)
+
+        self.assertEqual(transicionar_tickets([ticket.pk], self.en_reparacion, self.usuario), [])
+        ticket.refresh_from_db()
+        self.assertEqual((ticket.estado, ticket.version), (self.cerrado, 1))
+
+    def test_version_obsoleta_no_cambia_el_ticket(self):
+        ticket = self.crear_ticket('TK1')
+
+        self.assertEqual(transicionar_tickets([ticket.pk], self.cerrado, self.usuario, version=5), [])
+        ticket.refresh_from_db()
+        self.assertEqual(ticket.estado, self.abierto)
+        self.assertFalse(AuditoriaTicket.objects.exists())
+
+    def test_no_reabre_si_la_herramienta_tiene_otro_ticket_abierto(self):
+        cerrado = self.crear_ticket('TK1', estado=self.cerrado)
+        self.crear_ticket('TK2')
+
+        self.assertEqual(transicionar_tickets([cerrado.pk], self.abierto, self.usuario), [])
+        cerrado.refresh_from_db()
+        self.assertIsNotNone(cerrado.fecha_cierre)
+
+    def test_reabre_solo_uno_por_herramienta_en_el_mismo_lote(self):
+        primero = self.crear_ticket('TK1', estado=self.cerrado)
+        segundo = self.crear_ticket('TK2', estado=self.cerrado)
+
+        cambiados = transicionar_tickets([primero.pk, segundo.pk], self.abierto, self.usuario)
+        self.assertEqual(len(cambiados), 1)
+        self.assertEqual(Ticket.objects.filter(fecha_cierre__isnull=True).count(), 1)
+
+    def test_volver_a_reparacion_conserva_la_primera_fecha(self):
+        inicio = timezone.now() - datetime.timedelta(days=2)
+        ticket = self.crear_ticket('TK1', estado=self.en_reparacion, fecha_inicio_reparacion=inicio)
+        transicionar_tickets([ticket.pk], self.abierto, self.usuario)
+        transicionar_tickets([ticket.pk], self.en_reparacion, self.usuario)
+
+        ticket.refresh_from_db()
+        self.assertEqual((ticket.fecha_inicio_reparacion, ticket.version), (inicio, 3))
+
+
+class ActualizarConVersionTests(TicketsTestCase):
+
+    def test_version_vigente_escribe_y_la_incrementa(self):
+        ticket = self.crear_ticket('TK1')
+
+        self.assertEqual(actualizar_con_version(ticket.pk, 1, comentarios='Revisado'), 2)
+        ticket.refresh_from_db()
+        self.assertEqual((ticket.comentarios, ticket.version), ('Revisado', 2))
+
+    def test_version_obsoleta_devuelve_none(self):
+        ticket = self.crear_ticket('TK1', comentarios='Original')
+        actualizar_con_version(ticket.pk, 1, comentarios='Primero')
+
+        self.assertIsNone(actualizar_con_version(ticket.pk, 1, comentarios='Segundo'))
+        ticket.refresh_from_db()
+        self.assertEqual((ticket.comentarios, ticket.version), ('Primero', 2))
+
+
+# ==============================================================================
+# CAPTURA SIN CONEXIÓN (LOTES)
+# ==============================================================================
+
+class CrearLoteTests(TicketsTestCase):
+
+    def item(self, herramienta, **extra):
+        return {'clave': str(uuid.uuid4()), 'herramienta': herramienta.pk, 'falla': self.falla.pk, **extra}
+
+    def test_crea_tickets_abiertos_con_folio_definitivo(self):
+        resultados = crear_lote([self.item(self.herramientas[0]), self.item(self.herramientas[1])], self.usuario)
+
+        self.assertEqual([r['estado'] for r in resultados], [CREADO, CREADO])
+        for resultado in resultados:
+            ticket = Ticket.objects.get(clave_cliente=resultado['clave'])
+            self.assertEqual(resultado['folio'], f"TK{str(ticket.pk).zfill(8)}")
+            self.assertEqual((ticket.estado, ticket.ubicacion), (self.abierto, self.ubicacion))
+
+    def test_reenviar_el_lote_no_duplica(self):
+        lote = [self.item(self.herramientas[0])]
+        folio = crear_lote(lote, self.usuario)[0]['folio']
+
+        resultado = crear_lote(lote, self.usuario)[0]
+        self.assertEqual((resultado['estado'], resultado['folio']), (DUPLICADO, folio))
+        self.assertEqual(Ticket.objects.count(), 1)
+
+    def test_rechaza_herramienta_con_ticket_abierto(self):
+        existente = self.crear_ticket('TK1')
+        resultados = crear_lote(
+            [self.item(self.herramientas[0]), self.item(self.herramientas[1]), self.item(self.herramientas[1])],
+            self.usuario,
+        )
+
+        self.assertEqual([r['estado'] for r in resultados], [RECHAZADO, CREADO, RECHAZADO])
+        self.assertIn(existente.folio, resultados[0]['error'])
+        self.assertEqual(resultados[2]['error'], "la herramienta ya tiene otro ticket abierto en el lote")
+
+    def test_rechaza_items_invalidos_sin_afectar_al_resto(self):
+        resultados = crear_lote([
+            {'clave': 'no-es-uuid', 'herramienta': self.herramientas[0].pk},
+            self.item(self.herramientas[0]) | {'herramienta': 999999},
+            self.item(self.herramientas[0], ubicacion=999999),
+            self.item(self.herramientas[0]),
+        ], self.usuario)
+
+        self.assertEqual(
+            [(r['estado'], r['error']) for r in resultados],
+            [
+                (RECHAZADO, "clave inválida"),
+                (RECHAZADO, "herramienta desconocida"),
+                (RECHAZADO, "ubicación desconocida"),
+                (CREADO, None),
+            ],
+        )
+
+
+# ==============================================================================
+# SINCRONIZACIÓN CON EL SISTEMA CORPORATIVO
+# ==============================================================================
+
+class AplicarLoteTests(TicketsTestCase):
+
+    def registro(self, numero='EXT1', **extra):
+        return {
+            'numero_ticket': numero,
+            'numero_serie': self.herramientas[0].numero_serie,
+            'estado': ESTADO_ABIERTO,
+            'codigo_falla': self.falla.codigo,
+            'fecha_creacion': '2026-01-05T08:00:00+00:00',
+            **extra,
+        }
+
+    def aplicar(self, *registros):
+        return integracion.aplicar_lote(list(registros), integracion.Catalogos(), self.usuario.pk)
+
+    def test_crea_y_repetir_el_registro_no_cambia_nada(self):
+        resultado, pks = self.aplicar(self.registro())
+        self.assertEqual(resultado['creados'], 1)
+        ticket = Ticket.objects.get(pk__in=pks)
+        self.assertEqual((ticket.folio, ticket.ubicacion), ('EXT-EXT1', self.ubicacion))
+
+        resultado, pks = self.aplicar(self.registro())
+        self.assertEqual((resultado['sin_cambios'], pks), (1, []))
+        ticket.refresh_from_db()
+        self.assertEqual(ticket.version, 1)
+
+    def test_actualiza_cambios_e_incrementa_la_version(self):
+        self.aplicar(self.registro())
+        resultado, pks = self.aplicar(self.registro(comentarios='Cambio de resorte'))
+
+        self.assertEqual(resultado['actualizados'], 1)
+        ticket = Ticket.objects.get(pk__in=pks)
+        self.assertEqual((ticket.comentarios, ticket.version), ('Cambio de resorte', 2))
+
+    def test_registro_sin_fechas_conserva_las_guardadas(self):
+        self.aplicar(self.registro(estado=ESTADO_CERRADO, fecha_cierre='2026-01-06T10:00:00+00:00'))
+        resultado, _ = self.aplicar(self.registro(estado=ESTADO_CERRADO, fecha_creacion=None))
+
+        self.assertEqual(resultado['sin_cambios'], 1)
+        ticket = Ticket.objects.get()
+        self.assertEqual(ticket.fecha_cierre, datetime.datetime(2026, 1, 6, 10, tzinfo=datetime.timezone.utc))
+
+    def test_rechaza_herramienta_con_otro_ticket_abierto(self):
+        self.crear_ticket('TK1')
+        resultado, pks = self.aplicar(self.registro(), self.registro('EXT2', numero_serie='desconocida'))
+
+        self.assertEqual((resultado['rechazados'], pks), (2, []))
+        self.assertEqual(resultado['rechazo: la herramienta ya tiene otro ticket abierto'], 1)
+        self.assertEqual(resultado['rechazo: herramienta desconocida'], 1)
+
+    def test_reintenta_si_una_edicion_local_gana_la_carrera(self):
+        self.aplicar(self.registro())
+        ticket = Ticket.objects.get()
+        completar_fechas = integracion.completar_fechas
+
+        def editar_antes_de_escribir(*args):
+            # Otra petición guarda el ticket después de que el lote leyó su versión
+            actualizar_con_version(ticket.pk, 1, turno='2do Turno')
+            return completar_fechas(*args)
+
+        with mock.patch.object(integracion, 'completar_fechas', side_effect=editar_antes_de_escribir):
+            resultado, pks = self.aplicar(self.registro(comentarios='Sincronizado'))
+
+        self.assertEqual((resultado['actualizados'], pks), (1, [ticket.pk]))
+        ticket.refresh_from_db()
+        self.assertEqual((ticket.comentarios, ticket.turno, ticket.version), ('Sincronizado', None, 3))
+
+    def test_escribir_con_version_no_pisa_una_version_nueva(self):
+        ticket = self.crear_ticket('TK1')
+        actualizar_con_version(ticket.pk, 1, comentarios='Local')
+        valores = {campo: getattr(ticket, campo) for campo in integracion.CAMPOS_SINCRONIZADOS}
+
+        escritos, perdidos = integracion._escribir_con_version([(ticket.pk, 1, valores)], timezone.now())
+        self.assertEqual((escritos, list(perdidos)), ([], [ticket.pk]))
+        ticket.refresh_from_db()
+        self.assertEqual((ticket.comentarios, ticket.version), ('Local', 2))
+
+
+# ==============================================================================
+# FEED DE CAMBIOS PARA KIOSCOS
+# ==============================================================================
+
+class CambiosDesdeTests(TicketsTestCase):
+
+    def crear_ticket_confirmado(self, folio, antiguedad=datetime.timedelta(hours=1), **valores):
+        # Fuera del margen de confirmación para que la marca avance más allá del ticket
+        ticket = self.crear_ticket(folio, **valores)
+        Ticket.objects.filter(pk=ticket.pk).update(fecha_actualizacion=timezone.now() - antiguedad)
+        return ticket
+
+    def test_carga_inicial_y_luego_solo_cambios(self):
+        ticket = self.crear_ticket_confirmado('TK1')
+        respuesta = cambios_desde('', self.usuario)
+        self.assertEqual([fila['id'] for fila in respuesta['tickets']], [ticket.pk])
+        self.assertFalse(respuesta['hay_mas'])
+
+        self.assertEqual(cambios_desde(respuesta['marca'], self.usuario)['tickets'], [])
+
+        otro = self.crear_ticket_confirmado('TK2', herramienta=self.herramientas[1], antiguedad=datetime.timedelta(seconds=1))
+        eliminado_pk = ticket.pk
+        ticket.delete()
+        siguiente = cambios_desde(respuesta['marca'], self.usuario)
+        self.assertEqual([fila['id'] for fila in siguiente['tickets']], [otro.pk])
+        self.assertEqual(siguiente['eliminados'], [{'id': eliminado_pk, 'folio': 'TK1'}])
+
+    def test_pagina_por_limite(self):
+        tickets = [
+            self.crear_ticket_confirmado(f'TK{i}', herramienta=herramienta, antiguedad=datetime.timedelta(hours=3 - i))
+            for i, herramienta in enumerate(self.herramientas)
+        ]
+        primera = cambios_desde('', self.usuario, limite=2)
+        self.assertTrue(primera['hay_mas'])
+        segunda = cambios_desde(primera['marca'], self.usuario, limite=2)
+
+        self.assertEqual(
+            [fila['id'] for fila in primera['tickets'] + segunda['tickets']], [t.pk for t in tickets]
+        )
+        self.assertFalse(segunda['hay_mas'])
+
+    def test_sin_permiso_solo_ve_sus_tickets(self):
+        operador = User.objects.create_user('operador', password='x')
+        self.crear_ticket_confirmado('TK1')
+        propio = self.crear_ticket_confirmado('TK2', herramienta=self.herramientas[1], creado_por=operador)
+
+        respuesta = cambios_desde('', operador)
+        self.assertEqual([fila['id'] for fila in respuesta['tickets']], [propio.pk])
+
+    def test_rechaza_marcas_invalidas_o_caducadas(self):
+        ahora = timezone.now()
+        ingenua = escribir_marca({'tickets': (datetime.datetime(2026, 1, 1), 0), 'eliminados': (datetime.datetime(2026, 1, 1), 0)})
+        for marca in ('no-es-una-marca', ingenua):
+            with self.assertRaises(ValueError):
+                cambios_desde(marca, self.usuario)
+
+        caducada = escribir_marca({
+            'tickets': (ahora - MARGEN_CONFIRMACION, 0),
+            'eliminados': (ahora - datetime.timedelta(days=365), 0),
+        })
+        with self.assertRaises(MarcaCaducada):
+            cambios_desde(caducada, self.usuario)
@@ -1,7 +1,7 @@
 # tickets/urls.py
 
 from django.urls import path
-from . import views
+from . import api, views
 
 urlpatterns = [
     path('crear/', views.crear_ticket, name='crear_ticket'),
@@ -12,12 +12,19 @@ urlpatterns = [
     
     # URL para actualizar estado
     path('actualizar-estado/<int:pk>/', views.actualizar_estado_ticket, name='actualizar_estado_ticket'),
+    path('actualizar-estado/masivo/', views.actualizar_estado_masivo, name='actualizar_estado_masivo'),
     
     # URL para el Dashboard
     path('dashboard/', views.dashboard_service_line, name='dashboard_service_line'),
+    path('dashboard/confiabilidad/', views.metricas_confiabilidad, name='metricas_confiabilidad'),
+    path('dashboard/mapa-calor/', views.mapa_calor_fallas, name='mapa_calor_fallas'),
     
     # URL para la búsqueda de HTMX
     path('buscar-herramientas/', views.buscar_herramientas, name='buscar_herramientas'),
+
+    # Selector de ubicación en cascada (nave -> banda -> tacto/operación)
+    path('ubicaciones/bandas/', views.opciones_bandas, name='opciones_bandas'),
+    path('ubicaciones/puntos/', views.opciones_puntos, name='opciones_puntos'),
     
     # --- NUEVA URL PARA VERIFICAR DUPLICADOS ---
     path('verificar-duplicado/<int:herramienta_pk>/', views.verificar_ticket_duplicado, name='verificar_ticket_duplicado'),
@@ -27,6 +34,19 @@ urlpatterns = [
     
     
     path('dashboard/exportar/', views.exportar_tickets_excel, name='exportar_tickets'),
+
+    # API para BI e integraciones (sesión o HTTP Basic)
+    path('api/export.ndjson', api.exportar_tickets_ndjson, name='api_exportar_tickets_ndjson'),
+    path('api/cambios/', api.cambios_tickets, name='api_cambios_tickets'),
+
+    # Captura sin conexión: catálogos para la terminal y envío de la cola por lotes
+    path('api/catalogos/', api.catalogos_captura, name='api_catalogos_captura'),
+    path('api/lote/', api.crear_tickets_lote, name='api_crear_tickets_lote'),
+
+    # Reportes PDF generados en segundo plano
+    path('reportes/pdf/solicitar/', views.solicitar_reporte_pdf, name='solicitar_reporte_pdf'),
+    path('reportes/pdf/<int:pk>/estado/', views.estado_reporte_pdf, name='estado_reporte_pdf'),
+    path('reportes/pdf/<int:pk>/descargar/', views.descargar_reporte_pdf, name='descargar_reporte_pdf'),
     
 # --- URL ÚNICA PARA TODOS LOS DETALLES EN POP-UP ---
     path('modal/detalles-filtrados/', views.detalles_filtrados_modal, name='modal_detalles_filtrados'),
@@ -36,5 +56,7 @@ urlpatterns = [
     # URLs para Notificaciones
     path('notificaciones/', views.ver_notificaciones, name='ver_notificaciones'),
     path('notificaciones/contador/', views.contar_notificaciones_sin_leer, name='contar_notificaciones_sin_leer'),
+    path('notificaciones/bandeja/', views.bandeja_notificaciones, name='bandeja_notificaciones'),
+    path('notificaciones/marcar-todas/', views.marcar_todas_leidas, name='marcar_todas_leidas'),
     path('notificaciones/leer/<int:notificacion_pk>/', views.marcar_leida_y_redirigir, name='marcar_leida_y_redirigir'),
 ]
\ No newline at end of file
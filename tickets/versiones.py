@@ -0,0 +1,26 @@
+# tickets/versiones.py
+
+from django.db.models import F
+from django.utils import timezone
+
+# ==============================================================================
+# CONCURRENCIA OPTIMISTA DE TICKETS
+# ==============================================================================
+# Cada escritura incrementa Ticket.version. En lugar de bloquear la fila, el UPDATE
+# se condiciona a la versión que el usuario tenía al cargar el formulario: si otro
+# usuario guardó antes, no se actualiza ninguna fila y la vista responde 409.
+
+
+def actualizar_con_version(pk, version, **valores):
+    """
+    UPDATE ... SET <valores>, version = version + 1 WHERE pk = %s AND version = %s.
+    Escribe solo las columnas indicadas. Devuelve la nueva versión o None si hubo conflicto.
+    """
+    from .models import Ticket
+
+    filas = Ticket.objects.filter(pk=pk, version=version).update(
+        version=F('version') + 1,
+        fecha_actualizacion=timezone.now(),
+        **valores,
+    )
+    return version + 1 if filas else None
@@ -4,22 +4,44 @@ from django.contrib.auth.decorators import login_required
 from django.urls import reverse
 from django.utils import timezone
 from django.contrib.auth.models import User
-from django.db.models import Count
+from django.db import IntegrityError, transaction
+from django.core.exceptions import ValidationError
+from django.db.models import Count, F, Q
+from django.core.paginator import Paginator
 import datetime
-from django.http import JsonResponse
+from django.http import FileResponse, Http404, HttpResponseBadRequest, JsonResponse
 from django.http import HttpResponse
 import json # Asegúrate de tener este import
 
 
 from .forms import TicketForm, ActualizarEstadoForm, ComentarioForm
-from .models import Ticket, TicketEstado, Herramienta, Notificacion
+from .models import Ticket, TicketEstado, Herramienta, Notificacion, MetricaConfiabilidad, ReportePDF
+from .estados import transicionar_tickets
+from .versiones import actualizar_con_version
+from .catalogos import version_catalogo
+from .lotes import calcular_turno
+from .metricas import claves_de_tickets, refrescar_metricas, unir_claves
+from .filtros import filtros_de_peticion, rango_de_filtros
+from .mapa_calor import mapa_calor, ubicaciones_de_celda
+from .reportes import solicitar_reporte
+from sgtr.db_routers import usar_replica
+from sgtr.paginacion import LIMITE_CONTEO_FILTRADO, PaginadorConteoEstimado
+from inventario import jerarquia
 from .models import Ticket, Comentario
 
 
 
 from django.http import HttpResponse
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment
+from .exportaciones import libro_excel_tickets
+
+# Máximo de herramientas que devuelve la búsqueda en vivo del formulario
+LIMITE_RESULTADOS_BUSQUEDA = 50
+# Notificaciones que se muestran en el menú de la campana
+LIMITE_NOTIFICACIONES_MENU = 10
+# Filas por página de la lista de tickets
+TICKETS_POR_PAGINA = 50
+# Filas por página del modal de detalle del dashboard
+FILAS_POR_PAGINA_MODAL = 50
 
 # ==============================================================================
 # Vistas Principales (CRUD)
@@ -32,14 +54,7 @@ def crear_ticket(request):
     Calcula la fecha y el turno, y genera un folio autoincremental.
     """
     ahora = timezone.localtime(timezone.now())
-    hora_actual = ahora.time()
-
-    if hora_actual >= datetime.time(6, 0) and hora_actual < datetime.time(14, 0):
-        turno = "1er Turno"
-    elif hora_actual >= datetime.time(14, 0) and hora_actual < datetime.time(21, 30):
-        turno = "2do Turno"
-    else:
-        turno = "3er Turno"
+    turno = calcular_turno(ahora)
 
     if request.method == 'POST':
         form = TicketForm(request.POST)
@@ -52,14 +67,18 @@ def crear_ticket(request):
                 nuevo_ticket.creado_por = request.user
                 nuevo_ticket.turno = turno
                 
-                nuevo_ticket.save() # Primer guardado para obtener un ID
-                nuevo_ticket.folio = f"TK{str(nuevo_ticket.id).zfill(8)}"
-                nuevo_ticket.save() # Segundo guardado con el folio
+                with transaction.atomic():
+                    nuevo_ticket.save() # Primer guardado para obtener un ID
+                    nuevo_ticket.folio = f"TK{str(nuevo_ticket.id).zfill(8)}"
+                    nuevo_ticket.save(update_fields=['folio']) # Segundo guardado con el folio
 
                 messages.success(request, f"¡Ticket {nuevo_ticket.folio} creado exitosamente!")
                 return redirect('crear_ticket')
             except TicketEstado.DoesNotExist:
                 messages.error(request, "Error crítico: El estado 'Abierto' no existe. Por favor, créalo en el panel de administración.")
+            except IntegrityError:
+                # Otro operador abrió un ticket para la misma herramienta al mismo tiempo
+                messages.error(request, "Ya existe un ticket abierto para esta herramienta. No se creó un ticket nuevo.")
     else:
         form = TicketForm(initial={
             'fecha_actual': ahora.strftime("%d/%m/%Y %H:%M:%S"),
@@ -69,7 +88,9 @@ def crear_ticket(request):
     form.helper.form_action = reverse('crear_ticket')
     contexto = {
         'form': form,
-        'titulo': 'Generar Nuevo Ticket de Reparación'
+        'titulo': 'Generar Nuevo Ticket de Reparación',
+        # La captura nueva puede encolarse sin conexión y enviarse por lotes (tickets/lotes.py)
+        'cola_offline': True,
     }
     return render(request, 'tickets/crear_ticket.html', contexto)
 
@@ -84,13 +105,19 @@ def lista_tickets(request):
         lista_de_tickets = Ticket.objects.all().order_by('-fecha_creacion')
     else:
         lista_de_tickets = Ticket.objects.filter(creado_por=request.user).order_by('-fecha_creacion')
+    lista_de_tickets = lista_de_tickets.select_related('herramienta', 'falla', 'estado', 'creado_por')
+    # Por página: cada fila es una entrada de caché, así que solo se leen las que se muestran
+    pagina = PaginadorConteoEstimado(lista_de_tickets, TICKETS_POR_PAGINA).get_page(request.GET.get('page'))
     
     # ⭐ CORRECCIÓN CLAVE: Obtenemos la lista de todos los estados posibles
     opciones_estado = TicketEstado.objects.all()
     
     contexto = {
-        'tickets': lista_de_tickets,
-        'opciones_estado': opciones_estado # <-- Se la pasamos a la plantilla
+        'tickets': pagina,
+        'pagina': pagina,
+        'opciones_estado': opciones_estado, # <-- Se la pasamos a la plantilla
+        # Las filas se cachean por (ticket, fecha_actualizacion, versión de catálogo)
+        'version_catalogo': version_catalogo(),
     }
     return render(request, 'tickets/lista_tickets.html', contexto)
 
@@ -146,18 +173,72 @@ def editar_ticket(request, pk):
         messages.error(request, "No tienes permiso para editar este ticket.")
         return redirect('lista_tickets')
     
+    status = 200
     if request.method == 'POST':
+        estado_anterior = ticket.estado
         form = TicketForm(request.POST, instance=ticket)
         if form.is_valid():
-            form.save()
-            messages.success(request, f"Ticket {ticket.folio} actualizado exitosamente.")
-            return redirect('detalles_ticket', pk=ticket.pk)
+            version = form.cleaned_data['version']
+            nuevo_estado = form.cleaned_data['estado']
+            # Solo se escriben las columnas que el usuario cambió; el estado lo aplica
+            # la máquina de estados para fijar sus fechas
+            valores = {
+                campo: form.cleaned_data[campo]
+                for campo in form.changed_data
+                if campo in form.Meta.fields and campo != 'estado'
+            }
+            transicion_rechazada = herramienta_ocupada = False
+            # Mover el ticket de herramienta o ubicación cambia las métricas de ambos lados
+            claves_anteriores = claves_de_tickets([ticket.pk]) if {'herramienta', 'ubicacion'} & valores.keys() else None
+            try:
+                with transaction.atomic():
+                    if valores:
+                        version = actualizar_con_version(ticket.pk, version, **valores)
+                    if version is not None and claves_anteriores:
+                        transaction.on_commit(lambda: refrescar_metricas(
+                            unir_claves(claves_anteriores, claves_de_tickets([ticket.pk]))
+                        ))
+                    if version is not None and nuevo_estado != estado_anterior:
+                        cambiados = transicionar_tickets([ticket.pk], nuevo_estado, request.user, version=version)
+                        if not cambiados:
+                            # Con la versión intacta, la máquina de estados rechazó el cambio
+                            # (p. ej. reabrir con otro ticket abierto de la misma herramienta)
+                            transicion_rechazada = Ticket.objects.filter(pk=ticket.pk, version=version).exists()
+                        version = cambiados[0]['version'] if cambiados else None
+                    if version is None:
+                        transaction.set_rollback(True)
+            except IntegrityError:
+                # Otro operador abrió un ticket para la nueva herramienta al mismo tiempo
+                herramienta_ocupada, version = True, None
+            if version is not None:
+                messages.success(request, f"Ticket {ticket.folio} actualizado exitosamente.")
+                return redirect('detalles_ticket', pk=ticket.pk)
+            if herramienta_ocupada:
+                form.add_error(None, "La herramienta ya tiene otro ticket abierto. No se guardaron los cambios.")
+            elif transicion_rechazada:
+                form.add_error('estado', f"No se pudo pasar el ticket a '{nuevo_estado.nombre}': la herramienta ya tiene otro ticket abierto.")
+            else:
+                form.add_error('version', ValidationError(
+                    f"El ticket {ticket.folio} fue modificado por otro usuario mientras lo editabas.", code='conflicto'
+                ))
+
+        if form.has_error('version', 'conflicto'):
+            # Conflicto de versión: se recarga el formulario con los datos actuales
+            mensaje = f"{form.errors['version'][0]} Revisa los cambios y vuelve a guardar."
+            if request.htmx:
+                response = HttpResponse(status=409) # 409 = Conflicto
+                response.headers['HX-Trigger'] = json.dumps({'showToast': {'text': mensaje, 'type': 'error'}})
+                return response
+            messages.error(request, mensaje)
+            ticket = get_object_or_404(Ticket, pk=pk)
+            form = TicketForm(instance=ticket)
+            status = 409
     else:
         form = TicketForm(instance=ticket)
 
     form.helper.form_action = reverse('editar_ticket', kwargs={'pk': ticket.pk})
     contexto = {'form': form, 'titulo': f'Editando Ticket: {ticket.folio}'}
-    return render(request, 'tickets/crear_ticket.html', contexto)
+    return render(request, 'tickets/crear_ticket.html', contexto, status=status)
 
 
 @login_required
@@ -193,78 +274,208 @@ def actualizar_estado_ticket(request, pk):
     ticket = get_object_or_404(Ticket, pk=pk)
 
     if request.method == 'POST':
+        estado_anterior = ticket.estado
         form = ActualizarEstadoForm(request.POST, instance=ticket)
         if form.is_valid():
-            form.save()
-            mensaje = f"Ticket {ticket.folio} actualizado a '{ticket.estado.nombre}'."
+            nuevo_estado = form.cleaned_data['estado']
+            version = form.cleaned_data['version']
+            if nuevo_estado != estado_anterior:
+                # La transición y sus fechas se aplican en un UPDATE condicionado al estado y a la versión
+                cambiados = transicionar_tickets([ticket.pk], nuevo_estado, request.user, version=version)
+                if not cambiados:
+                    mensaje = f"No se pudo actualizar {ticket.folio}: otro usuario lo modificó mientras lo editabas o su herramienta ya tiene otro ticket abierto."
+                    response = HttpResponse(status=409) # 409 = Conflicto
+                    response.headers['HX-Trigger'] = json.dumps({'showToast': {'text': mensaje, 'type': 'error'}})
+                    return response
+                version = cambiados[0]['version']
+            mensaje = f"Ticket {ticket.folio} actualizado a '{nuevo_estado.nombre}'."
 
             # Creamos una respuesta vacía con una cabecera HX-Trigger
             response = HttpResponse(status=204) # 204 = Éxito, Sin Contenido
-            response.headers['HX-Trigger'] = f'{{"showToast": {{"text": "{mensaje}", "type": "success"}}}}'
+            response.headers['HX-Trigger'] = json.dumps({
+                'showToast': {'text': mensaje, 'type': 'success'},
+                'ticketsActualizados': {'ids': [ticket.pk], 'estado': nuevo_estado.pk, 'versiones': {ticket.pk: version}},
+            })
+            return response
+        elif form.has_error('version', 'conflicto'):
+            mensaje = f"{form.errors['version'][0]} Recarga la página para ver su estado actual."
+            response = HttpResponse(status=409) # 409 = Conflicto
+            response.headers['HX-Trigger'] = json.dumps({'showToast': {'text': mensaje, 'type': 'error'}})
             return response
         else:
-            # Si hay errores en el formulario
-            mensaje = "Error al actualizar el ticket."
+            # Si hay errores en el formulario (incluida una transición no permitida)
+            errores = form.errors.get('estado')
+            mensaje = errores[0] if errores else "Error al actualizar el ticket."
             response = HttpResponse(status=400) # 400 = Petición Inválida
-            response.headers['HX-Trigger'] = f'{{"showToast": {{"text": "{mensaje}", "type": "error"}}}}'
+            response.headers['HX-Trigger'] = json.dumps({'showToast': {'text': mensaje, 'type': 'error'}})
             return response
 
     return HttpResponse(status=405) # 405 = Método no permitido si no es POST
 
 
-def buscar_herramientas(request):
+@login_required
+def actualizar_estado_masivo(request):
+    """
+    Vista para HTMX: Cambia el estado de varios tickets seleccionados en la lista.
+    Hace un solo UPDATE (respetando la máquina de estados) y escribe auditoría y
+    notificaciones con bulk_create.
+    """
+    if not request.user.has_perm('tickets.change_ticket'):
+        return HttpResponse(status=403)
+
+    if request.method != 'POST':
+        return HttpResponse(status=405)
+
+    ids = [pk for pk in request.POST.getlist('tickets') if pk.isdigit()]
+    estado_pk = request.POST.get('estado', '')
+    nuevo_estado = TicketEstado.objects.filter(pk=estado_pk).first() if estado_pk.isdigit() else None
+
+    if not ids or nuevo_estado is None:
+        mensaje = "Selecciona al menos un ticket y un estado válido."
+        response = HttpResponse(status=400)
+        response.headers['HX-Trigger'] = json.dumps({'showToast': {'text': mensaje, 'type': 'error'}})
+        return response
+
+    with transaction.atomic():
+        # Solo cambian los tickets cuyo estado actual admite la transición
+        tickets_cambiados = transicionar_tickets(ids, nuevo_estado, request.user, accion='Cambio de estado masivo')
+        Notificacion.objects.bulk_create([
+            Notificacion(
+                usuario_destino_id=t['creado_por_id'],
+                ticket_id=t['pk'],
+                mensaje=f"Ticket {t['folio']} cambió a '{nuevo_estado.nombre}'.",
+            )
+            for t in tickets_cambiados
+            if t['creado_por_id'] != request.user.pk
+        ])
+    pks_cambiados = [t['pk'] for t in tickets_cambiados]
+
+    omitidos = len(ids) - len(pks_cambiados)
+    mensaje = f"{len(pks_cambiados)} ticket(s) actualizados a '{nuevo_estado.nombre}'."
+    if omitidos:
+        mensaje += f" {omitidos} omitidos (sin cambio o transición no permitida)."
+
+    response = HttpResponse(status=204)
+    response.headers['HX-Trigger'] = json.dumps({
+        'showToast': {'text': mensaje, 'type': 'success'},
+        'ticketsActualizados': {
+            'ids': pks_cambiados,
+            'estado': nuevo_estado.pk,
+            'versiones': {t['pk']: t['version'] for t in tickets_cambiados},
+        },
+    })
+    return response
+
+
+# --- Endpoints HTMX asíncronos ---
+# Son consultas pequeñas y de E/S: bajo ASGI (gunicorn con UvicornWorker) no ocupan un
+# worker síncrono mientras esperan a la base de datos. Las consultas se materializan con
+# el ORM asíncrono antes de renderizar, porque la plantilla no puede tocar la BBDD.
+
+@login_required
+async def buscar_herramientas(request):
     """
     Vista para HTMX: Busca herramientas y devuelve una lista de resultados.
     """
     query = request.POST.get('text_search', '')
+    herramientas = []
     if query:
-        herramientas = Herramienta.objects.filter(numero_serie__icontains=query) | Herramienta.objects.filter(modelo__icontains=query)
-    else:
-        herramientas = []
+        herramientas = [
+            h async for h in Herramienta.objects.filter(
+                Q(numero_serie__icontains=query) | Q(modelo__icontains=query)
+            )[:LIMITE_RESULTADOS_BUSQUEDA]
+        ]
     return render(request, 'tickets/partials/search_results.html', {'herramientas': herramientas})
 
 
 @login_required
-def ver_notificaciones(request):
+def opciones_bandas(request):
+    """
+    Vista para HTMX: opciones de banda de la nave elegida, leídas del árbol en memoria.
+    """
+    opciones = [('', 'Seleccionar Banda')] + [(b, b) for b in jerarquia.bandas(request.GET.get('nave', ''))]
+    return render(request, 'partials/opciones_select.html', {'opciones': opciones})
+
+
+@login_required
+def opciones_puntos(request):
     """
-    CORREGIDO: Esta vista ahora SOLO muestra las notificaciones, NO las marca como leídas.
+    Vista para HTMX: tactos/operaciones de la banda elegida; el valor es el pk de la Ubicacion.
     """
-    notificaciones = Notificacion.objects.filter(usuario_destino=request.user, leido=False)
+    puntos = jerarquia.puntos(request.GET.get('nave', ''), request.GET.get('banda', ''))
+    opciones = [('', 'Seleccionar Tacto / Operación')] + puntos
+    return render(request, 'partials/opciones_select.html', {'opciones': opciones})
+
+
+@login_required
+async def ver_notificaciones(request):
+    """
+    Vista para HTMX: las notificaciones sin leer más recientes para el menú de la campana.
+    Solo muestra, no marca como leídas; el resto está en la bandeja paginada.
+    """
+    usuario = await request.auser()
+    notificaciones = [
+        n async for n in Notificacion.objects.filter(usuario_destino=usuario, leido=False)[:LIMITE_NOTIFICACIONES_MENU]
+    ]
     return render(request, 'partials/lista_notificaciones.html', {'notificaciones': notificaciones})
 
 
-# tickets/views.py
+@login_required
+async def contar_notificaciones_sin_leer(request):
+    usuario = await request.auser()
+    cantidad = await Notificacion.objects.filter(usuario_destino=usuario, leido=False).acount()
+    return render(request, 'partials/contador_notificaciones.html', {'cantidad_notificaciones': cantidad})
+
 
 @login_required
-def contar_notificaciones_sin_leer(request):
-    print("--- Depurando la vista del contador de notificaciones ---")
+def bandeja_notificaciones(request):
+    """
+    Bandeja de entrada paginada; por defecto solo las no leídas (índice parcial).
+    """
+    ver_todas = request.GET.get('todas') == '1'
+    notificaciones = Notificacion.objects.filter(usuario_destino=request.user)
+    if not ver_todas:
+        notificaciones = notificaciones.filter(leido=False)
+    pagina = Paginator(notificaciones, 25).get_page(request.GET.get('page'))
+    return render(request, 'tickets/bandeja_notificaciones.html', {'pagina': pagina, 'ver_todas': ver_todas})
 
-    # 1. Verificamos quién es el usuario que está pidiendo la información
-    print(f"Usuario de la petición: {request.user.username} (ID: {request.user.id})")
 
-    # 2. Hacemos la consulta a la base de datos
-    cantidad = Notificacion.objects.filter(usuario_destino=request.user, leido=False).count()
+@login_required
+def marcar_todas_leidas(request):
+    """
+    Marca como leídas todas las notificaciones del usuario con un solo UPDATE.
+    """
+    if request.method != 'POST':
+        return HttpResponse(status=405)
+    marcadas = Notificacion.objects.filter(usuario_destino=request.user, leido=False).update(leido=True)
 
-    # 3. Vemos qué resultado nos dio la consulta
-    print(f"Notificaciones sin leer encontradas para este usuario: {cantidad}")
-    print("-----------------------------------------------------")
+    if request.htmx:
+        response = render(request, 'partials/lista_notificaciones.html', {'notificaciones': []})
+        response['HX-Trigger'] = json.dumps({'notificacionesLeidas': marcadas})
+        return response
+    messages.success(request, f"{marcadas} notificaciones marcadas como leídas.")
+    return redirect('bandeja_notificaciones')
 
-    return render(request, 'partials/contador_notificaciones.html', {'cantidad_notificaciones': cantidad})
 
 @login_required
 def marcar_leida_y_redirigir(request, notificacion_pk):
     """
     Marca una notificación como leída y redirige al ticket asociado.
     """
-    notificacion = get_object_or_404(Notificacion, pk=notificacion_pk, usuario_destino=request.user)
-    notificacion.leido = True
-    notificacion.save()
-    return redirect('detalles_ticket', pk=notificacion.ticket.pk)
+    ticket_pk = (
+        Notificacion.objects.filter(pk=notificacion_pk, usuario_destino=request.user)
+        .values_list('ticket_id', flat=True).first()
+    )
+    if ticket_pk is None:
+        raise Http404("Notificación no encontrada.")
+    Notificacion.objects.filter(pk=notificacion_pk, leido=False).update(leido=True)
+    return redirect('detalles_ticket', pk=ticket_pk)
 
 
 # tickets/views.py
 
 @login_required
+@usar_replica
 def dashboard_service_line(request):
     if not request.user.is_staff:
         return redirect('lista_tickets')
@@ -319,7 +530,8 @@ def dashboard_service_line(request):
 
     # --- 3. Preparar el contexto completo ---
     contexto_completo = {
-        'tickets': tickets_query.order_by('-fecha_creacion'),
+        'tickets': tickets_query.select_related('herramienta', 'falla', 'estado', 'creado_por').order_by('-fecha_creacion'),
+        'version_catalogo': version_catalogo(),
         'start_date_value': start_date_str, 'end_date_value': end_date_str,
         'eficiencia_ponderada': eficiencia_ponderada,
         'top_tickets_antiguos': top_tickets_antiguos,
@@ -340,20 +552,20 @@ def dashboard_service_line(request):
     return render(request, 'tickets/dashboard.html', contexto_completo)
 
 
-
-def verificar_ticket_duplicado(request, herramienta_pk):
+@login_required
+async def verificar_ticket_duplicado(request, herramienta_pk):
     """
-    Vista para HTMX: Busca tickets abiertos o en reparación para una herramienta específica.
+    Vista para HTMX: Busca el ticket abierto o en reparación de una herramienta.
+    Usa el índice único parcial de tickets abiertos, así que es una búsqueda de una sola fila.
     """
-    # Buscamos tickets para esa herramienta cuyo estado NO sea 'Cerrado'
-    tickets_abiertos = Ticket.objects.filter(
-        herramienta_id=herramienta_pk
-    ).exclude(
-        estado__nombre='Cerrado'
+    ticket_abierto = await (
+        Ticket.objects.select_related('estado')
+        .filter(herramienta_id=herramienta_pk, fecha_cierre__isnull=True)
+        .afirst()
     )
 
     contexto = {
-        'tickets_duplicados': tickets_abiertos
+        'tickets_duplicados': [ticket_abierto] if ticket_abierto else []
     }
     # Renderiza la plantilla parcial que mostrará la advertencia
     return render(request, 'partials/advertencia_duplicado.html', contexto)
@@ -361,6 +573,7 @@ def verificar_ticket_duplicado(request, herramienta_pk):
 
 
 @login_required
+@usar_replica
 def ticket_estado_data(request):
     if not request.user.is_staff:
         return JsonResponse({'error': 'Acceso denegado'}, status=403)
@@ -401,6 +614,7 @@ def ticket_estado_data(request):
 import json # Asegúrate de tener este import
 
 @login_required
+@usar_replica
 def dashboard_service_line(request):
     if not request.user.is_staff:
         return redirect('lista_tickets')
@@ -463,7 +677,8 @@ def dashboard_service_line(request):
 
     # --- 4. Preparar el contexto completo para la plantilla ---
     contexto_completo = {
-        'tickets': tickets_query.order_by('-fecha_creacion'),
+        'tickets': tickets_query.select_related('herramienta', 'falla', 'estado', 'creado_por').order_by('-fecha_creacion'),
+        'version_catalogo': version_catalogo(),
         'start_date_value': start_date_str, 'end_date_value': end_date_str,
         'eficiencia_ponderada': eficiencia_ponderada,
         'top_tickets_antiguos': top_tickets_antiguos,
@@ -480,9 +695,6 @@ def dashboard_service_line(request):
         }
     }
 
-    for ticket in contexto_completo['tickets']:
-        ticket.form_estado = ActualizarEstadoForm(instance=ticket)
-    
     return render(request, 'tickets/dashboard.html', contexto_completo)
 
 
@@ -490,13 +702,73 @@ def dashboard_service_line(request):
 
 
 
+@login_required
+@usar_replica
+def metricas_confiabilidad(request):
+    """
+    Tabla de MTBF/MTTR precalculados por herramienta, modelo o ubicación.
+    Lee solo la tabla de métricas, así que no depende del tamaño del historial.
+    """
+    if not request.user.is_staff:
+        return redirect('lista_tickets')
+
+    ambito = request.GET.get('ambito', MetricaConfiabilidad.AMBITO_HERRAMIENTA)
+    if ambito not in dict(MetricaConfiabilidad.AMBITO_CHOICES):
+        ambito = MetricaConfiabilidad.AMBITO_HERRAMIENTA
+
+    # Por defecto, el peor MTBF primero (las que fallan más seguido)
+    ordenes = {
+        'mtbf': F('mtbf_horas').asc(nulls_last=True),
+        '-mtbf': F('mtbf_horas').desc(nulls_last=True),
+        'mttr': F('mttr_horas').asc(nulls_last=True),
+        '-mttr': F('mttr_horas').desc(nulls_last=True),
+        'fallas': F('total_fallas').asc(),
+        '-fallas': F('total_fallas').desc(),
+    }
+    orden = request.GET.get('orden', 'mtbf')
+    if orden not in ordenes:
+        orden = 'mtbf'
+
+    metricas = MetricaConfiabilidad.objects.filter(ambito=ambito).order_by(ordenes[orden], 'pk')
+    pagina = Paginator(metricas, 50).get_page(request.GET.get('page'))
+
+    contexto = {
+        'pagina': pagina,
+        'ambito': ambito,
+        'nombre_ambito': dict(MetricaConfiabilidad.AMBITO_CHOICES)[ambito],
+        'orden': orden,
+        'opciones_ambito': MetricaConfiabilidad.AMBITO_CHOICES,
+    }
+    return render(request, 'tickets/metricas_confiabilidad.html', contexto)
+
+
 # tickets/views.py
 
 @login_required
-def detalles_filtrados_modal(request):
+@usar_replica
+def mapa_calor_fallas(request):
+    """
+    Mapa de calor de fallas y MTTR por nave × banda × tacto para un rango de fechas.
+    El agregado sale de la caché mientras no cambien los tickets (tickets/mapa_calor.py);
+    cada celda abre el modal de detalle paginado.
+    """
     if not request.user.is_staff:
         return redirect('lista_tickets')
 
+    filtros = filtros_de_peticion(ReportePDF.TIPO_DASHBOARD, request.GET)
+    inicio, fin = rango_de_filtros(filtros)
+    contexto = {
+        'mapa': mapa_calor(inicio, fin),
+        'start_date': filtros['start_date'],
+        'end_date': filtros['end_date'],
+    }
+    return render(request, 'tickets/mapa_calor.html', contexto)
+
+
+def _tickets_detalle_filtrado(request):
+    """
+    Tickets y título del modal según el segmento de la gráfica que se pulsó.
+    """
     # Obtenemos los parámetros de la URL
     filtro_tipo = request.GET.get('filtro_tipo')
     filtro_valor = request.GET.get('filtro_valor')
@@ -532,18 +804,80 @@ def detalles_filtrados_modal(request):
         tickets_filtrados = tickets_filtrados.filter(herramienta__modelo=filtro_valor)
         titulo_modal = f"Tickets para el Modelo: {filtro_valor}"
 
-    contexto = {
-        'tickets': tickets_filtrados.order_by('-fecha_creacion'),
-        'titulo_modal': titulo_modal
-    }
-    return render(request, 'partials/modal_detalles_generico.html', contexto)
+    # Celda del mapa de calor: nave, banda y tacto
+    elif filtro_tipo == 'ubicacion':
+        filtro_valor3 = request.GET.get('filtro_valor3')
+        ubicaciones = ubicaciones_de_celda(filtro_valor, filtro_valor2, filtro_valor3)
+        tickets_filtrados = tickets_filtrados.filter(ubicacion_id__in=ubicaciones)
+        partes = [filtro_valor, filtro_valor2, f"Tacto {filtro_valor3}" if filtro_valor3 else None]
+        titulo_modal = f"Tickets en {' / '.join(parte for parte in partes if parte)}"
+
+    return tickets_filtrados, titulo_modal
+
 
+@login_required
+@usar_replica
+def detalles_filtrados_modal(request):
+    """
+    Modal de detalle de un segmento del dashboard. Carga solo la primera página y un
+    total acotado; las siguientes páginas llegan al hacer scroll (paginación por
+    cursor sobre fecha_creacion/pk), así que cada petición cuesta lo mismo sin
+    importar cuántos tickets tenga el segmento.
+    """
+    if not request.user.is_staff:
+        return redirect('lista_tickets')
+
+    tickets_filtrados, titulo_modal = _tickets_detalle_filtrado(request)
+    cursor = request.GET.get('cursor')
+    if cursor:
+        try:
+            cursor = int(cursor)
+        except ValueError:
+            return HttpResponseBadRequest("Cursor inválido.")
+
+    pagina = tickets_filtrados
+    if cursor:
+        # Última fila de la página anterior: seguimos justo después de ella
+        fecha_cursor = Ticket.objects.filter(pk=cursor).values_list('fecha_creacion', flat=True).first()
+        if fecha_cursor is None:
+            return HttpResponse('')
+        pagina = pagina.filter(
+            Q(fecha_creacion__lt=fecha_cursor) | Q(fecha_creacion=fecha_cursor, pk__lt=cursor)
+        )
+    tickets = list(
+        pagina.select_related('herramienta', 'falla', 'estado', 'creado_por')
+        .order_by('-fecha_creacion', '-pk')[:FILAS_POR_PAGINA_MODAL + 1]
+    )
+    hay_mas = len(tickets) > FILAS_POR_PAGINA_MODAL
+    tickets = tickets[:FILAS_POR_PAGINA_MODAL]
 
+    url_siguiente = None
+    if hay_mas:
+        parametros = request.GET.copy()
+        parametros['cursor'] = tickets[-1].pk
+        url_siguiente = f"{reverse('modal_detalles_filtrados')}?{parametros.urlencode()}"
 
+    contexto = {
+        'tickets': tickets,
+        'url_siguiente': url_siguiente,
+        'version_catalogo': version_catalogo(),
+        'titulo_modal': titulo_modal
+    }
+    if cursor:
+        return render(request, 'partials/filas_tabla_tickets.html', contexto)
 
+    # El total se cuenta solo al abrir el modal y como mucho hasta LIMITE_CONTEO_FILTRADO
+    if hay_mas:
+        total = tickets_filtrados[:LIMITE_CONTEO_FILTRADO].count()
+    else:
+        total = len(tickets)
+    contexto['total'] = total
+    contexto['total_acotado'] = total >= LIMITE_CONTEO_FILTRADO
+    return render(request, 'partials/modal_detalles_generico.html', contexto)
 
 
 @login_required
+@usar_replica
 def exportar_tickets_excel(request):
     """
     Toma los filtros activos del dashboard, consulta la base de datos
@@ -571,46 +905,8 @@ def exportar_tickets_excel(request):
     if fabricante_filtro:
         tickets_query = tickets_query.filter(herramienta__fabricante=fabricante_filtro)
 
-    # --- 2. Creamos el archivo de Excel en memoria ---
-    workbook = Workbook()
-    sheet = workbook.active
-    sheet.title = "Reporte de Tickets"
-
-    # Definimos los encabezados de las columnas
-    headers = [
-        "Folio", "Estado", "Herramienta (Modelo)", "No. Serie", "Falla",
-        "Comentarios", "Creado Por", "Fecha Creación", "Turno", "Ubicación"
-    ]
-    sheet.append(headers)
-
-    # Damos formato a los encabezados (negrita y centrado)
-    for cell in sheet[1]:
-        cell.font = Font(bold=True)
-        cell.alignment = Alignment(horizontal="center", vertical="center")
-
-    # --- 3. Llenamos el archivo con los datos de los tickets ---
-    for ticket in tickets_query.order_by('fecha_creacion'):
-        ubicacion_str = str(ticket.ubicacion) if ticket.ubicacion else "N/A"
-        
-        # Creamos una fila con los datos de cada ticket
-        row = [
-            ticket.folio,
-            ticket.estado.nombre,
-            ticket.herramienta.modelo,
-            ticket.herramienta.numero_serie,
-            ticket.falla.descripcion if ticket.falla else "N/A",
-            ticket.comentarios,
-            ticket.creado_por.username,
-            timezone.localtime(ticket.fecha_creacion).strftime("%d/%m/%Y %H:%M"),
-            ticket.turno,
-            ubicacion_str
-        ]
-        sheet.append(row)
-
-    # Ajustamos el ancho de las columnas automáticamente
-    for column_cells in sheet.columns:
-        length = max(len(str(cell.value or "")) for cell in column_cells)
-        sheet.column_dimensions[column_cells[0].column_letter].width = length + 2
+    # --- 2. Creamos el archivo de Excel en memoria (openpyxl se carga ahí, no con las vistas) ---
+    workbook = libro_excel_tickets(tickets_query)
 
     # --- 4. Preparamos la respuesta HTTP para descargar el archivo ---
     response = HttpResponse(
@@ -623,4 +919,51 @@ def exportar_tickets_excel(request):
     # Guardamos el libro de Excel en la respuesta
     workbook.save(response)
 
-    return response
\ No newline at end of file
+    return response
+
+
+# ==============================================================================
+# Reportes PDF (se generan fuera del worker web)
+# ==============================================================================
+
+@login_required
+def solicitar_reporte_pdf(request):
+    """
+    Vista para HTMX: registra el reporte con los filtros actuales y devuelve su estado.
+    Si ya existe un PDF con los mismos filtros y datos, se ofrece directamente.
+    """
+    if not request.user.is_staff:
+        return HttpResponse(status=403)
+    if request.method != 'POST':
+        return HttpResponse(status=405)
+
+    tipo = request.POST.get('tipo', ReportePDF.TIPO_DASHBOARD)
+    if tipo not in dict(ReportePDF.TIPO_CHOICES):
+        return HttpResponse(status=400)
+
+    reporte = solicitar_reporte(tipo, filtros_de_peticion(tipo, request.POST), request.user)
+    return render(request, 'partials/estado_reporte_pdf.html', {'reporte': reporte})
+
+
+@login_required
+def estado_reporte_pdf(request, pk):
+    """
+    Vista para HTMX: el fragmento se consulta a sí mismo hasta que el PDF está listo.
+    """
+    if not request.user.is_staff:
+        return HttpResponse(status=403)
+    reporte = get_object_or_404(ReportePDF, pk=pk)
+    return render(request, 'partials/estado_reporte_pdf.html', {'reporte': reporte})
+
+
+@login_required
+def descargar_reporte_pdf(request, pk):
+    if not request.user.is_staff:
+        return redirect('lista_tickets')
+    reporte = get_object_or_404(ReportePDF, pk=pk, estado=ReportePDF.ESTADO_LISTO)
+    try:
+        archivo = reporte.archivo.open('rb')
+    except FileNotFoundError:
+        raise Http404("El archivo del reporte ya no existe.")
+    nombre = f"{reporte.get_tipo_display().replace(' ', '_')}_{reporte.fecha_generacion:%Y-%m-%d_%H%M}.pdf"
+    return FileResponse(archivo, as_attachment=True, filename=nombre, content_type='application/pdf')
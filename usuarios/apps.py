@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class UsuariosConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'usuarios'
+    def ready(self):
+        # Importa las señales que invalidan la caché de permisos
+        import usuarios.signals
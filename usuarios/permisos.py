@@ -0,0 +1,62 @@
+# usuarios/permisos.py
+
+import time
+
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.utils.text import slugify
+
+# Las entradas expiran solas como red de seguridad; normalmente se invalidan por señales
+PERMISOS_CACHE_TIMEOUT = 60 * 10
+VERSION_KEY = 'permisos:version'
+
+
+def _version():
+    # Un cambio de grupos o permisos renueva la versión e invalida todas las entradas de golpe
+    return cache.get_or_set(VERSION_KEY, time.time_ns(), None)
+
+
+def _clave(tipo, identificador):
+    return f'{tipo}:{_version()}:{identificador}'
+
+
+def invalidar_todo():
+    cache.set(VERSION_KEY, time.time_ns(), None)
+
+
+def invalidar_usuario(user_pk):
+    cache.delete(_clave('permisos', user_pk))
+
+
+def miembros_de_grupo(nombre):
+    """
+    Devuelve los IDs de los usuarios del grupo `nombre`, o None si el grupo no existe.
+    El resultado se comparte entre workers a través del framework de caché.
+    """
+    key = _clave('grupo', slugify(nombre))
+    miembros = cache.get(key)
+    if miembros is None:
+        grupo = Group.objects.filter(name=nombre).first()
+        # Guardamos False si el grupo no existe para no consultarlo en cada ticket
+        miembros = list(grupo.user_set.values_list('pk', flat=True)) if grupo else False
+        cache.set(key, miembros, PERMISOS_CACHE_TIMEOUT)
+    return miembros if miembros is not False else None
+
+class PermisosEnCacheBackend(ModelBackend):
+    """
+    ModelBackend que guarda los permisos efectivos de cada usuario en la caché compartida,
+    evitando las consultas a permisos y grupos en cada petición.
+    """
+
+    def get_all_permissions(self, user_obj, obj=None):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        if not hasattr(user_obj, '_perm_cache'):
+            key = _clave('permisos', user_obj.pk)
+            permisos = cache.get(key)
+            if permisos is None:
+                permisos = super().get_all_permissions(user_obj)
+                cache.set(key, permisos, PERMISOS_CACHE_TIMEOUT)
+            user_obj._perm_cache = permisos
+        return user_obj._perm_cache
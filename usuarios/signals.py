@@ -0,0 +1,49 @@
+# usuarios/signals.py
+
+from django.db.models.signals import m2m_changed, post_save, post_delete
+from django.dispatch import receiver
+from django.contrib.auth.models import User, Group
+from .permisos import invalidar_todo, invalidar_usuario
+
+ACCIONES_M2M = ('post_add', 'post_remove', 'post_clear')
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=Group.permissions.through)
+def invalidar_cache_grupos(sender, action, **kwargs):
+    """
+    Un cambio de membresía o de permisos de un grupo puede afectar a muchos usuarios.
+    """
+    if action in ACCIONES_M2M:
+        invalidar_todo()
+
+
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def invalidar_cache_permisos_usuario(sender, instance, action, reverse, **kwargs):
+    if action in ACCIONES_M2M:
+        if reverse:
+            # Se modificó desde el lado del permiso: puede afectar a varios usuarios
+            invalidar_todo()
+        else:
+            invalidar_usuario(instance.pk)
+
+
+@receiver(post_save, sender=User)
+def invalidar_cache_usuario(sender, instance, update_fields=None, **kwargs):
+    # is_active / is_superuser cambian los permisos; el login solo actualiza last_login
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    invalidar_usuario(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def invalidar_cache_usuario_eliminado(sender, **kwargs):
+    # Borrar un usuario quita sus membresías sin disparar m2m_changed: miembros_de_grupo queda viejo
+    invalidar_todo()
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidar_cache_grupo_eliminado(sender, **kwargs):
+    # Renombrar un grupo cambia la clave con la que miembros_de_grupo lo busca
+    invalidar_todo()